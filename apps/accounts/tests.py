@@ -1,3 +1,14 @@
-from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from apps.core.testing import ViewBenchmarkTestCase
+
+
+class AccountViewBenchmarks(ViewBenchmarkTestCase):
+    """Presupuesto de queries de las páginas de cuenta"""
+
+    def test_login_page(self):
+        self.benchmark('accounts:login', lambda: self.client.get(reverse('accounts:login')), max_queries=0)
+
+    def test_profile(self):
+        self.login_customer()
+        self.benchmark('accounts:profile', lambda: self.client.get(reverse('accounts:profile')), max_queries=5)
@@ -1,6 +1,8 @@
 # apps/contact/admin.py
 from django.contrib import admin
 from django.utils.html import format_html
+from apps.core.exports import export_background_action, export_csv_action
+from .exports import ContactMessageExport
 from .models import ContactMessage
 
 @admin.register(ContactMessage)
@@ -24,7 +26,11 @@ class ContactMessageAdmin(admin.ModelAdmin):
         }),
     )
     
-    actions = ['mark_as_read', 'mark_as_replied', 'mark_as_closed']
+    actions = [
+        'mark_as_read', 'mark_as_replied', 'mark_as_closed',
+        export_csv_action(ContactMessageExport, 'Exportar mensajes a CSV'),
+        export_background_action(ContactMessageExport, 'Exportar mensajes a CSV (segundo plano, aviso por email)'),
+    ]
     
     def status_badge(self, obj):
         """Mostrar badge colorido según el estado"""
@@ -0,0 +1,20 @@
+"""
+Exportación CSV de mensajes de contacto (ver apps/core/exports.py)
+"""
+from apps.core.exports import CSVExport, format_datetime
+
+
+class ContactMessageExport(CSVExport):
+    filename_prefix = 'mensajes_contacto'
+    columns = [
+        ('Nombre', 'name'),
+        ('Email', 'email'),
+        ('Teléfono', 'phone'),
+        ('Estado', lambda message: message.get_status_display()),
+        ('Mensaje', 'message'),
+        ('Fecha', lambda message: format_datetime(message.created_at)),
+        ('Respondido', lambda message: format_datetime(message.replied_at)),
+    ]
+
+    def get_queryset(self, queryset):
+        return queryset.order_by('-created_at')
@@ -1,3 +1,15 @@
-from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from apps.core.testing import ViewBenchmarkTestCase
+
+
+class ContactViewBenchmarks(ViewBenchmarkTestCase):
+    """Presupuesto de queries del formulario de contacto"""
+
+    def test_contact_form(self):
+        self.benchmark('contact:contact', lambda: self.client.get(reverse('contact:contact')), max_queries=0)
+
+    def test_contact_changelist(self):
+        self.login_admin()
+        url = reverse('admin:contact_contactmessage_changelist')
+        self.benchmark('admin:contact_contactmessage_changelist', lambda: self.client.get(url), max_queries=7)
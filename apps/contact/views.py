@@ -5,11 +5,11 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
-from django.core.mail import send_mail, EmailMultiAlternatives
+from django.db import transaction
 from django.template.loader import render_to_string
 from django.conf import settings
-from email.mime.image import MIMEImage
 import os
+from apps.core.mail import queue_email
 from .forms import ContactForm
 from .models import ContactMessage
 
@@ -21,20 +21,21 @@ def contact_form(request):
     if request.method == 'POST':
         form = ContactForm(request.POST)
         if form.is_valid():
-            # Crear mensaje de contacto
-            contact_message = ContactMessage.objects.create(
-                name=form.cleaned_data['name'],
-                email=form.cleaned_data['email'],
-                phone=form.cleaned_data['phone'],
-                message=form.cleaned_data['message'],
-                ip_address=get_client_ip(request)
-            )
-
-            # Enviar email al gerente con estilos
-            send_contact_email_to_manager(contact_message)
-
-            # Enviar email de confirmación al cliente
-            send_confirmation_email_to_client(contact_message)
+            # Crear mensaje de contacto y encolar los emails en la misma transacción
+            with transaction.atomic():
+                contact_message = ContactMessage.objects.create(
+                    name=form.cleaned_data['name'],
+                    email=form.cleaned_data['email'],
+                    phone=form.cleaned_data['phone'],
+                    message=form.cleaned_data['message'],
+                    ip_address=get_client_ip(request)
+                )
+
+                # Email al gerente con estilos
+                send_contact_email_to_manager(contact_message)
+
+                # Email de confirmación al cliente
+                send_confirmation_email_to_client(contact_message)
 
             messages.success(
                 request,
@@ -76,7 +77,7 @@ def contact_success(request):
 
 def send_contact_email_to_manager(contact_message):
     """
-    Envía email con estilos al gerente cuando un cliente envía mensaje de contacto.
+    Encola email con estilos al gerente cuando un cliente envía mensaje de contacto.
     """
     subject = f'Nuevo mensaje de contacto - {contact_message.name}'
 
@@ -99,24 +100,25 @@ def send_contact_email_to_manager(contact_message):
     Fecha: {contact_message.created_at.strftime('%d/%m/%Y %H:%M')}
     """
 
-    # Crear email con HTML
-    email = EmailMultiAlternatives(
-        subject=subject,
-        body=text_content,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[settings.EMAIL_HOST_USER]  # Email del gerente
+    queue_email(
+        subject,
+        [settings.EMAIL_HOST_USER],  # Email del gerente
+        html_body=html_content,
+        body=text_content
     )
-    email.attach_alternative(html_content, "text/html")
 
-    try:
-        email.send()
-    except Exception as e:
-        print(f"Error sending email to manager: {e}")
+
+# Imágenes embebidas en el email de confirmación (rutas relativas a BASE_DIR)
+CONFIRMATION_INLINE_IMAGES = [
+    {'path': os.path.join('static', 'img', 'Logo_Gateway.png'), 'cid': 'logo', 'filename': 'logo.png'},
+    {'path': os.path.join('static', 'img', 'whatsapp.png'), 'cid': 'whatsapp', 'filename': 'whatsapp.png'},
+    {'path': os.path.join('static', 'img', 'facebook.png'), 'cid': 'facebook', 'filename': 'facebook.png'},
+]
 
 
 def send_confirmation_email_to_client(contact_message):
     """
-    Envía email de confirmación con estilos al cliente.
+    Encola email de confirmación con estilos al cliente.
     """
     subject = '¡Gracias por contactarnos! - Gateway IT'
 
@@ -137,43 +139,11 @@ def send_confirmation_email_to_client(contact_message):
     El equipo de Gateway IT
     """
 
-    # Crear email con HTML
-    email = EmailMultiAlternatives(
-        subject=subject,
+    # Los logos se adjuntan como imágenes embebidas al momento del envío
+    queue_email(
+        subject,
+        [contact_message.email],
+        html_body=html_content,
         body=text_content,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[contact_message.email]
+        inline_images=CONFIRMATION_INLINE_IMAGES
     )
-    email.attach_alternative(html_content, "text/html")
-
-    # Adjuntar logo como imagen embebida
-    logo_path = os.path.join(settings.BASE_DIR, 'static', 'img', 'Logo_Gateway.png')
-    if os.path.exists(logo_path):
-        with open(logo_path, 'rb') as img:
-            logo_img = MIMEImage(img.read())
-            logo_img.add_header('Content-ID', '<logo>')
-            logo_img.add_header('Content-Disposition', 'inline', filename='logo.png')
-            email.attach(logo_img)
-
-    # Adjuntar logo de WhatsApp
-    whatsapp_path = os.path.join(settings.BASE_DIR, 'static', 'img', 'whatsapp.png')
-    if os.path.exists(whatsapp_path):
-        with open(whatsapp_path, 'rb') as img:
-            whatsapp_img = MIMEImage(img.read())
-            whatsapp_img.add_header('Content-ID', '<whatsapp>')
-            whatsapp_img.add_header('Content-Disposition', 'inline', filename='whatsapp.png')
-            email.attach(whatsapp_img)
-
-    # Adjuntar logo de Facebook
-    facebook_path = os.path.join(settings.BASE_DIR, 'static', 'img', 'facebook.png')
-    if os.path.exists(facebook_path):
-        with open(facebook_path, 'rb') as img:
-            facebook_img = MIMEImage(img.read())
-            facebook_img.add_header('Content-ID', '<facebook>')
-            facebook_img.add_header('Content-Disposition', 'inline', filename='facebook.png')
-            email.attach(facebook_img)
-
-    try:
-        email.send()
-    except Exception as e:
-        print(f"Error sending confirmation email to client: {e}")
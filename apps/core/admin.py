@@ -1,6 +1,13 @@
 # apps/core/admin.py
+import os
+
 from django.contrib import admin
-from .models import CompanyInfo, ValueCard, Client, Brand
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from .mail import requeue_emails
+from .models import CompanyInfo, ValueCard, Client, Brand, OutboundEmail, ExportJob
 
 @admin.register(CompanyInfo)
 class CompanyInfoAdmin(admin.ModelAdmin):
@@ -52,4 +59,61 @@ class BrandAdmin(admin.ModelAdmin):
     list_display = ['name', 'order', 'active']
     list_editable = ['order', 'active']
     list_filter = ['active']
-    search_fields = ['name']
\ No newline at end of file
+    search_fields = ['name']
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    """Admin para el outbox de emails"""
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'to']
+    readonly_fields = [
+        'subject', 'body', 'html_body', 'from_email', 'to', 'inline_images',
+        'status', 'attempts', 'last_error', 'next_attempt_at', 'created_at', 'sent_at'
+    ]
+    actions = ['requeue']
+
+    def has_add_permission(self, request):
+        return False
+
+    def requeue(self, request, queryset):
+        updated = requeue_emails(queryset)
+        self.message_user(request, f'{updated} email(s) encolado(s) nuevamente.')
+    requeue.short_description = "Reintentar envío"
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    """Admin para exportaciones en segundo plano"""
+    list_display = ['id', 'filename', 'status', 'row_count', 'requested_by', 'created_at', 'finished_at', 'download_link']
+    list_filter = ['status', 'created_at']
+    readonly_fields = [
+        'export_class', 'model_label', 'select_across', 'changelist_params', 'requested_by', 'notify_email',
+        'status', 'attempts', 'row_count', 'filename', 'file_path', 'error', 'created_at', 'started_at', 'finished_at'
+    ]
+    exclude = ['object_ids', 'download_url']
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        urls = [
+            path(
+                '<int:pk>/download/',
+                self.admin_site.admin_view(self.download_view),
+                name='core_exportjob_download',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def download_view(self, request, pk):
+        """Descargar el archivo de una exportación terminada (solo staff)"""
+        job = get_object_or_404(ExportJob, pk=pk, status='DONE')
+        if not self.has_view_permission(request, job) or not os.path.exists(job.file_path):
+            raise Http404
+        return FileResponse(open(job.file_path, 'rb'), as_attachment=True, filename=job.filename)
+
+    def download_link(self, obj):
+        if obj.status != 'DONE':
+            return '-'
+        return format_html('<a href="{}">Descargar</a>', reverse('admin:core_exportjob_download', args=[obj.pk]))
+    download_link.short_description = 'Archivo'
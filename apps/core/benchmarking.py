@@ -0,0 +1,89 @@
+"""
+Utilidades para medir rendimiento (comandos de benchmark y pruebas de carga)
+"""
+import math
+
+from django.db import connection
+
+
+def percentile(values, pct):
+    """
+    Percentil `pct` (0-100) con interpolación lineal
+
+    Args:
+        values: Lista de números (no necesita estar ordenada)
+        pct: Percentil a calcular
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return float(ordered[lower])
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def latency_summary(seconds):
+    """
+    Resumen de latencias en milisegundos
+
+    Args:
+        seconds: Lista de duraciones en segundos
+
+    Returns:
+        Dict con count, mean, min, p50, p90, p95, p99 y max (ms)
+    """
+    if not seconds:
+        return {'count': 0, 'mean': 0.0, 'min': 0.0, 'p50': 0.0, 'p90': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+
+    millis = [value * 1000 for value in seconds]
+    return {
+        'count': len(millis),
+        'mean': round(sum(millis) / len(millis), 2),
+        'min': round(min(millis), 2),
+        'p50': round(percentile(millis, 50), 2),
+        'p90': round(percentile(millis, 90), 2),
+        'p95': round(percentile(millis, 95), 2),
+        'p99': round(percentile(millis, 99), 2),
+        'max': round(max(millis), 2),
+    }
+
+
+def format_latency_summary(summary):
+    """Línea legible para consola: p50/p90/p95/p99/max en ms"""
+    return (
+        f"p50 {summary['p50']}ms | p90 {summary['p90']}ms | p95 {summary['p95']}ms | "
+        f"p99 {summary['p99']}ms | max {summary['max']}ms"
+    )
+
+
+class QueryCounter:
+    """
+    Contar las queries ejecutadas en la conexión del hilo actual
+
+    Usa execute_wrapper, así que funciona con DEBUG=False y no tiene el tope
+    de 9000 queries de CaptureQueriesContext.
+
+        with QueryCounter() as counter:
+            ...
+        counter.count
+    """
+
+    def __init__(self, using_connection=None):
+        self.connection = using_connection or connection
+        self.count = 0
+        self._wrapper = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._wrapper = self.connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
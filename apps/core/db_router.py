@@ -0,0 +1,144 @@
+"""
+Réplicas de lectura
+
+ReplicaRouter manda las lecturas de los modelos de catálogo y reportes
+(DATABASE_REPLICA_MODELS) a una réplica al azar de DATABASE_REPLICAS. Todo lo
+demás usa `default` (el primario):
+
+- Escrituras y lecturas de los demás modelos (carrito, pedidos, usuarios...)
+- Cualquier lectura dentro de transaction.atomic() (checkout, webhooks,
+  select_for_update)
+- Peticiones POST/PUT/PATCH/DELETE y las de las vistas en
+  DATABASE_PRIMARY_VIEWS (checkout y pagos)
+- El resto de una petición después de escribir
+- Las peticiones de una sesión durante DATABASE_STICKY_SECONDS después de una
+  petición que escribió (cookie, ver ReplicaStickinessMiddleware): así quien
+  acaba de editar no lee datos viejos de una réplica atrasada
+
+Para código fuera de estos casos que necesita leer lo último escrito:
+
+    with use_primary():
+        ...
+
+Sin réplicas configuradas el router no cambia nada.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+STICKY_COOKIE = 'db_primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_routing_state = ContextVar('db_routing_state', default=None)
+
+
+class RoutingState:
+    """Estado de enrutamiento de la petición (o bloque use_primary) en curso"""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+@contextmanager
+def use_primary():
+    """Leer todo del primario dentro del bloque"""
+    token = _routing_state.set(RoutingState(pinned=True))
+    try:
+        yield
+    finally:
+        _routing_state.reset(token)
+
+
+def _replica_models():
+    return set(settings.DATABASE_REPLICA_MODELS)
+
+
+def _is_replica_model(model):
+    names = _replica_models()
+    return model._meta.app_label in names or model._meta.label in names
+
+
+def _must_use_primary():
+    state = _routing_state.get()
+    if state is not None and (state.pinned or state.wrote):
+        return True
+    return connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+class ReplicaRouter:
+    """Router de DATABASE_ROUTERS (ver docstring del módulo)"""
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or not _is_replica_model(model) or _must_use_primary():
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario y réplicas tienen los mismos datos
+        return True
+
+
+# ==========================================
+# MIDDLEWARE
+# ==========================================
+
+class ReplicaStickinessMiddleware:
+    """
+    Fijar al primario las peticiones que lo necesitan
+
+    - Si la cookie STICKY_COOKIE sigue vigente, toda la petición usa el primario
+    - También las peticiones que no son GET/HEAD/OPTIONS (van a escribir)
+    - Las vistas de DATABASE_PRIMARY_VIEWS usan el primario
+    - Si la petición escribió (o no es GET/HEAD/OPTIONS), se renueva la cookie
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState(pinned=request.method not in SAFE_METHODS or self.is_sticky(request))
+        token = _routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+
+        if settings.DATABASE_REPLICAS and (state.wrote or request.method not in SAFE_METHODS):
+            seconds = settings.DATABASE_STICKY_SECONDS
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(int(time.time()) + seconds),
+                max_age=seconds,
+                secure=request.is_secure(),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def is_sticky(self, request):
+        try:
+            return int(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _routing_state.get()
+        match = request.resolver_match
+        if state is None or match is None:
+            return None
+        primary_views = set(settings.DATABASE_PRIMARY_VIEWS)
+        if match.view_name in primary_views or match.namespace in primary_views:
+            state.pinned = True
+        return None
@@ -0,0 +1,319 @@
+"""
+Exportaciones CSV en streaming
+
+Cada exportación declara sus columnas y cómo preparar el queryset
+(select_related / annotate) para no hacer queries por fila. Las filas se
+generan con `.iterator(chunk_size=...)` y se envían con StreamingHttpResponse,
+así la memoria del worker no crece con el tamaño del reporte.
+
+Para reportes muy grandes, `export_background_action` crea un ExportJob que el
+comando `run_export_jobs` escribe a disco y notifica por email al terminar. El
+job no guarda el queryset (pickle) sino el modelo y:
+
+- "Seleccionar todo": el query string del changelist (filtros, búsqueda,
+  orden). El worker reconstruye el queryset con el ModelAdmin y el usuario
+  que la pidió, así la petición del admin no carga ningún pk.
+- Selección manual: los pks (JSON), hasta EXPORT_JOB_MAX_IDS.
+
+Sigue siendo válido tras actualizar Django o el código y no ejecuta nada al
+leerse.
+Los jobs que quedan en RUNNING más de EXPORT_JOB_TIMEOUT (worker muerto) se
+reintentan hasta EXPORT_JOB_MAX_ATTEMPTS veces.
+
+Uso en un admin:
+
+    class OrderExport(CSVExport):
+        filename_prefix = 'pedidos'
+        columns = [('Número de Orden', 'order_number'), ...]
+
+    actions = [export_csv_action(OrderExport), export_background_action(OrderExport)]
+"""
+import csv
+import logging
+import os
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import PAGE_VAR
+from django.db import transaction
+from django.http import HttpRequest, QueryDict, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .mail import queue_email
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+# BOM para que Excel abra el CSV como UTF-8 (tildes y eñes)
+UTF8_BOM = '\ufeff'
+
+
+class Echo:
+    """Pseudo-buffer para csv.writer: devuelve la línea en lugar de guardarla"""
+
+    def write(self, value):
+        return value
+
+
+class CSVExport:
+    """
+    Definición de una exportación CSV
+
+    `columns` es una lista de (encabezado, valor), donde valor es el nombre de
+    un atributo o un callable que recibe el objeto.
+    """
+
+    filename_prefix = 'export'
+    columns = []
+    chunk_size = 2000
+
+    def get_queryset(self, queryset):
+        """Preparar el queryset (select_related, annotate, only...)"""
+        return queryset
+
+    def get_filename(self):
+        return f'{self.filename_prefix}_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv'
+
+    def get_headers(self):
+        return [header for header, _ in self.columns]
+
+    def get_row(self, obj):
+        row = []
+        for _, value in self.columns:
+            row.append(value(obj) if callable(value) else getattr(obj, value))
+        return row
+
+    def iter_rows(self, queryset):
+        """Encabezados y filas como listas, iterando por bloques"""
+        yield self.get_headers()
+        for obj in self.get_queryset(queryset).iterator(chunk_size=self.chunk_size):
+            yield self.get_row(obj)
+
+    def iter_rows_for_ids(self, model, ids):
+        """Como iter_rows, para una lista de pks (un query por bloque de chunk_size)"""
+        yield self.get_headers()
+        for start in range(0, len(ids), self.chunk_size):
+            chunk = model._default_manager.filter(pk__in=ids[start:start + self.chunk_size])
+            for obj in self.get_queryset(chunk):
+                yield self.get_row(obj)
+
+    def stream_response(self, queryset):
+        """StreamingHttpResponse que escribe el CSV fila por fila"""
+        writer = csv.writer(Echo())
+
+        def lines():
+            yield UTF8_BOM
+            for row in self.iter_rows(queryset):
+                yield writer.writerow(row)
+
+        response = StreamingHttpResponse(lines(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{self.get_filename()}"'
+        return response
+
+    def write_file(self, queryset, path):
+        """
+        Escribir el CSV a disco
+
+        Returns:
+            Cantidad de filas escritas (sin encabezado)
+        """
+        return self.write_rows(self.iter_rows(queryset), path)
+
+    def write_rows(self, rows, path):
+        """Escribir a disco filas de iter_rows / iter_rows_for_ids"""
+        count = -1
+        with open(path, 'w', newline='', encoding='utf-8') as fh:
+            fh.write(UTF8_BOM)
+            writer = csv.writer(fh)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        return count
+
+
+# ==========================================
+# HELPERS DE FORMATO
+# ==========================================
+
+def format_money(value):
+    return f'${value:,.0f}' if value is not None else ''
+
+
+def format_datetime(value):
+    return timezone.localtime(value).strftime('%Y-%m-%d %H:%M') if value else '-'
+
+
+# ==========================================
+# ACCIONES DEL ADMIN
+# ==========================================
+
+def export_csv_action(export_class, description=None):
+    """Acción de admin que descarga el CSV en streaming"""
+    def export_csv(modeladmin, request, queryset):
+        return export_class().stream_response(queryset)
+
+    export_csv.short_description = description or 'Exportar seleccionados a CSV'
+    export_csv.__name__ = f'export_csv_{export_class.filename_prefix}'
+    return export_csv
+
+
+def export_background_action(export_class, description=None):
+    """Acción de admin que encola la exportación y avisa por email al terminar"""
+    def export_background(modeladmin, request, queryset):
+        selection = {}
+        if request.POST.get('select_across') == '1':
+            # Todos los resultados: se guarda el filtro, no los pks
+            params = request.GET.copy()
+            params.pop(PAGE_VAR, None)
+            selection = {'select_across': True, 'changelist_params': params.urlencode()}
+        else:
+            object_ids = list(queryset.values_list('pk', flat=True)[:settings.EXPORT_JOB_MAX_IDS + 1])
+            if len(object_ids) > settings.EXPORT_JOB_MAX_IDS:
+                modeladmin.message_user(
+                    request,
+                    f'Selecciona hasta {settings.EXPORT_JOB_MAX_IDS} filas o usa "Seleccionar todo" con un filtro.',
+                    messages.ERROR,
+                )
+                return
+            selection = {'object_ids': object_ids}
+
+        job = ExportJob.objects.create(
+            export_class=f'{export_class.__module__}.{export_class.__qualname__}',
+            model_label=queryset.model._meta.label,
+            requested_by=request.user if request.user.is_authenticated else None,
+            notify_email=request.user.email if request.user.is_authenticated else '',
+            **selection,
+        )
+        job.download_url = request.build_absolute_uri(reverse('admin:core_exportjob_download', args=[job.pk]))
+        job.save(update_fields=['download_url'])
+
+        modeladmin.message_user(
+            request,
+            f'Exportación #{job.pk} en cola. Te avisaremos a {job.notify_email or "tu email"} cuando esté lista.',
+            messages.SUCCESS,
+        )
+
+    export_background.short_description = description or 'Exportar seleccionados a CSV (segundo plano)'
+    export_background.__name__ = f'export_background_{export_class.filename_prefix}'
+    return export_background
+
+
+# ==========================================
+# EXPORTACIONES EN SEGUNDO PLANO
+# ==========================================
+
+def changelist_queryset(job, model):
+    """
+    Queryset de "seleccionar todo": el changelist del admin con los filtros guardados
+
+    Se arma con el ModelAdmin registrado y el usuario que pidió la exportación,
+    así respeta su get_queryset, list_filter, search_fields y permisos.
+    """
+    modeladmin = admin.site._registry.get(model)
+    if modeladmin is None:
+        raise ValueError(f'{job.model_label} no está registrado en el admin')
+    if job.requested_by is None:
+        raise ValueError('El usuario que pidió la exportación ya no existe')
+
+    request = HttpRequest()
+    request.method = 'GET'
+    request.GET = QueryDict(job.changelist_params)
+    request.user = job.requested_by
+    return modeladmin.get_changelist_instance(request).queryset
+
+
+def run_export_job(job):
+    """Escribir el archivo de un ExportJob y notificar al solicitante"""
+    export = import_string(job.export_class)()
+    model = apps.get_model(job.model_label)
+
+    os.makedirs(settings.EXPORTS_ROOT, exist_ok=True)
+    filename = export.get_filename()
+    path = os.path.join(settings.EXPORTS_ROOT, f'{job.pk}_{filename}')
+
+    if job.select_across:
+        rows = export.iter_rows(changelist_queryset(job, model))
+    else:
+        rows = export.iter_rows_for_ids(model, job.object_ids)
+    job.row_count = export.write_rows(rows, path)
+    job.file_path = path
+    job.filename = filename
+    job.status = 'DONE'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['row_count', 'file_path', 'filename', 'status', 'finished_at'])
+
+    if job.notify_email:
+        queue_email(
+            f'Exportación lista: {filename}',
+            [job.notify_email],
+            body=(
+                f'Tu exportación ({job.row_count} filas) está lista.\n\n'
+                f'Descárgala desde el admin: {job.download_url}\n'
+            ),
+        )
+
+
+def recover_stuck_jobs():
+    """
+    Retomar exportaciones en RUNNING por más de EXPORT_JOB_TIMEOUT (el worker murió)
+
+    Vuelven a PENDING; las que ya agotaron EXPORT_JOB_MAX_ATTEMPTS quedan FAILED.
+
+    Returns:
+        Tupla (reencoladas, fallidas)
+    """
+    stuck = ExportJob.objects.filter(
+        status='RUNNING',
+        started_at__lt=timezone.now() - timedelta(seconds=settings.EXPORT_JOB_TIMEOUT),
+    )
+    failed = stuck.filter(attempts__gte=settings.EXPORT_JOB_MAX_ATTEMPTS).update(
+        status='FAILED', error='El worker no terminó la exportación', finished_at=timezone.now()
+    )
+    requeued = stuck.update(status='PENDING')
+    if requeued or failed:
+        logger.warning(f"Exportaciones colgadas: {requeued} reencolada(s), {failed} fallida(s)")
+    return requeued, failed
+
+
+def process_export_jobs(limit=5):
+    """
+    Procesar exportaciones pendientes
+
+    Returns:
+        Tupla (terminadas, fallidas)
+    """
+    recover_stuck_jobs()
+
+    done = failed = 0
+    for _ in range(limit):
+        with transaction.atomic():
+            job = (
+                ExportJob.objects
+                .select_for_update(skip_locked=True)
+                .filter(status='PENDING')
+                .order_by('created_at')
+                .first()
+            )
+            if job is None:
+                break
+            job.status = 'RUNNING'
+            job.started_at = timezone.now()
+            job.attempts += 1
+            job.save(update_fields=['status', 'started_at', 'attempts'])
+
+        try:
+            run_export_job(job)
+            done += 1
+        except Exception as e:
+            logger.error(f"Error en exportación {job.pk}: {e}", exc_info=True)
+            job.status = 'FAILED'
+            job.error = str(e)
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'error', 'finished_at'])
+            failed += 1
+
+    return done, failed
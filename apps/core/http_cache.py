@@ -0,0 +1,69 @@
+"""
+Caché HTTP condicional de las páginas de catálogo
+
+`conditional_page(freshness)` envuelve una vista con django.views.decorators.http.condition:
+
+- `freshness(request, *args, **kwargs)` hace UN aggregate barato (conteos y
+  Max('updated_at')) que cambia cuando cambia algo que la página muestra
+- ETag: hash del aggregate. Last-Modified: la fecha más reciente del aggregate
+- Si el navegador o Apache envían el mismo ETag (o la página no cambió desde
+  If-Modified-Since) se responde 304 sin ejecutar la vista ni renderizar
+
+Las páginas no tienen nada del visitante (ver apps/core/page_cache.py), así
+que la respuesta es `public`: Apache y los navegadores la pueden guardar.
+max-age es CATALOG_CACHE_MAX_AGE y siempre `must-revalidate`, así que al
+vencer se revalida con el ETag.
+"""
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+
+class _PageState:
+    """Aggregate de frescura, calculado una vez por petición"""
+
+    def __init__(self, request, freshness, args, kwargs):
+        self.freshness = freshness(request, *args, **kwargs)
+
+    def etag(self):
+        key = repr(sorted(self.freshness.items()))
+        return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+    def last_modified(self):
+        dates = [value for value in self.freshness.values() if isinstance(value, datetime)]
+        return max(dates) if dates else None
+
+
+def conditional_page(freshness):
+    """
+    Decorador de vistas GET del catálogo (ver docstring del módulo)
+
+    Args:
+        freshness: Callable(request, *args, **kwargs) -> dict del aggregate
+    """
+
+    def decorator(view_func):
+        def page_state(request, *args, **kwargs):
+            if not hasattr(request, '_page_state'):
+                request._page_state = _PageState(request, freshness, args, kwargs)
+            return request._page_state
+
+        conditional_view = condition(
+            etag_func=lambda request, *args, **kwargs: page_state(request, *args, **kwargs).etag(),
+            last_modified_func=lambda request, *args, **kwargs: page_state(request, *args, **kwargs).last_modified(),
+        )(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD') and response.status_code in (200, 304):
+                patch_cache_control(response, public=True, max_age=settings.CATALOG_CACHE_MAX_AGE, must_revalidate=True)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,390 @@
+"""
+Pruebas de carga con recorridos de usuario
+
+Cada usuario virtual (un hilo con su propio cliente HTTP, cookies de sesión
+y CSRF) repite el recorrido de un cliente de la tienda contra una instancia
+en ejecución:
+
+1. home, catálogo, categoría y detalle de producto, cada página seguida del
+   fragmento del visitante que pide static/js/main.js (core:visitor_fragment)
+2. agregar al carrito y actualizar cantidad con los endpoints JSON que usa
+   static/js/cart.js (/tienda/api/cart/...)
+3. abrir el checkout, tokenizar la tarjeta (CARD) y pagar (CARD o PSE)
+
+El pago crea pedidos reales: la instancia debe apuntar WOMPI_API_BASE_URL al
+Wompi simulado (run_fake_wompi), donde la tarjeta 4242424242424242 y el
+banco PSE "1" aprueban.
+
+Por paso se reporta throughput, percentiles de latencia y tasa de errores.
+Para dimensionar los workers de Passenger: subir --concurrency hasta que el
+p95 o los errores se disparen.
+"""
+import random
+import re
+import threading
+import time
+
+import httpx
+from django.urls import reverse
+
+from .benchmarking import latency_summary
+
+# Pasos en el orden del recorrido (orden del reporte)
+STEPS = [
+    'home',
+    'visitor',
+    'catalog',
+    'category',
+    'detail',
+    'cart_add',
+    'cart_get',
+    'cart_update',
+    'checkout',
+    'tokenize_card',
+    'pay',
+    'payment_result',
+]
+
+TEST_CARD = {
+    'number': '4242424242424242',
+    'cvc': '123',
+    'exp_month': '12',
+    'exp_year': '30',
+    'card_holder': 'Prueba Carga',
+}
+TEST_PSE_BANK = '1'
+
+ADD_TO_CART_RE = re.compile(r'/cart/add/(\d+)/')
+OUT_OF_STOCK_RE = re.compile(r'id="addToCartBtn"\s+disabled')
+IDEMPOTENCY_RE = re.compile(r'name="idempotency_key" value="([^"]*)"')
+CSRF_INPUT_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class JourneyError(Exception):
+    """Un paso falló: el usuario virtual abandona el recorrido"""
+
+
+# ==========================================
+# RESULTADOS
+# ==========================================
+
+class LoadTestResults:
+    """Mediciones por paso, compartidas entre los hilos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.steps = {}
+        self.journeys_completed = 0
+        self.journeys_failed = 0
+        self.errors = {}
+
+    def record(self, step, seconds, status, ok, error=None):
+        with self._lock:
+            stats = self.steps.setdefault(step, {'latencies': [], 'errors': 0, 'status_codes': {}})
+            stats['latencies'].append(seconds)
+            stats['status_codes'][status] = stats['status_codes'].get(status, 0) + 1
+            if not ok:
+                stats['errors'] += 1
+                if error:
+                    key = f'{step}: {error}'
+                    self.errors[key] = self.errors.get(key, 0) + 1
+
+    def journey_done(self, ok):
+        with self._lock:
+            if ok:
+                self.journeys_completed += 1
+            else:
+                self.journeys_failed += 1
+
+    @property
+    def requests(self):
+        with self._lock:
+            return sum(len(stats['latencies']) for stats in self.steps.values())
+
+    def report(self, elapsed):
+        """Reporte por paso: peticiones, errores, req/s y latencias (ms)"""
+        steps = []
+        with self._lock:
+            for step in STEPS + sorted(set(self.steps) - set(STEPS)):
+                stats = self.steps.get(step)
+                if not stats:
+                    continue
+                count = len(stats['latencies'])
+                steps.append({
+                    'step': step,
+                    'requests': count,
+                    'errors': stats['errors'],
+                    'error_rate': round(stats['errors'] / count * 100, 2),
+                    'throughput': round(count / elapsed, 2) if elapsed else 0.0,
+                    'latency_ms': latency_summary(stats['latencies']),
+                    'status_codes': {str(code): total for code, total in sorted(stats['status_codes'].items(), key=str)},
+                })
+            journeys = self.journeys_completed + self.journeys_failed
+            return {
+                'elapsed_seconds': round(elapsed, 2),
+                'journeys': {
+                    'completed': self.journeys_completed,
+                    'failed': self.journeys_failed,
+                    'per_second': round(journeys / elapsed, 2) if elapsed else 0.0,
+                },
+                'requests': sum(step['requests'] for step in steps),
+                'throughput': round(sum(step['requests'] for step in steps) / elapsed, 2) if elapsed else 0.0,
+                'steps': steps,
+                'top_errors': sorted(self.errors.items(), key=lambda item: item[1], reverse=True)[:10],
+            }
+
+
+# ==========================================
+# RECORRIDO
+# ==========================================
+
+class StorefrontJourney:
+    """Recorrido de un cliente: navegar, armar el carrito y pagar"""
+
+    def __init__(self, client, results, rng, payment_methods=('CARD',), checkout_ratio=1.0, think_time=0.0):
+        self.client = client
+        self.results = results
+        self.rng = rng
+        self.payment_methods = payment_methods
+        self.checkout_ratio = checkout_ratio
+        self.think_time = think_time
+        self.base_url = str(client.base_url).rstrip('/')
+
+    def request(self, step, method, path, expect=(200,), check=None, **kwargs):
+        """
+        Petición medida; lanza JourneyError si falla
+
+        Args:
+            expect: Códigos HTTP válidos
+            check: Callable(response) que devuelve un mensaje de error o None
+        """
+        headers = kwargs.pop('headers', {})
+        if method != 'GET':
+            # Django valida CSRF con la cookie + header/campo, y el Referer en HTTPS
+            headers.setdefault('X-CSRFToken', self.client.cookies.get('csrftoken', ''))
+            headers.setdefault('Referer', f'{self.base_url}{path}')
+
+        started = time.perf_counter()
+        try:
+            response = self.client.request(method, path, headers=headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.results.record(step, time.perf_counter() - started, 'exception', False, type(e).__name__)
+            raise JourneyError(f'{step}: {e}')
+        elapsed = time.perf_counter() - started
+
+        error = None if response.status_code in expect else f'HTTP {response.status_code}'
+        if error is None and check:
+            error = check(response)
+        self.results.record(step, elapsed, response.status_code, error is None, error)
+        if error:
+            raise JourneyError(f'{step}: {error}')
+        return response
+
+    def page(self, step, path):
+        """Página HTML y el fragmento del visitante que main.js pide después (crea la cookie CSRF)"""
+        response = self.request(step, 'GET', path)
+        self.request('visitor', 'GET', reverse('core:visitor_fragment'))
+        return response
+
+    def think(self):
+        if self.think_time:
+            time.sleep(self.rng.uniform(0.5, 1.5) * self.think_time)
+
+    def links(self, html, prefix, exclude=()):
+        """Rutas internas que empiezan con `prefix` (sin las de `exclude`)"""
+        found = set(re.findall(rf'href="({re.escape(prefix)}[\w-]+/)"', html))
+        return sorted(path for path in found if not path.startswith(exclude))
+
+    def run(self):
+        """Ejecutar el recorrido completo; devuelve False si algún paso falló"""
+        try:
+            self.browse_and_fill_cart()
+            if self.rng.random() < self.checkout_ratio:
+                self.checkout_and_pay()
+        except JourneyError:
+            return False
+        return True
+
+    def browse_and_fill_cart(self):
+        catalog_path = reverse('products:product_list')
+        category_prefix = reverse('products:product_category', args=['x'])[:-2]
+        non_product = (
+            category_prefix,
+            reverse('products:cart_view'),
+            reverse('products:checkout'),
+            reverse('products:api_get_cart')[:-len('cart/')],
+        )
+
+        self.page('home', reverse('core:home'))
+        self.think()
+        catalog = self.page('catalog', catalog_path).text
+        self.think()
+
+        categories = self.links(catalog, category_prefix)
+        products = self.links(catalog, catalog_path, exclude=non_product)
+        if categories:
+            html = self.page('category', self.rng.choice(categories)).text
+            products = self.links(html, catalog_path, exclude=non_product) or products
+            self.think()
+        if not products:
+            raise JourneyError('catalog: sin productos')
+
+        # Detalle hasta encontrar un producto con stock (máximo 3 intentos)
+        product_id = None
+        for path in self.rng.sample(products, min(3, len(products))):
+            html = self.page('detail', path).text
+            match = ADD_TO_CART_RE.search(html)
+            if match and not OUT_OF_STOCK_RE.search(html):
+                product_id = int(match.group(1))
+                break
+            self.think()
+        if product_id is None:
+            raise JourneyError('detail: sin productos con stock')
+        self.think()
+
+        added = self.request(
+            'cart_add', 'POST', reverse('products:api_add_to_cart', args=[product_id]),
+            headers={'Content-Type': 'application/json'},
+        ).json()
+        self.request('cart_get', 'GET', reverse('products:api_get_cart'))
+        item_id = (added.get('item') or {}).get('id')
+        if item_id and self.rng.random() < 0.5:
+            self.request(
+                'cart_update', 'POST', reverse('products:api_update_cart_item', args=[item_id]),
+                data={'quantity': 2},
+            )
+        self.think()
+
+    def checkout_and_pay(self):
+        checkout_path = reverse('payments:checkout')
+        html = self.page('checkout', checkout_path).text
+        key = IDEMPOTENCY_RE.search(html)
+        csrf = CSRF_INPUT_RE.search(html)
+        self.think()
+
+        method = self.rng.choice(self.payment_methods)
+        data = {
+            'csrfmiddlewaretoken': csrf.group(1) if csrf else self.client.cookies.get('csrftoken', ''),
+            'idempotency_key': key.group(1) if key else '',
+            'payment_method': method,
+            'customer_name': 'Prueba Carga',
+            'customer_email': f'carga{self.rng.randrange(10 ** 6)}@example.com',
+            'customer_phone': '3001234567',
+        }
+        if method == 'CARD':
+            token = self.request(
+                'tokenize_card', 'POST', reverse('payments:tokenize_card'), json=TEST_CARD,
+            ).json().get('token')
+            if not token:
+                raise JourneyError('tokenize_card: sin token')
+            data.update({'card_token': token, 'installments': 1})
+        else:
+            data.update({
+                'pse_bank': TEST_PSE_BANK,
+                'pse_user_type': '0',
+                'pse_document_type': 'CC',
+                'pse_document_number': '1000000000',
+            })
+
+        # De vuelta al checkout o al catálogo = el pago no se creó (error en messages)
+        rejected = (checkout_path, reverse('products:product_list'))
+
+        def check_payment(response):
+            if response.headers.get('Location', '').endswith(rejected):
+                return 'redirigido al checkout'
+            return None
+
+        response = self.request(
+            'pay', 'POST', reverse('payments:process_payment'),
+            expect=(302,), check=check_payment, data=data,
+        )
+        location = response.headers.get('Location', '')
+
+        # Resultado local (tarjeta); PSE redirige al banco (externo)
+        if location.startswith('/') or location.startswith(self.base_url):
+            self.request('payment_result', 'GET', location)
+
+
+# ==========================================
+# EJECUCIÓN
+# ==========================================
+
+def run_load_test(
+    base_url,
+    concurrency=10,
+    duration=60.0,
+    journeys=None,
+    ramp_up=0.0,
+    think_time=0.0,
+    payment_methods=('CARD',),
+    checkout_ratio=1.0,
+    seed=None,
+    verify=True,
+    timeout=30.0,
+    progress=None,
+):
+    """
+    Ejecutar recorridos con `concurrency` usuarios virtuales
+
+    Args:
+        base_url: URL de la instancia, ej: https://staging.example.com
+        duration: Segundos de prueba (None = hasta completar `journeys`)
+        journeys: Máximo de recorridos en total (None = sin límite)
+        ramp_up: Segundos en los que se van sumando los usuarios
+        think_time: Pausa promedio entre pasos (s)
+        payment_methods: Métodos de pago a sortear ('CARD', 'PSE')
+        checkout_ratio: Fracción de recorridos que llegan a pagar
+        verify: Validar el certificado TLS
+        progress: Callable(results, elapsed) llamado cada ~5 segundos
+
+    Returns:
+        Reporte de LoadTestResults.report()
+    """
+    if duration is None and journeys is None:
+        raise ValueError('Se necesita duration o journeys')
+
+    results = LoadTestResults()
+    stop = threading.Event()
+    lock = threading.Lock()
+    started_journeys = [0]
+
+    def claim_journey():
+        with lock:
+            if journeys is not None and started_journeys[0] >= journeys:
+                return False
+            started_journeys[0] += 1
+            return True
+
+    def worker(index):
+        rng = random.Random(None if seed is None else seed + index)
+        if ramp_up:
+            stop.wait(ramp_up * index / max(1, concurrency))
+        while not stop.is_set() and claim_journey():
+            # Cliente nuevo por recorrido: cada uno es un visitante con sesión propia
+            with httpx.Client(base_url=base_url, verify=verify, timeout=timeout, follow_redirects=False) as client:
+                journey = StorefrontJourney(
+                    client, results, rng,
+                    payment_methods=payment_methods,
+                    checkout_ratio=checkout_ratio,
+                    think_time=think_time,
+                )
+                results.journey_done(journey.run())
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(max(1, concurrency))]
+    for thread in threads:
+        thread.start()
+
+    deadline = started + duration if duration else None
+    next_progress = started + 5
+    while any(thread.is_alive() for thread in threads):
+        now = time.perf_counter()
+        if deadline and now >= deadline:
+            # Los usuarios terminan el recorrido en curso y salen
+            stop.set()
+        if progress and now >= next_progress:
+            progress(results, now - started)
+            next_progress += 5
+        time.sleep(0.2)
+
+    return results.report(time.perf_counter() - started)
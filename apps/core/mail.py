@@ -0,0 +1,185 @@
+"""
+Outbox transaccional de emails
+
+Las vistas no hablan con el servidor SMTP: `queue_email` guarda el mensaje ya
+renderizado en la tabla OutboundEmail dentro de la misma transacción del
+negocio (orden, pago, mensaje de contacto). El comando `send_queued_emails`
+los entrega por lotes reutilizando una sola conexión SMTP, con reintentos
+con backoff y descarte (DEAD) tras EMAIL_OUTBOX_MAX_ATTEMPTS fallos.
+
+La conversación SMTP nunca corre dentro de una transacción: el lote se
+reclama en una transacción corta (SENDING con una concesión de
+EMAIL_OUTBOX_LEASE_SECONDS en next_attempt_at), se envía ya confirmado y el
+resultado de cada email se guarda con un UPDATE propio. Si el worker muere a
+mitad de lote, los emails siguen en SENDING y se reclaman al vencer la
+concesión (pueden enviarse dos veces, nunca quedar perdidos).
+
+Cron sugerido en cPanel (cada minuto):
+    * * * * * cd /home4/gatewayi/gateway_app && python manage.py send_queued_emails
+"""
+import logging
+import os
+from datetime import timedelta
+from email.mime.image import MIMEImage
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+# Backoff entre reintentos: 1, 2, 4, 8... minutos, máximo 1 hora
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 3600
+
+
+def queue_email(subject, to, html_body='', body='', from_email=None, inline_images=None):
+    """
+    Encolar un email para envío en segundo plano
+
+    Args:
+        subject: Asunto
+        to: Lista de destinatarios
+        html_body: Contenido HTML ya renderizado
+        body: Texto plano (fallback)
+        from_email: Remitente (DEFAULT_FROM_EMAIL si no se indica)
+        inline_images: Lista de dicts {'path', 'cid', 'filename'} con rutas
+                       relativas a BASE_DIR para adjuntar como imágenes embebidas
+
+    Returns:
+        OutboundEmail creado
+    """
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+        inline_images=inline_images or [],
+    )
+
+
+def build_message(outbound_email, connection=None):
+    """Construir el EmailMultiAlternatives de un email encolado"""
+    email = EmailMultiAlternatives(
+        subject=outbound_email.subject,
+        body=outbound_email.body,
+        from_email=outbound_email.from_email,
+        to=outbound_email.to,
+        connection=connection,
+    )
+
+    if outbound_email.html_body:
+        email.attach_alternative(outbound_email.html_body, "text/html")
+
+    for image in outbound_email.inline_images:
+        image_path = os.path.join(settings.BASE_DIR, image['path'])
+        if not os.path.exists(image_path):
+            continue
+        with open(image_path, 'rb') as img:
+            mime_image = MIMEImage(img.read())
+        mime_image.add_header('Content-ID', f"<{image['cid']}>")
+        mime_image.add_header('Content-Disposition', 'inline', filename=image.get('filename', ''))
+        email.attach(mime_image)
+
+    return email
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def claim_queued_emails(batch_size):
+    """
+    Reclamar un lote de emails pendientes (o con la concesión vencida)
+
+    Transacción corta con SKIP LOCKED para que varios workers no reclamen el
+    mismo mensaje; al confirmarse, las filas quedan en SENDING.
+
+    Returns:
+        Lista de OutboundEmail reclamados
+    """
+    with transaction.atomic():
+        now = timezone.now()
+        claimed = list(
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status__in=('PENDING', 'SENDING'), next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if claimed:
+            lease_until = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+            OutboundEmail.objects.filter(pk__in=[e.pk for e in claimed]).update(
+                status='SENDING', next_attempt_at=lease_until
+            )
+    return claimed
+
+
+def _record_result(outbound_email, **fields):
+    """Guardar el resultado si el email sigue reclamado (requeue del admin mientras tanto)"""
+    OutboundEmail.objects.filter(pk=outbound_email.pk, status='SENDING').update(**fields)
+
+
+def deliver_queued_emails(batch_size=None):
+    """
+    Entregar un lote de emails pendientes usando una sola conexión SMTP
+
+    Returns:
+        Tupla (enviados, fallidos, descartados)
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    max_attempts = settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    sent_count = failed_count = dead_count = 0
+
+    claimed = claim_queued_emails(batch_size)
+    if not claimed:
+        return 0, 0, 0
+
+    # Fuera de toda transacción: ni filas bloqueadas ni transacción abierta durante el SMTP
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        connection_error = None
+    except Exception as e:
+        logger.error(f"No se pudo abrir la conexión SMTP: {e}", exc_info=True)
+        connection_error = e
+
+    try:
+        for outbound_email in claimed:
+            try:
+                if connection_error:
+                    raise connection_error
+                build_message(outbound_email, connection=connection).send()
+            except Exception as e:
+                attempts = outbound_email.attempts + 1
+                if attempts >= max_attempts:
+                    _record_result(outbound_email, attempts=attempts, last_error=str(e), status='DEAD')
+                    dead_count += 1
+                    logger.error(f"Email {outbound_email.id} descartado tras {attempts} intentos: {e}")
+                else:
+                    _record_result(
+                        outbound_email, attempts=attempts, last_error=str(e), status='PENDING',
+                        next_attempt_at=timezone.now() + _retry_delay(attempts),
+                    )
+                    failed_count += 1
+                    logger.warning(f"Error enviando email {outbound_email.id} (intento {attempts}): {e}")
+            else:
+                _record_result(outbound_email, status='SENT', sent_at=timezone.now())
+                sent_count += 1
+    finally:
+        if not connection_error:
+            connection.close()
+
+    logger.info(f"Outbox: {sent_count} enviado(s), {failed_count} reintento(s), {dead_count} descartado(s)")
+    return sent_count, failed_count, dead_count
+
+
+def requeue_emails(queryset):
+    """Volver a encolar emails (ej: descartados) para un nuevo ciclo de intentos"""
+    # SENDING: un worker los está enviando; si murió, se reclaman solos al vencer la concesión
+    return queryset.exclude(status__in=('SENT', 'SENDING')).update(
+        status='PENDING', attempts=0, last_error='', next_attempt_at=timezone.now()
+    )
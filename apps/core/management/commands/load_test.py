@@ -0,0 +1,98 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.benchmarking import format_latency_summary
+from apps.core.load_testing import run_load_test
+
+PAYMENT_METHODS = ('CARD', 'PSE')
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de carga: usuarios virtuales navegan, arman el carrito y pagan contra una instancia '
+        'en ejecución (con WOMPI_API_BASE_URL apuntando a run_fake_wompi)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('base_url', help='URL de la instancia, ej: https://staging.example.com')
+        parser.add_argument('--concurrency', type=int, default=10, help='Usuarios virtuales en paralelo')
+        parser.add_argument('--duration', type=float, default=60.0, help='Segundos de prueba (0 = hasta --journeys)')
+        parser.add_argument('--journeys', type=int, default=None, help='Máximo de recorridos en total')
+        parser.add_argument('--ramp-up', type=float, default=0.0, help='Segundos en los que se suman los usuarios')
+        parser.add_argument('--think-ms', type=float, default=0.0, help='Pausa promedio entre pasos (ms)')
+        parser.add_argument(
+            '--payment-methods',
+            default='CARD,PSE',
+            help='Métodos de pago a sortear, separados por coma (CARD, PSE)'
+        )
+        parser.add_argument(
+            '--checkout-ratio',
+            type=float,
+            default=1.0,
+            help='Fracción de recorridos que llegan a pagar (0 = solo navegar y carrito)'
+        )
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--timeout', type=float, default=30.0, help='Timeout por petición (s)')
+        parser.add_argument('--insecure', action='store_true', help='No validar el certificado TLS')
+        parser.add_argument('--json', action='store_true', help='Imprimir el reporte como JSON')
+
+    def handle(self, *args, **options):
+        methods = tuple(method.strip().upper() for method in options['payment_methods'].split(',') if method.strip())
+        invalid = set(methods) - set(PAYMENT_METHODS)
+        if not methods or invalid:
+            raise CommandError(f'Métodos de pago soportados: {", ".join(PAYMENT_METHODS)}')
+
+        duration = options['duration'] or None
+        if duration is None and not options['journeys']:
+            raise CommandError('Indica --duration o --journeys')
+
+        def progress(results, elapsed):
+            if not options['json']:
+                self.stdout.write(
+                    f'  {elapsed:.0f}s: {results.journeys_completed} recorridos, '
+                    f'{results.journeys_failed} fallidos, {results.requests} peticiones'
+                )
+
+        if not options['json']:
+            self.stdout.write(
+                f"Prueba de carga contra {options['base_url']} con {options['concurrency']} usuarios "
+                f"({', '.join(methods)}, checkout {options['checkout_ratio']:.0%})..."
+            )
+
+        report = run_load_test(
+            options['base_url'],
+            concurrency=options['concurrency'],
+            duration=duration,
+            journeys=options['journeys'],
+            ramp_up=options['ramp_up'],
+            think_time=options['think_ms'] / 1000,
+            payment_methods=methods,
+            checkout_ratio=options['checkout_ratio'],
+            seed=options['seed'],
+            verify=not options['insecure'],
+            timeout=options['timeout'],
+            progress=progress,
+        )
+        report['concurrency'] = options['concurrency']
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        journeys = report['journeys']
+        self.stdout.write(
+            f"Tiempo: {report['elapsed_seconds']}s | Recorridos: {journeys['completed']} completos, "
+            f"{journeys['failed']} fallidos ({journeys['per_second']}/s) | "
+            f"Peticiones: {report['requests']} ({report['throughput']} req/s)"
+        )
+        for step in report['steps']:
+            line = (
+                f"{step['step']:<15} {step['requests']:>7} req {step['throughput']:>8} req/s "
+                f"{step['error_rate']:>6}% err | {format_latency_summary(step['latency_ms'])}"
+            )
+            self.stdout.write(self.style.ERROR(line) if step['errors'] else line)
+        if report['top_errors']:
+            self.stdout.write('Errores más frecuentes:')
+            for error, count in report['top_errors']:
+                self.stdout.write(f'  {count}x {error}')
@@ -0,0 +1,74 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.prerender import clear, prerender_catalog, set_active
+
+
+class Command(BaseCommand):
+    help = 'Pre-renderiza tienda y servicios a HTML estático que Apache sirve sin Django (usar desde cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Procesos de render en paralelo'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Renderizar todas las páginas, no solo las que cambiaron'
+        )
+        parser.add_argument(
+            '--activate',
+            action='store_true',
+            help='Al terminar, hacer que Apache sirva las páginas estáticas (picos, caídas)'
+        )
+        parser.add_argument(
+            '--deactivate',
+            action='store_true',
+            help='Volver a servir el catálogo desde Django (sin renderizar)'
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Borrar todas las páginas pre-renderizadas (sin renderizar)'
+        )
+
+    def handle(self, *args, **options):
+        if options['activate'] and (options['deactivate'] or options['clear']):
+            raise CommandError('--activate no se puede combinar con --deactivate ni --clear')
+        if options['processes'] < 1:
+            raise CommandError('--processes debe ser al menos 1')
+
+        if options['deactivate'] or options['clear']:
+            set_active(False)
+            if options['clear']:
+                clear()
+            self.stdout.write(self.style.SUCCESS('Catálogo servido por Django'))
+            return
+
+        started = time.monotonic()
+        last_report = [0]
+
+        def progress(done, total):
+            # Un mensaje cada ~10%
+            if done == total or done - last_report[0] >= max(total // 10, 1):
+                last_report[0] = done
+                self.stdout.write(f'  {done}/{total} ({time.monotonic() - started:.0f}s)')
+
+        result = prerender_catalog(processes=options['processes'], full=options['full'], progress=progress)
+        for path, error in sorted(result['errors'].items()):
+            self.stderr.write(f'  {path}: {error}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Páginas: {result["pages"]} | Renderizadas: {result["rendered"]} | '
+            f'Escritas: {result["written"]} | Borradas: {result["removed"]} | '
+            f'Fallidas: {len(result["errors"])} ({time.monotonic() - started:.0f}s)'
+        ))
+
+        if options['activate']:
+            set_active(True)
+            self.stdout.write(self.style.SUCCESS('Apache sirve ahora el catálogo pre-renderizado'))
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core.exports import process_export_jobs
+
+
+class Command(BaseCommand):
+    help = 'Genera las exportaciones CSV en cola y avisa por email (usar desde cron o en modo --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=5,
+            help='Exportaciones a procesar por corrida'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Seguir revisando la cola indefinidamente'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=10.0,
+            help='Segundos de espera cuando la cola está vacía (con --loop)'
+        )
+
+    def handle(self, *args, **options):
+        total_done = 0
+        total_failed = 0
+
+        while True:
+            done, failed = process_export_jobs(options['limit'])
+            total_done += done
+            total_failed += failed
+
+            if done + failed < options['limit']:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Exportaciones generadas: {total_done} | Fallidas: {total_failed}'))
@@ -0,0 +1,85 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.page_cache import invalidate_pages
+from apps.core.synthetic_data import SYNTHETIC_PASSWORD, SyntheticDataGenerator
+
+
+class Command(BaseCommand):
+    help = 'Siembra un dataset sintético masivo y determinista (catálogo, usuarios, carritos, pedidos) para perfilado y pruebas de carga'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Semilla del generador (misma semilla, mismos datos)')
+        parser.add_argument('--prefix', default=None, help='Prefijo de SKU/usuarios/órdenes (por defecto syn<seed>)')
+        parser.add_argument('--categories', type=int, default=12, help='Categorías de productos')
+        parser.add_argument('--products', type=int, default=20000, help='Productos')
+        parser.add_argument('--images', type=int, default=3, help='Imágenes por producto')
+        parser.add_argument('--users', type=int, default=5000, help='Usuarios (con direcciones e historial de login)')
+        parser.add_argument('--carts', type=int, default=2000, help='Carritos abiertos')
+        parser.add_argument('--orders', type=int, default=200000, help='Pedidos (con items, pago y webhook)')
+        parser.add_argument('--days', type=int, default=365, help='Días hacia atrás en los que se reparten las fechas')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Filas por bulk_create / transacción')
+        parser.add_argument(
+            '--rollups',
+            action='store_true',
+            help='Recalcular los rollups diarios de ventas al terminar'
+        )
+
+    def handle(self, *args, **options):
+        if options['categories'] < 1 or options['products'] < 1:
+            raise CommandError('Se necesita al menos una categoría y un producto')
+
+        started = time.monotonic()
+        last_report = {}
+
+        def progress(label, done, total):
+            # Un mensaje cada ~10% por tipo de fila
+            step = max(total // 10, 1)
+            if done == total or done - last_report.get(label, 0) >= step:
+                last_report[label] = done
+                self.stdout.write(f'  {label}: {done}/{total} ({time.monotonic() - started:.0f}s)')
+
+        generator = SyntheticDataGenerator(
+            seed=options['seed'],
+            prefix=options['prefix'],
+            chunk_size=options['chunk_size'],
+            days=options['days'],
+            progress=progress,
+        )
+        if generator.already_seeded():
+            raise CommandError(
+                f'Ya existen datos con el prefijo "{generator.prefix}". Usa otra --seed o --prefix.'
+            )
+
+        self.stdout.write(f'Sembrando datos sintéticos (semilla {generator.seed}, prefijo {generator.prefix})...')
+        counts = generator.run(
+            categories=options['categories'],
+            products=options['products'],
+            users=options['users'],
+            carts=options['carts'],
+            orders=options['orders'],
+            images_per_product=options['images'],
+        )
+        # bulk_create no envía signals
+        invalidate_pages()
+
+        if options['rollups'] and options['orders']:
+            from datetime import timedelta
+
+            from apps.payments.services.rollups import rebuild_day
+
+            day = generator.anchor.date() - timedelta(days=options['days'])
+            while day <= generator.anchor.date():
+                rebuild_day(day)
+                day += timedelta(days=1)
+            self.stdout.write(f'  rollups recalculados ({options["days"] + 1} días)')
+
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'Datos sintéticos creados en {time.monotonic() - started:.0f}s: {summary}'
+        ))
+        if options['users']:
+            self.stdout.write(
+                f'Usuarios: {generator.prefix}-user0000000 ... (contraseña "{SYNTHETIC_PASSWORD}")'
+            )
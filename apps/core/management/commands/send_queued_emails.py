@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.core.mail import deliver_queued_emails
+
+
+class Command(BaseCommand):
+    help = 'Entrega los emails encolados en el outbox (usar desde cron o en modo --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Emails enviados por conexión SMTP'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Seguir entregando indefinidamente en lugar de salir cuando la cola está vacía'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Segundos de espera entre lotes cuando la cola está vacía (con --loop)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        totals = [0, 0, 0]
+
+        while True:
+            result = deliver_queued_emails(batch_size)
+            totals = [total + count for total, count in zip(totals, result)]
+
+            if sum(result) < batch_size:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+        sent, failed, dead = totals
+        self.stdout.write(self.style.SUCCESS(
+            f'Emails enviados: {sent} | Reintentos programados: {failed} | Descartados: {dead}'
+        ))
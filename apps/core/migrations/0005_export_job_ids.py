@@ -0,0 +1,49 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fail_pickled_jobs(apps, schema_editor):
+    # Los jobs sin terminar guardaban el queryset en pickle: no se pueden convertir
+    ExportJob = apps.get_model('core', 'ExportJob')
+    ExportJob.objects.filter(status__in=['PENDING', 'RUNNING']).update(
+        status='FAILED',
+        error='Exportación en el formato anterior; vuelve a solicitarla',
+        finished_at=timezone.now(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_outbound_email_sending'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_pickled_jobs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='exportjob',
+            name='query',
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='model_label',
+            field=models.CharField(default='', help_text="Modelo exportado ('app.Modelo')", max_length=100),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='object_ids',
+            field=models.JSONField(default=list, encoder=DjangoJSONEncoder, help_text='Pks seleccionados, en orden'),
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
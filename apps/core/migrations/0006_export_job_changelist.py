@@ -0,0 +1,29 @@
+# Generated by Django 4.2.17 on 2026-10-19 09:11
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_export_job_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='changelist_params',
+            field=models.TextField(blank=True, help_text='Query string del changelist (filtros, búsqueda, orden)'),
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='select_across',
+            field=models.BooleanField(default=False, help_text='Todos los resultados del changelist: se exporta según changelist_params'),
+        ),
+        migrations.AlterField(
+            model_name='exportjob',
+            name='object_ids',
+            field=models.JSONField(blank=True, default=list, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Pks seleccionados a mano, en orden (hasta EXPORT_JOB_MAX_IDS)'),
+        ),
+    ]
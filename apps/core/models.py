@@ -1,5 +1,8 @@
 # apps/core/models.py
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 
 class CompanyInfo(models.Model):
     """Información general de la empresa (singleton)"""
@@ -88,4 +91,102 @@ class Brand(models.Model):
         verbose_name_plural = "Marcas"
     
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class OutboundEmail(models.Model):
+    """Email pendiente de envío (outbox transaccional)"""
+
+    STATUS_CHOICES = [
+        ('PENDING', 'Pendiente'),
+        ('SENDING', 'Enviando'),
+        ('SENT', 'Enviado'),
+        ('DEAD', 'Descartado'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True, help_text="Texto plano")
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(help_text="Lista de destinatarios")
+    inline_images = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Imágenes embebidas: [{'path': 'static/img/x.png', 'cid': 'logo', 'filename': 'logo.png'}]"
+    )
+
+    # Entrega
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # PENDING: próximo intento. SENDING: fin de la concesión del worker que lo reclamó
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Email en Cola"
+        verbose_name_plural = "Emails en Cola"
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.get_status_display()})"
+
+
+class ExportJob(models.Model):
+    """Exportación CSV en segundo plano (ver apps/core/exports.py)"""
+
+    STATUS_CHOICES = [
+        ('PENDING', 'Pendiente'),
+        ('RUNNING', 'En proceso'),
+        ('DONE', 'Lista'),
+        ('FAILED', 'Fallida'),
+    ]
+
+    export_class = models.CharField(max_length=200, help_text="Ruta de la clase CSVExport")
+    model_label = models.CharField(max_length=100, help_text="Modelo exportado ('app.Modelo')")
+    object_ids = models.JSONField(
+        default=list, encoder=DjangoJSONEncoder, blank=True,
+        help_text="Pks seleccionados a mano, en orden (hasta EXPORT_JOB_MAX_IDS)"
+    )
+    select_across = models.BooleanField(
+        default=False, help_text="Todos los resultados del changelist: se exporta según changelist_params"
+    )
+    changelist_params = models.TextField(blank=True, help_text="Query string del changelist (filtros, búsqueda, orden)")
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='export_jobs'
+    )
+    notify_email = models.EmailField(blank=True)
+
+    # Resultado
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    row_count = models.PositiveIntegerField(default=0)
+    filename = models.CharField(max_length=255, blank=True)
+    file_path = models.CharField(max_length=500, blank=True)
+    download_url = models.CharField(max_length=500, blank=True)
+    error = models.TextField(blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Exportación"
+        verbose_name_plural = "Exportaciones"
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"Exportación #{self.pk} - {self.filename or self.export_class} ({self.get_status_display()})"
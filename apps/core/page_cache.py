@@ -0,0 +1,142 @@
+"""
+Caché de página completa
+
+Las páginas de catálogo, servicios e inicio son iguales para todos los
+visitantes: usuario, carrito, mensajes y token CSRF llegan por
+core:visitor_fragment y los completa static/js/main.js. Por eso el HTML
+renderizado se puede guardar una vez y servir a todos. Sus plantillas
+reemplazan los bloques `visitor` y `messages` de base.html, que en el resto
+de páginas se renderizan en el servidor.
+
+`@full_page_cache` guarda en la caché PAGE_CACHE_ALIAS (archivos por
+defecto: compartida entre los workers de Passenger) las respuestas 200 de
+GET/HEAD que no crean cookies ni varían por cookie. En un acierto responde
+sin ejecutar la vista, con `X-Page-Cache: HIT` y 304 si el ETag o
+Last-Modified coinciden.
+
+Invalidación: las llaves incluyen una versión que se incrementa al guardar o
+borrar un modelo de PAGE_CACHE_MODELS (signals conectados en
+CoreConfig.ready). Las escrituras sin signals (bulk_create, update(), SQL
+directo) deben llamar a `invalidate_pages()`.
+
+La versión sube al confirmarse la transacción (on_commit) y los fallos de
+caché se renderizan desde el primario (use_primary): una petición con la
+versión nueva nunca lee datos anteriores al cambio, ni de una transacción sin
+confirmar ni de una réplica atrasada. La versión se lee antes de renderizar,
+así que lo renderizado durante el cambio queda bajo la versión vieja.
+"""
+import hashlib
+import logging
+from functools import wraps
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from .db_router import use_primary
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'page_cache_version'
+
+# Headers que se guardan con la página
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+
+def _cache():
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def page_cache_version():
+    """Versión actual de las páginas guardadas"""
+    cache = _cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def invalidate_pages():
+    """Descartar todas las páginas guardadas (las entradas viejas expiran solas)"""
+    cache = _cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+
+
+def page_cache_key(request, version=None):
+    url = f'{request.get_host()}{request.get_full_path()}'
+    digest = hashlib.md5(url.encode()).hexdigest()
+    return f'page:{version or page_cache_version()}:{digest}'
+
+
+def _cacheable(response):
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return False
+    if response.has_header('Vary') and 'cookie' in response['Vary'].lower():
+        return False
+    cache_control = response.get('Cache-Control', '').lower()
+    return 'private' not in cache_control and 'no-store' not in cache_control
+
+
+def full_page_cache(view_func):
+    """Decorador de vistas públicas (ver docstring del módulo)"""
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not settings.PAGE_CACHE_ENABLED or request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+
+        cache = _cache()
+        key = page_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            content, headers = cached
+            response = HttpResponse(content)
+            for name, value in headers.items():
+                response[name] = value
+            response['X-Page-Cache'] = 'HIT'
+            return get_conditional_response(
+                request,
+                etag=response.get('ETag'),
+                last_modified=parse_http_date_safe(response.get('Last-Modified')),
+                response=response,
+            )
+
+        with use_primary():
+            response = view_func(request, *args, **kwargs)
+        if _cacheable(response):
+            headers = {name: response[name] for name in STORED_HEADERS if response.has_header(name)}
+            cache.set(key, (response.content, headers), settings.PAGE_CACHE_TIMEOUT)
+            response['X-Page-Cache'] = 'MISS'
+        return response
+
+    return wrapper
+
+
+# ==========================================
+# INVALIDACIÓN
+# ==========================================
+
+def _invalidate_on_change(sender, **kwargs):
+    # Después del commit: antes, otra petición podría guardar los datos viejos con la versión nueva
+    transaction.on_commit(invalidate_pages)
+
+
+def connect_invalidation_signals():
+    """Invalidar las páginas al guardar o borrar un modelo de PAGE_CACHE_MODELS"""
+    for label in settings.PAGE_CACHE_MODELS:
+        try:
+            model = apps.get_model(label)
+        except LookupError:
+            logger.warning(f"PAGE_CACHE_MODELS: modelo '{label}' no existe")
+            continue
+        post_save.connect(_invalidate_on_change, sender=model, dispatch_uid=f'page_cache:save:{label}')
+        post_delete.connect(_invalidate_on_change, sender=model, dispatch_uid=f'page_cache:delete:{label}')
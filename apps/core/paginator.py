@@ -0,0 +1,143 @@
+"""
+Paginación para tablas grandes
+
+ApproximateCountPaginator (admin)
+---------------------------------
+
+En tablas grandes el `SELECT COUNT(*)` del changelist cuesta más que la página
+misma. ApproximateCountPaginator:
+
+- Sin filtros: usa el estimado de filas del motor (information_schema en
+  MySQL) si supera ADMIN_APPROXIMATE_COUNT_THRESHOLD.
+- Con filtros (o tabla chica): hace el COUNT exacto y lo guarda en caché
+  ADMIN_COUNT_CACHE_SECONDS segundos, así paginar no lo repite.
+
+Usar junto con `show_full_result_count = False` en el ModelAdmin.
+
+keyset_paginate (vistas de clientes)
+------------------------------------
+
+Paginación por cursor sobre (fecha, pk) descendente: cada página es un
+`WHERE (created_at, id) < (cursor)` que usa el índice, sin OFFSET ni COUNT,
+así la página 500 cuesta lo mismo que la primera.
+"""
+import base64
+import binascii
+import hashlib
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(model, using='default'):
+    """
+    Filas estimadas de la tabla según el motor, o None si no hay estimado
+
+    MySQL (InnoDB) devuelve un estimado de las estadísticas de la tabla; puede
+    desviarse un poco del valor real.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [table],
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class ApproximateCountPaginator(Paginator):
+    """Paginator con conteo estimado para tablas grandes y COUNT cacheado para el resto"""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is None:
+            return super().count
+
+        # Sin WHERE: se puede usar el estimado de la tabla
+        if not query.where:
+            estimate = estimated_row_count(queryset.model, using=queryset.db)
+            if estimate is not None and estimate >= settings.ADMIN_APPROXIMATE_COUNT_THRESHOLD:
+                return estimate
+
+        sql, params = query.sql_with_params()
+        cache_key = 'admin-count:' + hashlib.sha1(f'{queryset.db}:{sql}:{params}'.encode('utf-8')).hexdigest()
+        count = cache.get(cache_key)
+        if count is None:
+            count = queryset.count()
+            cache.set(cache_key, count, settings.ADMIN_COUNT_CACHE_SECONDS)
+        return count
+
+
+# ==========================================
+# PAGINACIÓN POR CURSOR (KEYSET)
+# ==========================================
+
+def encode_cursor(value, pk):
+    """Cursor opaco para la posición (value, pk)"""
+    raw = f'{value.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Posición (datetime, pk UUID) de un cursor
+
+    El cursor llega en la URL: cualquier valor alterado se trata como cursor
+    inválido (primera página) y no como error de la base de datos.
+
+    Returns:
+        Tupla (valor, pk) o None si el cursor no es válido
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, pk = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8').split('|', 1)
+        return datetime.fromisoformat(value), uuid.UUID(pk)
+    except (TypeError, ValueError, UnicodeError, binascii.Error):
+        return None
+
+
+def keyset_paginate(queryset, cursor=None, per_page=20, field='created_at'):
+    """
+    Página de `queryset` ordenada por (field, pk) descendente
+
+    Args:
+        cursor: Valor de `next_cursor` de la página anterior (None = primera página)
+
+    Returns:
+        Tupla (objetos, next_cursor). next_cursor es None en la última página.
+    """
+    queryset = queryset.order_by(f'-{field}', '-pk')
+
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None:
+        value, pk = position
+        queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}))
+
+    # Un objeto extra para saber si hay otra página sin hacer COUNT
+    objects = list(queryset[:per_page + 1])
+    if len(objects) <= per_page:
+        return objects, None
+
+    objects = objects[:per_page]
+    last = objects[-1]
+    return objects, encode_cursor(getattr(last, field), last.pk)
@@ -0,0 +1,357 @@
+"""
+Pre-render del catálogo a HTML estático
+
+Genera en PRERENDER_ROOT un `index.html` por página pública del catálogo y
+de servicios (primera página de los listados, categorías y detalles):
+
+    prerendered/tienda/index.html
+    prerendered/tienda/category/<slug>/index.html
+    prerendered/tienda/<slug>/index.html
+    prerendered/services/...
+
+El .htaccess sirve estos archivos directamente (sin Passenger) cuando existe
+`prerendered/.active`: durante picos o caídas Django solo atiende carrito,
+checkout, cuentas y core:visitor_fragment, que completa lo del visitante en
+las páginas estáticas (ver apps/core/page_cache.py).
+
+Las páginas se renderizan con las vistas reales (cliente HTTP interno de
+Django con PRERENDER_HOST), repartidas entre varios procesos.
+
+Incremental: manifest.json guarda cuándo empezó la corrida anterior y un
+hash por página. La siguiente corrida solo renderiza las páginas afectadas
+por productos, servicios o categorías con `updated_at` posterior, las
+páginas nuevas y las que fallaron; borra las de productos que ya no están
+activos. Un archivo solo se reescribe si su contenido cambió. Cambios que no
+tocan `updated_at` (bulk_create, update(), imágenes editadas fuera del
+producto) necesitan `--full`.
+"""
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connections
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+ACTIVE_FLAG = '.active'
+
+# Relacionados que muestran product_detail y service_detail
+RELATED_LIMIT = 4
+
+CHUNK_SIZE = 50
+
+
+# ==========================================
+# SECCIONES DEL SITIO
+# ==========================================
+
+@dataclass
+class Section:
+    """Listado, categorías y detalles de un modelo con categoría"""
+
+    name: str
+    model_label: str
+    category_label: str
+    list_url: str
+    category_url: str
+    detail_url: str
+
+    @property
+    def model(self):
+        from django.apps import apps
+        return apps.get_model(self.model_label)
+
+    @property
+    def category_model(self):
+        from django.apps import apps
+        return apps.get_model(self.category_label)
+
+    def list_pages(self):
+        """Listado y categorías activas: {ruta: None}"""
+        pages = {reverse(self.list_url): None}
+        for slug in self.category_model.objects.filter(active=True).values_list('slug', flat=True):
+            pages[reverse(self.category_url, args=[slug])] = None
+        return pages
+
+    def detail_pages(self):
+        """Detalles de los activos: {ruta: slug de la categoría}"""
+        rows = self.model.objects.filter(active=True).values_list('slug', 'category__slug')
+        return {reverse(self.detail_url, args=[slug]): category for slug, category in rows}
+
+    def top_slugs(self):
+        """
+        Por categoría, los que aparecen como relacionados en los detalles de
+        la misma categoría (los primeros RELATED_LIMIT + 1 en el orden del modelo)
+        """
+        top = {}
+        for category_id, category_slug in self.category_model.objects.values_list('id', 'slug'):
+            top[category_slug] = list(
+                self.model.objects.filter(category_id=category_id, active=True)
+                .values_list('slug', flat=True)[:RELATED_LIMIT + 1]
+            )
+        return top
+
+    def changes_since(self, since):
+        """([(slug, slug de la categoría)] de los modificados, slugs de las categorías modificadas)"""
+        changed = list(self.model.objects.filter(updated_at__gt=since).values_list('slug', 'category__slug'))
+        categories = set(self.category_model.objects.filter(updated_at__gt=since).values_list('slug', flat=True))
+        return changed, categories
+
+
+SECTIONS = [
+    Section('products', 'products.Product', 'products.ProductCategory',
+            'products:product_list', 'products:product_category', 'products:product_detail'),
+    Section('services', 'services.Service', 'services.ServiceCategory',
+            'services:service_list', 'services:service_category', 'services:service_detail'),
+]
+
+
+# ==========================================
+# PLAN
+# ==========================================
+
+def plan(manifest, full=False):
+    """
+    Rutas a renderizar y a borrar
+
+    Returns:
+        (pages, render, remove, top): todas las páginas {ruta: categoría},
+        las rutas a renderizar, las rutas a borrar y los top por sección
+    """
+    since = None if full else parse_datetime(manifest.get('started_at') or '')
+    previous = manifest.get('pages', {})
+    previous_top = manifest.get('top', {})
+
+    pages, render, top = {}, set(), {}
+    for section in SECTIONS:
+        list_pages = section.list_pages()
+        detail_pages = section.detail_pages()
+        top[section.name] = section.top_slugs()
+        pages.update(list_pages)
+        pages.update(detail_pages)
+
+        if since is None:
+            render.update(list_pages)
+            render.update(detail_pages)
+            continue
+
+        details_by_category = {}
+        for path, category in detail_pages.items():
+            details_by_category.setdefault(category, set()).add(path)
+
+        # Detalles que ya no existen: sus hermanos pueden mostrarlos como relacionados
+        removed_from = {previous[path].get('category') for path in previous
+                        if path not in pages and previous[path].get('category') and path.startswith(reverse(section.list_url))}
+        changed, changed_categories = section.changes_since(since)
+
+        if changed or changed_categories or removed_from:
+            # Listados y categorías: pocas páginas, todas muestran el menú de categorías
+            render.update(list_pages)
+
+        for category in changed_categories | removed_from:
+            render.update(details_by_category.get(category, ()))
+
+        old_top = previous_top.get(section.name, {})
+        for slug, category in changed:
+            path = reverse(section.detail_url, args=[slug])
+            if path in detail_pages:
+                render.add(path)
+            old_category = previous.get(path, {}).get('category')
+            for cat in {category, old_category} - {None}:
+                if slug in top[section.name].get(cat, ()) or slug in old_top.get(cat, ()):
+                    render.update(details_by_category.get(cat, ()))
+            if old_category and old_category != category:
+                render.update(details_by_category.get(old_category, ()))
+
+    # Nuevas o que fallaron en la corrida anterior
+    render.update(path for path in pages if path not in previous)
+    remove = {path for path in previous if path not in pages}
+    return pages, render, remove, top
+
+
+# ==========================================
+# RENDER
+# ==========================================
+
+def page_file(root, path):
+    return os.path.join(root, path.strip('/'), 'index.html')
+
+
+def _write_atomic(filename, content):
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    tmp = f'{filename}.tmp{os.getpid()}'
+    with open(tmp, 'wb') as fh:
+        fh.write(content)
+    os.replace(tmp, filename)
+
+
+def render_pages(root, paths):
+    """
+    Renderizar rutas con las vistas reales y escribir las que cambiaron
+
+    Returns:
+        Lista de (ruta, sha256 o None, error o None, escrito)
+    """
+    from django.test import Client
+
+    client = Client(HTTP_HOST=settings.PRERENDER_HOST, raise_request_exception=False)
+    secure = getattr(settings, 'SECURE_SSL_REDIRECT', False)
+    results = []
+    for path in paths:
+        try:
+            response = client.get(path, secure=secure)
+        except Exception as e:
+            logger.exception(f'Pre-render de {path} falló')
+            results.append((path, None, type(e).__name__, False))
+            continue
+        if response.status_code != 200:
+            results.append((path, None, f'HTTP {response.status_code}', False))
+            continue
+
+        digest = hashlib.sha256(response.content).hexdigest()
+        filename = page_file(root, path)
+        written = False
+        try:
+            with open(filename, 'rb') as fh:
+                unchanged = hashlib.sha256(fh.read()).hexdigest() == digest
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            _write_atomic(filename, response.content)
+            written = True
+        results.append((path, digest, None, written))
+    return results
+
+
+def _init_worker():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+
+
+def _render_chunk(args):
+    root, paths = args
+    try:
+        return render_pages(root, paths)
+    finally:
+        connections.close_all()
+
+
+def remove_page(root, path):
+    filename = page_file(root, path)
+    if os.path.exists(filename):
+        os.remove(filename)
+    # Directorios vacíos hasta la raíz
+    directory = os.path.dirname(filename)
+    while directory != root and os.path.isdir(directory) and not os.listdir(directory):
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
+
+
+# ==========================================
+# CORRIDA
+# ==========================================
+
+def load_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST_NAME), encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def prerender_catalog(root=None, processes=1, full=False, progress=None):
+    """
+    Pre-renderizar el catálogo (ver docstring del módulo)
+
+    Args:
+        root: Directorio de salida (PRERENDER_ROOT por defecto)
+        processes: Procesos de render (1: en este proceso)
+        full: Renderizar todo, ignorando el manifest
+        progress: Callable(hechas, total) opcional
+
+    Returns:
+        dict con pages, rendered, written, removed y errors
+    """
+    root = str(root or settings.PRERENDER_ROOT)
+    os.makedirs(root, exist_ok=True)
+    started_at = timezone.now()
+    manifest = load_manifest(root)
+
+    pages, render, remove, top = plan(manifest, full=full)
+    paths = sorted(render)
+    chunks = [(root, paths[i:i + CHUNK_SIZE]) for i in range(0, len(paths), CHUNK_SIZE)]
+
+    results = []
+    if processes > 1 and len(chunks) > 1:
+        # Cada proceso abre sus propias conexiones
+        connections.close_all()
+        with multiprocessing.Pool(processes, initializer=_init_worker) as pool:
+            for chunk_results in pool.imap_unordered(_render_chunk, chunks):
+                results.extend(chunk_results)
+                if progress:
+                    progress(len(results), len(paths))
+    else:
+        for chunk in chunks:
+            results.extend(render_pages(*chunk))
+            if progress:
+                progress(len(results), len(paths))
+
+    entries = {path: entry for path, entry in manifest.get('pages', {}).items() if path in pages}
+    errors = {}
+    for path, digest, error, _ in results:
+        if error:
+            errors[path] = error
+            # Sin entrada en el manifest: se reintenta en la próxima corrida
+            entries.pop(path, None)
+        else:
+            entries[path] = {'sha256': digest, 'category': pages[path]}
+
+    for path in remove:
+        remove_page(root, path)
+
+    _write_atomic(os.path.join(root, MANIFEST_NAME), json.dumps({
+        'started_at': started_at.isoformat(),
+        'finished_at': timezone.now().isoformat(),
+        'pages': dict(sorted(entries.items())),
+        'top': top,
+    }, indent=1, ensure_ascii=False).encode('utf-8'))
+
+    return {
+        'pages': len(pages),
+        'rendered': len(results) - len(errors),
+        'written': sum(1 for *_, written in results if written),
+        'removed': len(remove),
+        'errors': errors,
+    }
+
+
+def set_active(active, root=None):
+    """Crear o borrar la marca que hace que Apache sirva las páginas estáticas"""
+    root = str(root or settings.PRERENDER_ROOT)
+    flag = os.path.join(root, ACTIVE_FLAG)
+    if active:
+        os.makedirs(root, exist_ok=True)
+        with open(flag, 'w', encoding='utf-8') as fh:
+            fh.write(timezone.now().isoformat())
+    elif os.path.exists(flag):
+        os.remove(flag)
+
+
+def clear(root=None):
+    """Borrar todas las páginas pre-renderizadas"""
+    root = str(root or settings.PRERENDER_ROOT)
+    if os.path.isdir(root):
+        shutil.rmtree(root)
@@ -0,0 +1,249 @@
+"""
+Perfilado de peticiones
+
+ProfilingMiddleware mide, por petición:
+
+- Tiempo total de la vista
+- Queries SQL: cantidad, tiempo total y repetidas (mismo SQL y parámetros)
+- Tiempo de render de templates
+- Tiempo de llamadas HTTP salientes (spans, ej: 'wompi')
+
+y lo devuelve en el header `Server-Timing` (visible en las DevTools del
+navegador). Cada medición se guarda en un ring buffer en memoria; la página
+de staff `core:profiling_report` agrupa por nombre de URL y lista los
+endpoints más lentos.
+
+Se activa para todas las peticiones con PROFILING_ENABLED, o solo para staff
+enviando el header `X-Profile: 1` (PROFILING_ALLOW_HEADER).
+
+Los clientes HTTP registran su tiempo con:
+
+    with profiling.span('wompi'):
+        response = session.get(...)
+
+El buffer es por proceso: con varios workers de Passenger cada uno tiene el suyo.
+"""
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .benchmarking import percentile
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+_current_profile = ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    """Mediciones de una petición; también es el execute_wrapper de las conexiones"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.sql_seen = Counter()
+        self.spans = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.sql_count += 1
+            self.sql_seen[(sql, repr(params))] += 1
+
+    @property
+    def sql_duplicates(self):
+        """Ejecuciones repetidas de un mismo SQL con los mismos parámetros"""
+        return sum(count - 1 for count in self.sql_seen.values() if count > 1)
+
+    def add_span(self, name, seconds):
+        count, total = self.spans.get(name, (0, 0.0))
+        self.spans[name] = (count + 1, total + seconds)
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Valor del header Server-Timing (duraciones en ms)"""
+        parts = [
+            f'total;dur={self.total * 1000:.1f}',
+            f'sql;dur={self.sql_time * 1000:.1f};desc="{self.sql_count} queries, {self.sql_duplicates} repetidas"',
+        ]
+        for name, (count, seconds) in sorted(self.spans.items()):
+            parts.append(f'{name};dur={seconds * 1000:.1f};desc="{count}x"')
+        return ', '.join(parts)
+
+
+def current_profile():
+    """Perfil de la petición en curso, o None si no se está perfilando"""
+    return _current_profile.get()
+
+
+@contextmanager
+def span(name):
+    """Sumar el tiempo del bloque al span `name` de la petición perfilada (si hay)"""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(name, time.perf_counter() - start)
+
+
+# ==========================================
+# RING BUFFER
+# ==========================================
+
+class ProfileStore:
+    """Últimas PROFILING_BUFFER_SIZE mediciones del proceso"""
+
+    def __init__(self, size):
+        self._records = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self._records.append(record)
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def slowest_endpoints(self, sort='p95', limit=50):
+        """Mediciones agrupadas por nombre de URL, de la más lenta a la más rápida"""
+        grouped = {}
+        for record in self.records():
+            grouped.setdefault(record['endpoint'], []).append(record)
+
+        endpoints = []
+        for endpoint, records in grouped.items():
+            totals = [record['total_ms'] for record in records]
+            count = len(records)
+            spans = {}
+            for record in records:
+                for name, ms in record['spans'].items():
+                    spans[name] = spans.get(name, 0.0) + ms
+            endpoints.append({
+                'endpoint': endpoint,
+                'count': count,
+                'avg_ms': sum(totals) / count,
+                'p95_ms': percentile(totals, 95),
+                'max_ms': max(totals),
+                'total_ms': sum(totals),
+                'avg_queries': sum(record['sql_count'] for record in records) / count,
+                'avg_sql_ms': sum(record['sql_ms'] for record in records) / count,
+                'avg_duplicates': sum(record['sql_duplicates'] for record in records) / count,
+                'spans': {name: total / count for name, total in sorted(spans.items())},
+                'last_at': max(record['at'] for record in records),
+            })
+
+        endpoints.sort(key=lambda row: row[f'{sort}_ms'], reverse=True)
+        return endpoints[:limit]
+
+
+store = ProfileStore(settings.PROFILING_BUFFER_SIZE)
+
+
+# ==========================================
+# TIEMPO DE TEMPLATES
+# ==========================================
+
+_template_timing_installed = False
+
+
+def install_template_timing():
+    """
+    Medir el render de templates como span 'template'
+
+    Envuelve el Template del backend de Django (el que usan render() y
+    render_to_string), así los {% include %} no se cuentan dos veces.
+    """
+    global _template_timing_installed
+    if _template_timing_installed:
+        return
+
+    from django.template.backends.django import Template
+
+    original_render = Template.render
+
+    def render(self, context=None, request=None):
+        with span('template'):
+            return original_render(self, context, request)
+
+    Template.render = render
+    _template_timing_installed = True
+
+
+# ==========================================
+# MIDDLEWARE
+# ==========================================
+
+class ProfilingMiddleware:
+    """
+    Perfilado opt-in de peticiones (ver docstring del módulo)
+
+    Va después de AuthenticationMiddleware para poder revisar request.user.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_template_timing()
+
+    def should_profile(self, request):
+        if settings.PROFILING_ENABLED:
+            return True
+        if settings.PROFILING_ALLOW_HEADER and request.META.get(PROFILE_HEADER) == '1':
+            user = getattr(request, 'user', None)
+            return bool(user and user.is_staff)
+        return False
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+
+        profile.finish()
+        response['Server-Timing'] = profile.server_timing()
+
+        match = request.resolver_match
+        endpoint = match.view_name if match else request.path
+        if endpoint != 'core:profiling_report':
+            store.add({
+                'endpoint': endpoint,
+                'method': request.method,
+                'status': response.status_code,
+                'at': timezone.now(),
+                'total_ms': profile.total * 1000,
+                'sql_count': profile.sql_count,
+                'sql_ms': profile.sql_time * 1000,
+                'sql_duplicates': profile.sql_duplicates,
+                'spans': {name: seconds * 1000 for name, (_, seconds) in profile.spans.items()},
+            })
+
+        return response
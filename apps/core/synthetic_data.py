@@ -0,0 +1,574 @@
+"""
+Datos sintéticos a gran escala para perfilado y pruebas de carga
+
+SyntheticDataGenerator siembra catálogo, usuarios (con direcciones e
+historial de login), carritos y pedidos con items, pagos y webhooks por
+lotes: bulk_create para catálogo, usuarios y carritos, e INSERT directo con
+executemany para los pedidos, que son el grueso del volumen. Todo sale de
+un random.Random(seed): la misma semilla genera las mismas filas (las fechas
+son relativas al inicio del día actual).
+
+Las filas llevan el prefijo de la corrida (por defecto `syn<seed>`) en SKU,
+slug, usuario, número de orden y sesión de carrito, así no chocan con datos
+reales ni con otra semilla. Los números de orden sintéticos no consumen
+bloques de OrderNumberBlock.
+
+Los pedidos se generan por lotes de `chunk_size` en una transacción cada uno;
+la memoria no crece con la cantidad de pedidos.
+"""
+import hashlib
+import json
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from functools import lru_cache
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+SYNTHETIC_PASSWORD = 'synthetic-pass'
+
+# (categoría, icono, tipos de producto, especificaciones posibles)
+CATALOG = [
+    ('Computadoras', 'fas fa-laptop', ['Laptop', 'Desktop', 'Workstation', 'All-in-One'], {
+        'Procesador': ['Intel Core i5', 'Intel Core i7', 'Intel Core i9', 'AMD Ryzen 5', 'AMD Ryzen 7'],
+        'RAM': ['8GB', '16GB', '32GB', '64GB'],
+        'Almacenamiento': ['256GB SSD', '512GB SSD', '1TB SSD', '2TB SSD'],
+        'Pantalla': ['14"', '15.6"', '24"', '27"'],
+        'Sistema operativo': ['Windows 11 Pro', 'Ubuntu 22.04', 'Sin sistema operativo'],
+    }),
+    ('Redes', 'fas fa-network-wired', ['Router', 'Switch', 'Access Point', 'Firewall'], {
+        'Puertos': ['5', '8', '16', '24', '48'],
+        'Velocidad': ['1 Gbps', '2.5 Gbps', '10 Gbps'],
+        'PoE': ['Sí', 'No'],
+        'Administrable': ['Sí', 'No'],
+    }),
+    ('Impresoras', 'fas fa-print', ['Impresora Láser', 'Multifuncional', 'Impresora de Tinta', 'Plotter'], {
+        'Tecnología': ['Láser', 'Tinta continua', 'Térmica'],
+        'Color': ['Monocromática', 'Color'],
+        'Velocidad': ['20 ppm', '35 ppm', '50 ppm'],
+        'Conectividad': ['USB', 'Wi-Fi', 'Ethernet'],
+    }),
+    ('Servidores', 'fas fa-server', ['Servidor Rack', 'Servidor Torre', 'Servidor Blade'], {
+        'Procesador': ['Intel Xeon Silver', 'Intel Xeon Gold', 'AMD EPYC'],
+        'RAM': ['32GB ECC', '64GB ECC', '128GB ECC', '256GB ECC'],
+        'Bahías': ['4', '8', '12', '24'],
+        'Fuente': ['Sencilla', 'Redundante'],
+    }),
+    ('Almacenamiento', 'fas fa-hdd', ['NAS', 'Disco Externo', 'SSD', 'Cabina SAN'], {
+        'Capacidad': ['1TB', '2TB', '4TB', '8TB', '16TB'],
+        'Interfaz': ['USB-C', 'SATA', 'NVMe', 'iSCSI'],
+        'RAID': ['No aplica', 'RAID 1', 'RAID 5', 'RAID 10'],
+    }),
+    ('Accesorios', 'fas fa-keyboard', ['Teclado', 'Mouse', 'Monitor', 'Docking Station', 'UPS'], {
+        'Conexión': ['USB', 'Bluetooth', 'Inalámbrico 2.4GHz'],
+        'Garantía': ['6 meses', '1 año', '2 años'],
+        'Color': ['Negro', 'Gris', 'Blanco'],
+    }),
+]
+
+BRANDS = ['Lenovo', 'HP', 'Dell', 'Asus', 'Acer', 'Cisco', 'Ubiquiti', 'TP-Link', 'Epson', 'Brother', 'Synology', 'Kingston']
+
+FIRST_NAMES = ['Ana', 'Carlos', 'María', 'Juan', 'Laura', 'Andrés', 'Camila', 'Felipe', 'Valentina', 'Santiago', 'Daniela', 'Sebastián']
+LAST_NAMES = ['Gómez', 'Rodríguez', 'Martínez', 'López', 'García', 'Hernández', 'Díaz', 'Moreno', 'Rojas', 'Vargas', 'Castro', 'Ortiz']
+
+CITIES = [
+    ('Bogotá', 'Cundinamarca'), ('Medellín', 'Antioquia'), ('Cali', 'Valle del Cauca'),
+    ('Barranquilla', 'Atlántico'), ('Bucaramanga', 'Santander'), ('Pereira', 'Risaralda'),
+    ('Cartagena', 'Bolívar'), ('Manizales', 'Caldas'),
+]
+
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_2) AppleWebKit/605.1.15 Version/17.2 Safari/605.1.15',
+    'Mozilla/5.0 (Linux; Android 14) AppleWebKit/537.36 Chrome/120.0 Mobile Safari/537.36',
+]
+
+# Distribuciones (valor, peso)
+ORDER_STATUS_WEIGHTS = (('PAID', 70), ('FAILED', 10), ('PENDING', 8), ('CANCELLED', 7), ('REFUNDED', 3), ('PROCESSING', 2))
+PAYMENT_METHOD_WEIGHTS = (('CARD', 45), ('PSE', 30), ('NEQUI', 15), ('BANCOLOMBIA_TRANSFER', 7), ('BANCOLOMBIA_QR', 3))
+ITEMS_PER_ORDER_WEIGHTS = ((1, 55), (2, 25), (3, 12), (4, 8))
+QUANTITY_WEIGHTS = ((1, 70), (2, 20), (3, 7), (5, 3))
+
+# Estado del pago que corresponde a cada estado del pedido
+PAYMENT_STATUS = {
+    'PAID': 'APPROVED', 'REFUNDED': 'VOIDED', 'CANCELLED': 'VOIDED',
+    'FAILED': 'DECLINED', 'PENDING': 'PENDING', 'PROCESSING': 'PENDING',
+}
+
+# Fracción de pedidos de invitados (sin usuario)
+GUEST_RATIO = 0.3
+
+
+@contextmanager
+def historical_timestamps(*models):
+    """
+    Desactivar auto_now/auto_now_add mientras se siembra
+
+    bulk_create respeta esos flags, así los created_at/updated_at que asigna el
+    generador (distribuidos en el tiempo) no se reemplazan por la hora actual.
+    """
+    changed = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            for flag in ('auto_now', 'auto_now_add'):
+                if getattr(field, flag, False):
+                    setattr(field, flag, False)
+                    changed.append((field, flag))
+    try:
+        yield
+    finally:
+        for field, flag in changed:
+            setattr(field, flag, True)
+
+
+def _chunks(total, size):
+    for start in range(0, total, size):
+        yield start, min(start + size, total)
+
+
+@lru_cache(maxsize=None)
+def _cumulative(pairs):
+    values, weights = zip(*pairs)
+    return values, list(accumulate(weights))
+
+
+def _weighted(rng, pairs):
+    """Valor al azar de una distribución ((valor, peso), ...)"""
+    values, cum_weights = _cumulative(pairs)
+    return rng.choices(values, cum_weights=cum_weights)[0]
+
+
+# ==========================================
+# INSERT DIRECTO
+# ==========================================
+
+class _DBAdapter:
+    """
+    Conversión de valores Python al formato que espera la base de datos
+
+    Equivale a lo que hacen los campos del ORM en get_db_prep_save para los
+    tipos que usan los pedidos (UUID, datetime, JSON), sin el costo por valor.
+    """
+
+    def __init__(self, connection):
+        self.native_uuid = connection.features.has_native_uuid_field
+        self.db_timezone = connection.timezone if settings.USE_TZ else None
+
+    def uuid(self, value):
+        return value if self.native_uuid else value.hex
+
+    def datetime(self, value):
+        if self.db_timezone is not None:
+            value = timezone.make_naive(value, self.db_timezone)
+        return str(value)
+
+    def json(self, value):
+        return json.dumps(value)
+
+
+def insert_rows(model, field_names, rows):
+    """
+    INSERT de tuplas ya adaptadas (ver _DBAdapter) con executemany
+
+    PyMySQL agrupa el executemany en INSERTs multi-fila.
+    """
+    if not rows:
+        return
+    ops = connection.ops
+    fields = [model._meta.get_field(name) for name in field_names]
+    columns = ', '.join(ops.quote_name(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {ops.quote_name(model._meta.db_table)} ({columns}) VALUES ({placeholders})',
+            rows,
+        )
+
+
+class SyntheticDataGenerator:
+    """Generador determinista de datos masivos (ver docstring del módulo)"""
+
+    def __init__(self, seed=0, prefix=None, chunk_size=5000, days=365, progress=None):
+        self.seed = seed
+        self.prefix = (prefix or f'syn{seed}').lower()
+        self.chunk_size = chunk_size
+        self.days = days
+        self.progress = progress or (lambda label, done, total: None)
+        self.rng = random.Random(seed)
+        # Los UUID dependen también del prefijo: la misma semilla con otro prefijo no choca
+        self.id_salt = int(hashlib.sha256(self.prefix.encode()).hexdigest(), 16)
+        self.anchor = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.counts = {}
+
+        # Filas ya sembradas que necesitan los pasos siguientes
+        self.products = []
+        self.product_weights = []
+        self.users = []
+
+    # ==========================================
+    # UTILIDADES
+    # ==========================================
+
+    def _uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128) ^ (self.id_salt >> 128), version=4)
+
+    def _past(self, max_days=None):
+        """Instante aleatorio dentro de los últimos `max_days` días"""
+        seconds = (max_days or self.days) * 86400
+        return self.anchor - timedelta(seconds=self.rng.randrange(seconds))
+
+    def _person(self):
+        return f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}'
+
+    def _count(self, name, amount):
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def already_seeded(self):
+        """Si ya existen filas con el prefijo de esta corrida"""
+        from apps.products.models import ProductCategory
+        return ProductCategory.objects.filter(slug__startswith=f'{self.prefix}-').exists()
+
+    # ==========================================
+    # CATÁLOGO
+    # ==========================================
+
+    def seed_catalog(self, categories, products, images_per_product=3):
+        from apps.products.models import Product, ProductCategory, ProductImage
+
+        category_rows = []
+        for c in range(categories):
+            name, icon, kinds, specs = CATALOG[c % len(CATALOG)]
+            if c >= len(CATALOG):
+                name = f'{name} {c // len(CATALOG) + 1}'
+            category_rows.append(ProductCategory(
+                name=name, slug=f'{self.prefix}-{slugify(name)}', icon=icon,
+                description=f'{name} para empresas', order=c,
+            ))
+        ProductCategory.objects.bulk_create(category_rows)
+        category_ids = list(
+            ProductCategory.objects.filter(slug__startswith=f'{self.prefix}-')
+            .order_by('order').values_list('id', flat=True)
+        )
+        self._count('categorías', len(category_ids))
+
+        with historical_timestamps(Product):
+            for start, end in _chunks(products, self.chunk_size):
+                rows = []
+                for p in range(start, end):
+                    c = p % categories
+                    _, icon, kinds, specs = CATALOG[c % len(CATALOG)]
+                    kind = self.rng.choice(kinds)
+                    brand = self.rng.choice(BRANDS)
+                    model_code = f'{brand[:2].upper()}{self.rng.randint(100, 9999)}'
+                    price = self.rng.randint(20, 8000) * 1000
+                    created = self._past()
+                    rows.append(Product(
+                        category_id=category_ids[c],
+                        name=f'{kind} {brand} {model_code}',
+                        slug=f'{self.prefix}-{slugify(kind)}-{p}',
+                        sku=f'{self.prefix.upper()}-{p:07d}',
+                        short_description=f'{kind} {brand} para uso empresarial',
+                        full_description=(
+                            f'{kind} {brand} {model_code}. Equipo empresarial con garantía oficial '
+                            f'y soporte técnico en Colombia. ' * 4
+                        ),
+                        price=Decimal(price),
+                        sale_price=Decimal(price * 9 // 10) if self.rng.random() < 0.15 else None,
+                        stock=self.rng.choice([0, 3, 10, 25, 50, 120]),
+                        icon=icon,
+                        specifications={key: self.rng.choice(options) for key, options in specs.items()},
+                        meta_description=f'{kind} {brand} {model_code} al mejor precio'[:160],
+                        active=self.rng.random() > 0.03,
+                        featured=self.rng.random() < 0.02,
+                        created_at=created,
+                        updated_at=created,
+                    ))
+                Product.objects.bulk_create(rows)
+                self.progress('productos', end, products)
+
+        self.products = list(
+            Product.objects.filter(sku__startswith=f'{self.prefix.upper()}-')
+            .order_by('sku').values_list('id', 'name', 'sku', 'price', 'sale_price')
+        )
+        self._count('productos', len(self.products))
+
+        # Popularidad tipo Zipf: pocos productos concentran la mayoría de las ventas
+        ranking = list(range(len(self.products)))
+        self.rng.shuffle(ranking)
+        total = 0.0
+        self.product_weights = [0.0] * len(ranking)
+        popularity = [1 / (rank + 1) ** 1.1 for rank in ranking]
+        for i, weight in enumerate(popularity):
+            total += weight
+            self.product_weights[i] = total
+
+        for start, end in _chunks(len(self.products), self.chunk_size):
+            ProductImage.objects.bulk_create([
+                ProductImage(
+                    product_id=product_id,
+                    image=f'products/{sku.lower()}-{i}.jpg',
+                    alt_text=name,
+                    order=i,
+                    is_primary=i == 0,
+                )
+                for product_id, name, sku, _, _ in self.products[start:end]
+                for i in range(images_per_product)
+            ])
+        self._count('imágenes', len(self.products) * images_per_product)
+
+    def _pick_products(self, k):
+        return self.rng.choices(self.products, cum_weights=self.product_weights, k=k)
+
+    # ==========================================
+    # USUARIOS
+    # ==========================================
+
+    def seed_users(self, users):
+        from apps.accounts.models import LoginHistory, ShippingAddress
+
+        User = get_user_model()
+        password = make_password(SYNTHETIC_PASSWORD)
+
+        with historical_timestamps(User, ShippingAddress, LoginHistory):
+            for start, end in _chunks(users, self.chunk_size):
+                rows = []
+                for u in range(start, end):
+                    first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+                    joined = self._past()
+                    rows.append(User(
+                        username=f'{self.prefix}-user{u:07d}',
+                        email=f'{self.prefix}.user{u}@example.com',
+                        first_name=first,
+                        last_name=last,
+                        password=password,
+                        phone=f'3{self.rng.randint(100000000, 199999999)}',
+                        is_business=self.rng.random() < 0.2,
+                        date_joined=joined,
+                        created_at=joined,
+                        updated_at=joined,
+                    ))
+                User.objects.bulk_create(rows)
+
+                created = list(
+                    User.objects.filter(username__in=[row.username for row in rows])
+                    .order_by('username').values_list('id', 'username', 'email', 'first_name', 'last_name', 'date_joined')
+                )
+                addresses = []
+                logins = []
+                for user_id, _, _, first, last, joined in created:
+                    for a in range(self.rng.choice([1, 1, 2, 3])):
+                        city, state = self.rng.choice(CITIES)
+                        addresses.append(ShippingAddress(
+                            user_id=user_id,
+                            recipient_name=f'{first} {last}',
+                            recipient_phone=f'3{self.rng.randint(100000000, 199999999)}',
+                            address_line1=f'Calle {self.rng.randint(1, 200)} # {self.rng.randint(1, 99)}-{self.rng.randint(1, 99)}',
+                            city=city,
+                            state=state,
+                            is_default=a == 0,
+                            address_type=self.rng.choice(['home', 'work', 'other']),
+                            created_at=joined,
+                            updated_at=joined,
+                        ))
+                    for _ in range(self.rng.randint(1, 15)):
+                        logins.append(LoginHistory(
+                            user_id=user_id,
+                            ip_address=f'181.{self.rng.randint(0, 255)}.{self.rng.randint(0, 255)}.{self.rng.randint(1, 254)}',
+                            user_agent=self.rng.choice(USER_AGENTS),
+                            success=self.rng.random() > 0.05,
+                            timestamp=self._past(),
+                        ))
+                ShippingAddress.objects.bulk_create(addresses)
+                LoginHistory.objects.bulk_create(logins)
+                self.users.extend(created)
+                self._count('direcciones', len(addresses))
+                self._count('logins', len(logins))
+                self.progress('usuarios', end, users)
+
+        self._count('usuarios', len(self.users))
+
+    # ==========================================
+    # CARRITOS
+    # ==========================================
+
+    def seed_carts(self, carts):
+        from apps.products.models import Cart, CartItem
+
+        with historical_timestamps(Cart):
+            for start, end in _chunks(carts, self.chunk_size):
+                rows = []
+                for n in range(start, end):
+                    updated = self._past(max_days=14)
+                    rows.append(Cart(
+                        session_key=f'{self.prefix}-cart{n:08d}',
+                        created_at=updated - timedelta(minutes=self.rng.randint(1, 600)),
+                        updated_at=updated,
+                    ))
+                Cart.objects.bulk_create(rows)
+                cart_ids = Cart.objects.filter(
+                    session_key__in=[row.session_key for row in rows]
+                ).order_by('session_key').values_list('id', flat=True)
+
+                items = []
+                for cart_id in cart_ids:
+                    picked = {product[0]: product for product in self._pick_products(self.rng.randint(1, 5))}
+                    for product_id, _, _, price, sale_price in picked.values():
+                        items.append(CartItem(
+                            cart_id=cart_id, product_id=product_id,
+                            quantity=self.rng.randint(1, 3), price=sale_price or price,
+                        ))
+                CartItem.objects.bulk_create(items)
+                self._count('items de carrito', len(items))
+                self.progress('carritos', end, carts)
+
+        self._count('carritos', carts)
+
+    # ==========================================
+    # PEDIDOS
+    # ==========================================
+
+    # Columnas de los INSERT directos de pedidos (ver insert_rows)
+    ORDER_COLUMNS = [
+        'id', 'order_number', 'user', 'customer_email', 'customer_phone', 'customer_name',
+        'total_amount', 'tax_amount', 'shipping_amount', 'status', 'notes', 'shipping_address',
+        'created_at', 'updated_at', 'paid_at',
+    ]
+    ORDER_ITEM_COLUMNS = ['order', 'product_name', 'product_sku', 'quantity', 'unit_price', 'product']
+    PAYMENT_COLUMNS = [
+        'id', 'order', 'wompi_transaction_id', 'wompi_reference', 'payment_method', 'amount', 'currency',
+        'status', 'payment_method_data', 'redirect_url', 'wompi_response', 'created_at', 'updated_at', 'paid_at',
+    ]
+    WEBHOOK_COLUMNS = [
+        'id', 'event_type', 'transaction_id', 'payload', 'idempotency_key', 'duplicate_count',
+        'processed', 'processed_at', 'error_message', 'attempts', 'payment', 'created_at',
+    ]
+
+    def seed_orders(self, orders):
+        """
+        Pedidos con items, pago y webhook (si el pago tiene resultado final)
+
+        Es el grueso del volumen: en vez de bulk_create (que arma y adapta
+        cada instancia del modelo) las filas se construyen como tuplas ya
+        adaptadas a la base de datos y se insertan con executemany.
+        """
+        from apps.payments.models import Order, OrderItem, Payment, WompiWebhookEvent
+
+        adapt = _DBAdapter(connection)
+        for start, end in _chunks(orders, self.chunk_size):
+            order_rows, item_rows, payment_rows, event_rows = [], [], [], []
+            for n in range(start, end):
+                self._build_order(n, adapt, order_rows, item_rows, payment_rows, event_rows)
+
+            with transaction.atomic():
+                insert_rows(Order, self.ORDER_COLUMNS, order_rows)
+                insert_rows(OrderItem, self.ORDER_ITEM_COLUMNS, item_rows)
+                insert_rows(Payment, self.PAYMENT_COLUMNS, payment_rows)
+                insert_rows(WompiWebhookEvent, self.WEBHOOK_COLUMNS, event_rows)
+
+            self._count('pedidos', len(order_rows))
+            self._count('items de pedido', len(item_rows))
+            self._count('pagos', len(payment_rows))
+            self._count('webhooks', len(event_rows))
+            self.progress('pedidos', end, orders)
+
+    def _build_order(self, n, adapt, order_rows, item_rows, payment_rows, event_rows):
+        rng = self.rng
+        status = _weighted(rng, ORDER_STATUS_WEIGHTS)
+        created = self._past()
+        city, state = rng.choice(CITIES)
+
+        if self.users and rng.random() > GUEST_RATIO:
+            user_id, _, email, first, last, _ = rng.choice(self.users)
+            name = f'{first} {last}'
+        else:
+            user_id, name = None, self._person()
+            email = f'{self.prefix}.guest{n}@example.com'
+
+        order_id = adapt.uuid(self._uuid())
+        order_number = f'{self.prefix.upper()}-{n:08d}'
+
+        subtotal = 0
+        picked = {product[0]: product for product in self._pick_products(_weighted(rng, ITEMS_PER_ORDER_WEIGHTS))}
+        for product_id, product_name, sku, price, sale_price in picked.values():
+            quantity = _weighted(rng, QUANTITY_WEIGHTS)
+            unit_price = int(sale_price or price)
+            subtotal += unit_price * quantity
+            item_rows.append((order_id, product_name, sku, quantity, unit_price, product_id))
+
+        tax = subtotal * 19 // 100
+        total = subtotal + tax
+
+        payment_status = PAYMENT_STATUS[status]
+        method = _weighted(rng, PAYMENT_METHOD_WEIGHTS)
+        paid_at = created + timedelta(seconds=rng.randint(20, 900))
+        transaction_id = f'{self.prefix}-tx{n:08d}'
+        order_paid = status in ('PAID', 'REFUNDED')
+
+        order_rows.append((
+            order_id, order_number, user_id, email, f'3{rng.randint(100000000, 199999999)}', name,
+            total, tax, 0, status, '',
+            adapt.json({
+                'address': f'Carrera {rng.randint(1, 120)} # {rng.randint(1, 99)}-{rng.randint(1, 99)}',
+                'city': city, 'state': state, 'notes': '',
+            }),
+            adapt.datetime(created),
+            adapt.datetime(paid_at if order_paid else created),
+            adapt.datetime(paid_at) if order_paid else None,
+        ))
+
+        payment_id = adapt.uuid(self._uuid())
+        payment_rows.append((
+            payment_id, order_id, transaction_id, order_number, method, total, 'COP',
+            payment_status, adapt.json({}), '',
+            adapt.json({'id': transaction_id, 'status': payment_status, 'payment_method_type': method}),
+            adapt.datetime(created), adapt.datetime(paid_at),
+            adapt.datetime(paid_at) if payment_status == 'APPROVED' else None,
+        ))
+
+        if payment_status != 'PENDING':
+            event_rows.append((
+                adapt.uuid(self._uuid()), 'transaction.updated', transaction_id,
+                adapt.json({
+                    'event': 'transaction.updated',
+                    'data': {'transaction': {
+                        'id': transaction_id,
+                        'status': payment_status,
+                        'reference': order_number,
+                        'amount_in_cents': total * 100,
+                        'currency': 'COP',
+                        'payment_method_type': method,
+                        'customer_email': email,
+                    }},
+                    'environment': 'test',
+                }),
+                f'{rng.getrandbits(256) ^ self.id_salt:064x}', 0,
+                True, adapt.datetime(paid_at), '', 1, payment_id, adapt.datetime(paid_at),
+            ))
+
+    # ==========================================
+    # CORRIDA COMPLETA
+    # ==========================================
+
+    def run(self, categories=12, products=20000, users=5000, carts=2000, orders=200000, images_per_product=3):
+        """
+        Sembrar todo en orden (catálogo, usuarios, carritos, pedidos)
+
+        Returns:
+            Diccionario {tipo de fila: cantidad creada}
+        """
+        self.seed_catalog(categories, products, images_per_product)
+        if users:
+            self.seed_users(users)
+        if carts:
+            self.seed_carts(carts)
+        if orders:
+            self.seed_orders(orders)
+        return self.counts
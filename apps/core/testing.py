@@ -0,0 +1,327 @@
+"""
+Benchmarks de vistas con presupuesto de queries
+
+ViewBenchmarkTestCase siembra un dataset realista (catálogo, servicios,
+pedidos con pagos y webhooks, un cliente B2B y un admin) y ofrece
+`benchmark()`, que:
+
+1. Ejecuta la petición con la caché vacía y cuenta las queries
+2. La repite BENCHMARK_ITERATIONS veces midiendo mediana y p95
+3. Falla si las queries superan el presupuesto de la vista
+
+Los resultados de todas las pruebas se escriben en BENCHMARK_REPORT_PATH
+(JSON). El reporte anterior se conserva en `previous` y las vistas que
+ahora hacen más queries se listan en `regressions`.
+
+    python manage.py test --settings=config.settings_test
+"""
+import json
+import os
+import subprocess
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from .benchmarking import QueryCounter, percentile
+
+BENCHMARK_PASSWORD = 'benchmark-pass'
+
+# Cambio de p95 (en %) a partir del cual una vista se marca como más lenta
+P95_REGRESSION_PCT = 50
+
+
+# ==========================================
+# DATASET
+# ==========================================
+
+def seed_benchmark_data(categories=6, products_per_category=30, images_per_product=3, orders=150):
+    """
+    Crear el dataset de los benchmarks con bulk_create
+
+    Returns:
+        SimpleNamespace con los objetos que usan las pruebas
+    """
+    from apps.accounts.models import LoginHistory, ShippingAddress
+    from apps.core.models import CompanyInfo
+    from apps.payments.models import Order, OrderItem, Payment, WompiWebhookEvent
+    from apps.payments.services import order_numbers
+    from apps.payments.services.order_numbers import next_order_number
+    from apps.products.models import Product, ProductCategory, ProductImage
+    from apps.services.models import Service, ServiceCategory
+
+    User = get_user_model()
+
+    # El bloque del proceso puede venir de una prueba anterior cuyo rollback borró
+    # su fila (SQLite reutiliza el id): empezar con un bloque nuevo
+    order_numbers._allocator = order_numbers.OrderNumberAllocator()
+
+    CompanyInfo.objects.create(
+        description='Soluciones tecnológicas', phone='6015550000',
+        email='info@example.com', address='Calle 1 # 2-3, Bogotá',
+    )
+
+    # Catálogo
+    product_categories = ProductCategory.objects.bulk_create([
+        ProductCategory(name=f'Categoría {c}', slug=f'categoria-{c}', icon='fas fa-laptop', order=c)
+        for c in range(categories)
+    ])
+    products = Product.objects.bulk_create([
+        Product(
+            category=category,
+            name=f'Producto {c}-{p}',
+            slug=f'producto-{c}-{p}',
+            sku=f'SKU-{c:02d}-{p:04d}',
+            short_description='Equipo de cómputo para empresas',
+            full_description='Descripción completa del producto. ' * 20,
+            price=Decimal(100000 + p * 1500),
+            sale_price=Decimal(90000 + p * 1500) if p % 4 == 0 else None,
+            stock=50,
+            specifications={'Procesador': 'Intel i7', 'RAM': '16GB', 'Disco': '512GB SSD'},
+            featured=p < 2,
+        )
+        for c, category in enumerate(product_categories)
+        for p in range(products_per_category)
+    ])
+    ProductImage.objects.bulk_create([
+        ProductImage(product=product, image=f'products/{product.slug}-{i}.jpg', order=i, is_primary=i == 0)
+        for product in products
+        for i in range(images_per_product)
+    ])
+
+    service_categories = ServiceCategory.objects.bulk_create([
+        ServiceCategory(name=f'Servicio {c}', slug=f'servicio-{c}', icon='fas fa-server', description='Servicios TI')
+        for c in range(3)
+    ])
+    services = Service.objects.bulk_create([
+        Service(
+            category=category,
+            name=f'Servicio {c}-{s}',
+            slug=f'servicio-{c}-{s}',
+            short_description='Servicio administrado',
+            full_description='Detalle del servicio. ' * 20,
+            icon='fas fa-cogs',
+            features=['Soporte 24/7', 'SLA', 'Monitoreo'],
+            featured=s == 0,
+        )
+        for c, category in enumerate(service_categories)
+        for s in range(8)
+    ])
+
+    # Usuarios
+    admin = User.objects.create_superuser('bench-admin', 'admin@example.com', BENCHMARK_PASSWORD)
+    customer = User.objects.create_user('bench-customer', 'cliente@example.com', BENCHMARK_PASSWORD)
+    ShippingAddress.objects.bulk_create([
+        ShippingAddress(
+            user=customer, recipient_name='Cliente', recipient_phone='3000000000',
+            address_line1=f'Carrera {i} # 10-20', city='Bogotá', state='Cundinamarca', is_default=i == 0,
+        )
+        for i in range(3)
+    ])
+    LoginHistory.objects.bulk_create([
+        LoginHistory(user=customer, ip_address='127.0.0.1', user_agent='benchmark')
+        for _ in range(20)
+    ])
+
+    # Pedidos del cliente con items, pagos y webhooks
+    now = timezone.now()
+    statuses = ['PAID', 'PAID', 'PAID', 'PENDING', 'FAILED', 'CANCELLED']
+    order_rows = Order.objects.bulk_create([
+        Order(
+            id=uuid.uuid4(),
+            order_number=next_order_number(),
+            user=customer,
+            customer_email=customer.email,
+            customer_name='Cliente Benchmark',
+            total_amount=Decimal('0'),
+            status=statuses[i % len(statuses)],
+            shipping_address={'address': 'Carrera 1 # 10-20', 'city': 'Bogotá', 'state': 'Cundinamarca'},
+            paid_at=now - timedelta(days=i) if statuses[i % len(statuses)] == 'PAID' else None,
+        )
+        for i in range(orders)
+    ])
+
+    items = []
+    for i, order in enumerate(order_rows):
+        total = Decimal('0')
+        for j in range(1 + i % 4):
+            product = products[(i * 7 + j) % len(products)]
+            items.append(OrderItem(
+                order=order, product=product, product_name=product.name,
+                product_sku=product.sku, quantity=1 + j, unit_price=product.price,
+            ))
+            total += product.price * (1 + j)
+        order.total_amount = total
+    OrderItem.objects.bulk_create(items)
+    Order.objects.bulk_update(order_rows, ['total_amount'])
+
+    payment_status = {'PAID': 'APPROVED', 'PENDING': 'PENDING', 'FAILED': 'DECLINED', 'CANCELLED': 'VOIDED'}
+    payments = Payment.objects.bulk_create([
+        Payment(
+            id=uuid.uuid4(),
+            order=order,
+            wompi_transaction_id=f'bench-{i}',
+            wompi_reference=order.order_number,
+            payment_method=['CARD', 'PSE', 'NEQUI'][i % 3],
+            amount=order.total_amount,
+            status=payment_status[order.status],
+            wompi_response={'id': f'bench-{i}', 'status': payment_status[order.status]},
+        )
+        for i, order in enumerate(order_rows)
+    ])
+    WompiWebhookEvent.objects.bulk_create([
+        WompiWebhookEvent(
+            id=uuid.uuid4(),
+            event_type='transaction.updated',
+            transaction_id=payment.wompi_transaction_id,
+            payload={'event': 'transaction.updated', 'data': {'transaction': {'id': payment.wompi_transaction_id}}},
+            idempotency_key=uuid.uuid4().hex,
+            processed=True,
+            processed_at=now,
+            payment=payment,
+        )
+        for payment in payments
+    ])
+
+    return SimpleNamespace(
+        admin=admin,
+        customer=customer,
+        categories=product_categories,
+        products=products,
+        service_categories=service_categories,
+        services=services,
+        orders=order_rows,
+        payments=payments,
+    )
+
+
+# ==========================================
+# REPORTE
+# ==========================================
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class BenchmarkReport:
+    """Resultados de la corrida actual, escritos a disco al terminar cada clase de pruebas"""
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex
+        self.results = {}
+
+    def add(self, name, **result):
+        self.results[name] = result
+
+    def write(self, path):
+        previous = None
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as fh:
+                try:
+                    existing = json.load(fh)
+                except ValueError:
+                    existing = {}
+            # Otra corrida: pasa a ser la referencia. La misma corrida: se conserva su referencia.
+            if existing.get('run_id') == self.run_id:
+                previous = existing.get('previous')
+            elif existing.get('results'):
+                previous = {key: existing.get(key) for key in ('commit', 'generated_at', 'results')}
+
+        regressions = []
+        if previous:
+            for name, result in sorted(self.results.items()):
+                before = previous['results'].get(name)
+                if not before:
+                    continue
+                if result['queries'] > before['queries']:
+                    regressions.append({'view': name, 'metric': 'queries', 'before': before['queries'], 'after': result['queries']})
+                if before['p95_ms'] and (result['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 > P95_REGRESSION_PCT:
+                    regressions.append({'view': name, 'metric': 'p95_ms', 'before': before['p95_ms'], 'after': result['p95_ms']})
+
+        report = {
+            'run_id': self.run_id,
+            'generated_at': timezone.now().isoformat(),
+            'commit': _git_commit(),
+            'database': connection.vendor,
+            'iterations': settings.BENCHMARK_ITERATIONS,
+            'results': dict(sorted(self.results.items())),
+            'regressions': regressions,
+            'previous': previous,
+        }
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2, ensure_ascii=False)
+
+
+report = BenchmarkReport()
+
+
+# ==========================================
+# TEST CASE
+# ==========================================
+
+class ViewBenchmarkTestCase(TestCase):
+    """TestCase con dataset sembrado y `benchmark()` (ver docstring del módulo)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_benchmark_data()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        report.write(settings.BENCHMARK_REPORT_PATH)
+
+    def login_customer(self):
+        self.client.login(username='bench-customer', password=BENCHMARK_PASSWORD)
+
+    def login_admin(self):
+        self.client.login(username='bench-admin', password=BENCHMARK_PASSWORD)
+
+    def benchmark(self, name, fetch, max_queries, expected_status=200):
+        """
+        Medir una vista
+
+        Args:
+            name: Nombre de la vista en el reporte
+            fetch: Callable sin argumentos que hace la petición y devuelve la respuesta
+            max_queries: Presupuesto de queries (con la caché vacía)
+            expected_status: Código HTTP esperado
+        """
+        cache.clear()
+        with QueryCounter() as counter:
+            response = fetch()
+        self.assertEqual(response.status_code, expected_status, f'{name}: código HTTP inesperado')
+
+        timings = []
+        for _ in range(settings.BENCHMARK_ITERATIONS):
+            start = time.perf_counter()
+            fetch()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        report.add(
+            name,
+            queries=counter.count,
+            budget=max_queries,
+            status=response.status_code,
+            median_ms=round(percentile(timings, 50), 2),
+            p95_ms=round(percentile(timings, 95), 2),
+        )
+        self.assertLessEqual(
+            counter.count, max_queries,
+            f'{name}: {counter.count} queries, presupuesto {max_queries}',
+        )
+        return response
@@ -1,3 +1,477 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test import LiveServerTestCase, TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core import profiling
+from apps.core.db_router import STICKY_COOKIE, use_primary
+from apps.core.load_testing import run_load_test
+from apps.core.exports import process_export_jobs
+from apps.core.mail import deliver_queued_emails, queue_email
+from apps.core.models import ExportJob, OutboundEmail
+from apps.core.page_cache import invalidate_pages, page_cache_version
+from apps.core.prerender import prerender_catalog
+from apps.core.synthetic_data import SyntheticDataGenerator
+from apps.core.testing import ViewBenchmarkTestCase, seed_benchmark_data
+from apps.core.warmup import compile_templates, warm_up
+from apps.payments.fake_wompi import FakeWompiServer
+from apps.products.models import Product
+
+
+class CoreViewBenchmarks(ViewBenchmarkTestCase):
+    """Presupuesto de queries de las páginas de core"""
+
+    def test_home(self):
+        self.benchmark('core:home', lambda: self.client.get(reverse('core:home')), max_queries=6)
+
+    def test_profiling_report(self):
+        self.login_admin()
+        self.benchmark(
+            'core:profiling_report',
+            lambda: self.client.get(reverse('core:profiling_report')),
+            max_queries=3,
+        )
+
+
+class ProfilingMiddlewareTests(ViewBenchmarkTestCase):
+    """Server-Timing y ring buffer de ProfilingMiddleware"""
+
+    def setUp(self):
+        profiling.store.clear()
+        self.addCleanup(profiling.store.clear)
+
+    def get_profiled(self, url):
+        return self.client.get(url, HTTP_X_PROFILE='1')
+
+    def test_anonymous_header_is_ignored(self):
+        response = self.get_profiled(reverse('core:home'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(profiling.store.records(), [])
+
+    def test_staff_header_adds_server_timing_and_record(self):
+        self.login_admin()
+        response = self.get_profiled(reverse('products:product_list'))
+        self.assertIn('Server-Timing', response)
+
+        record, = profiling.store.records()
+        self.assertEqual(
+            (record['endpoint'], record['method'], record['status']), ('products:product_list', 'GET', 200),
+        )
+        self.assertGreater(record['sql_count'], 0)
+        self.assertIn(
+            f'desc="{record["sql_count"]} queries, {record["sql_duplicates"]} repetidas"', response['Server-Timing'],
+        )
+        self.assertIn('template', record['spans'])
+
+        # Sin el header no se perfila; el reporte no se guarda a sí mismo
+        self.assertNotIn('Server-Timing', self.client.get(reverse('core:home')))
+        self.assertIn('Server-Timing', self.get_profiled(reverse('core:profiling_report')))
+        self.assertEqual(len(profiling.store.records()), 1)
+
+    @override_settings(PROFILING_ENABLED=True)
+    def test_enabled_profiles_everyone(self):
+        self.assertIn('Server-Timing', self.client.get(reverse('core:home')))
+        self.assertEqual(len(profiling.store.records()), 1)
+
+    def test_sql_and_duplicate_counts(self):
+        profile = profiling.RequestProfile()
+        with connection.execute_wrapper(profile):
+            for _ in range(3):
+                Product.objects.filter(pk=self.data.products[0].pk).exists()
+            Product.objects.filter(pk=self.data.products[1].pk).exists()
+
+        self.assertEqual((profile.sql_count, profile.sql_duplicates), (4, 2))
+        profile.finish()
+        self.assertIn('desc="4 queries, 2 repetidas"', profile.server_timing())
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class PageCacheTests(ViewBenchmarkTestCase):
+    """Caché de página completa y fragmento del visitante"""
+
+    def setUp(self):
+        caches['pages'].clear()
+
+    def test_cached_page_served_without_queries(self):
+        url = reverse('products:product_detail', args=[self.data.products[0].slug])
+        first = self.client.get(url)
+        self.assertEqual(first['X-Page-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second['X-Page-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_saves_invalidate_pages(self):
+        product = self.data.products[0]
+        url = reverse('products:product_detail', args=[product.slug])
+        self.client.get(url)
+
+        product.name = 'Producto renombrado'
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, 'Producto renombrado')
+
+        invalidate_pages()
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'MISS')
+
+    def test_home_data_invalidated_with_pages(self):
+        from django.core.cache import cache
+
+        self.client.get(reverse('core:home'))
+        self.assertIsNotNone(cache.get(f'home_page_data:{page_cache_version()}'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data.categories[0].save()
+        self.assertIsNone(cache.get(f'home_page_data:{page_cache_version()}'))
+
+    def test_invalidation_waits_for_commit(self):
+        version = page_cache_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.data.products[0].save()
+            self.assertEqual(page_cache_version(), version)
+        for callback in callbacks:
+            callback()
+        self.assertGreater(page_cache_version(), version)
+
+    def test_visitor_fragment(self):
+        url = reverse('core:visitor_fragment')
+        data = self.client.get(url).json()
+        self.assertIsNone(data['user'])
+        self.assertEqual(data['cart'], {'item_count': 0})
+        self.assertTrue(data['csrf_token'])
+
+        self.login_customer()
+        self.client.post(reverse('products:add_to_cart', args=[self.data.products[0].id]), {'quantity': 2})
+        response = self.client.get(url)
+        self.assertIn('no-cache', response['Cache-Control'])
+        data = response.json()
+        self.assertEqual(data['user'], {'name': 'cliente@example.com'})
+        self.assertEqual(data['cart'], {'item_count': 2})
+        self.assertEqual(len(data['messages']), 1)
+        self.assertEqual(self.client.get(url).json()['messages'], [])
+
+
+class PrerenderTests(TestCase):
+    """Catálogo pre-renderizado (prerender_catalog)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_benchmark_data(categories=2, products_per_category=4, images_per_product=1, orders=0)
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        settings_override = override_settings(PRERENDER_ROOT=self.root, PRERENDER_HOST='testserver')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(shutil.rmtree, self.root, True)
+
+    def page(self, url):
+        return os.path.join(self.root, url.strip('/'), 'index.html')
+
+    def test_full_render_then_incremental(self):
+        result = prerender_catalog()
+        self.assertEqual(result['errors'], {})
+        self.assertEqual(result['rendered'], result['pages'])
+        product = self.data.products[0]
+        with open(self.page(reverse('products:product_detail', args=[product.slug])), encoding='utf-8') as fh:
+            self.assertIn(product.name, fh.read())
+        self.assertTrue(os.path.exists(self.page(reverse('services:service_list'))))
+
+        self.assertEqual(prerender_catalog()['rendered'], 0)
+
+        product.name = 'Producto renombrado'
+        product.save()
+        result = prerender_catalog()
+        self.assertGreater(result['rendered'], 0)
+        self.assertLess(result['rendered'], result['pages'])
+        with open(self.page(reverse('products:product_detail', args=[product.slug])), encoding='utf-8') as fh:
+            self.assertIn('Producto renombrado', fh.read())
+
+    def test_inactive_product_removed(self):
+        prerender_catalog()
+        product = self.data.products[1]
+        product.active = False
+        product.save()
+
+        result = prerender_catalog()
+        self.assertEqual(result['removed'], 1)
+        self.assertFalse(os.path.exists(self.page(reverse('products:product_detail', args=[product.slug]))))
+
+    def test_command_activate_and_deactivate(self):
+        flag = os.path.join(self.root, '.active')
+        call_command('prerender_catalog', '--processes', '1', '--activate', stdout=StringIO())
+        self.assertTrue(os.path.exists(flag))
+
+        call_command('prerender_catalog', '--deactivate', stdout=StringIO())
+        self.assertFalse(os.path.exists(flag))
+        self.assertTrue(os.path.exists(self.page(reverse('products:product_list'))))
+
+
+class OutboxDeliveryTests(TransactionTestCase):
+    """Entrega del outbox de emails (send_queued_emails)"""
+
+    def test_sends_outside_transaction(self):
+        queue_email('Asunto', ['cliente@example.com'], body='Hola')
+        seen = []
+
+        def send(message, *args, **kwargs):
+            seen.append((transaction.get_connection().in_atomic_block, OutboundEmail.objects.get().status))
+            return 1
+
+        with mock.patch('django.core.mail.EmailMultiAlternatives.send', send):
+            self.assertEqual(deliver_queued_emails(), (1, 0, 0))
+        self.assertEqual(seen, [(False, 'SENDING')])
+        self.assertEqual(OutboundEmail.objects.get().status, 'SENT')
+
+    def test_failure_returns_to_pending_and_expired_lease_is_reclaimed(self):
+        email = queue_email('Asunto', ['cliente@example.com'], body='Hola')
+        with mock.patch('django.core.mail.EmailMultiAlternatives.send', side_effect=OSError('SMTP caído')):
+            self.assertEqual(deliver_queued_emails(), (0, 1, 0))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('PENDING', 1))
+
+        # Worker muerto a mitad de lote: la concesión vence y otro worker lo envía
+        OutboundEmail.objects.filter(pk=email.pk).update(status='SENDING', next_attempt_at=timezone.now())
+        self.assertEqual(deliver_queued_emails(), (1, 0, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class ExportJobTests(ViewBenchmarkTestCase):
+    """Exportaciones CSV en segundo plano (run_export_jobs)"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        settings_override = override_settings(EXPORTS_ROOT=self.root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(shutil.rmtree, self.root, True)
+
+    def test_background_export_stores_ids(self):
+        self.login_admin()
+        products = self.data.products[:3]
+        self.client.post(reverse('admin:products_product_changelist'), {
+            'action': 'export_background_productos',
+            '_selected_action': [product.pk for product in products],
+        })
+        job = ExportJob.objects.get()
+        self.assertEqual(job.model_label, 'products.Product')
+        self.assertEqual(sorted(job.object_ids), sorted(product.pk for product in products))
+
+        self.assertEqual(process_export_jobs(), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.row_count, job.attempts), ('DONE', 3, 1))
+        with open(job.file_path, encoding='utf-8') as fh:
+            self.assertIn(products[0].name, fh.read())
+
+    def test_select_all_stores_changelist_filter(self):
+        self.login_admin()
+        category = self.data.categories[0]
+        expected = Product.objects.filter(category=category).count()
+        self.client.post(
+            reverse('admin:products_product_changelist') + f'?category__id__exact={category.pk}&p=2',
+            {
+                'action': 'export_background_productos',
+                'select_across': '1',
+                '_selected_action': [self.data.products[0].pk],
+            },
+        )
+        job = ExportJob.objects.get()
+        self.assertTrue(job.select_across)
+        self.assertEqual(job.object_ids, [])
+        self.assertEqual(job.changelist_params, f'category__id__exact={category.pk}')
+
+        self.assertEqual(process_export_jobs(), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.row_count), ('DONE', expected))
+
+    @override_settings(EXPORT_JOB_MAX_IDS=2)
+    def test_manual_selection_is_capped(self):
+        self.login_admin()
+        response = self.client.post(reverse('admin:products_product_changelist'), {
+            'action': 'export_background_productos',
+            '_selected_action': [product.pk for product in self.data.products[:3]],
+        }, follow=True)
+        self.assertContains(response, 'Selecciona hasta 2 filas')
+        self.assertFalse(ExportJob.objects.exists())
+
+    def test_stuck_jobs_are_retried_then_failed(self):
+        started_at = timezone.now() - timedelta(seconds=settings.EXPORT_JOB_TIMEOUT + 60)
+        retried = ExportJob.objects.create(
+            export_class='apps.products.exports.ProductExport', model_label='products.Product',
+            object_ids=[self.data.products[0].pk], status='RUNNING', started_at=started_at, attempts=1,
+        )
+        exhausted = ExportJob.objects.create(
+            export_class='apps.products.exports.ProductExport', model_label='products.Product',
+            object_ids=[], status='RUNNING', started_at=started_at, attempts=settings.EXPORT_JOB_MAX_ATTEMPTS,
+        )
+
+        self.assertEqual(process_export_jobs(), (1, 0))
+        retried.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual((retried.status, retried.attempts), ('DONE', 2))
+        self.assertEqual(exhausted.status, 'FAILED')
+
+
+class WarmupTests(TestCase):
+    """Precarga de workers (passenger_wsgi.py)"""
+
+    def test_all_templates_compile(self):
+        compiled, failed = compile_templates()
+        self.assertGreater(compiled, 0)
+        self.assertEqual(failed, 0)
+
+    def test_warm_up_runs_every_step(self):
+        self.assertEqual(list(warm_up()), ['urlconfs', 'database', 'translations', 'templates'])
+
+
+class SyntheticDataTests(TestCase):
+    """Generador de datos sintéticos (seed_synthetic_data)"""
+
+    def seed(self, prefix):
+        generator = SyntheticDataGenerator(seed=7, prefix=prefix, chunk_size=40)
+        generator.run(categories=3, products=30, users=10, carts=5, orders=100)
+        return generator
+
+    def test_same_seed_same_rows(self):
+        from apps.payments.models import Order
+
+        self.seed('a')
+        self.seed('b')
+        rows = {
+            prefix: list(
+                Order.objects.filter(order_number__startswith=f'{prefix.upper()}-')
+                .order_by('order_number').values_list('status', 'total_amount', 'created_at')
+            )
+            for prefix in ('a', 'b')
+        }
+        self.assertEqual(len(rows['a']), 100)
+        self.assertEqual(rows['a'], rows['b'])
+
+    def test_orders_are_consistent(self):
+        from apps.payments.models import Order, Payment, WompiWebhookEvent
+
+        generator = self.seed('c')
+        self.assertEqual(generator.counts['pedidos'], 100)
+        self.assertEqual(Payment.objects.count(), 100)
+        self.assertEqual(WompiWebhookEvent.objects.count(), Payment.objects.exclude(status='PENDING').count())
+
+        for order in Order.objects.prefetch_related('items', 'payments')[:20]:
+            items = sum(item.subtotal for item in order.items.all())
+            self.assertEqual(order.total_amount, items + order.tax_amount)
+            self.assertEqual(order.payments.get().amount, order.total_amount)
+            self.assertEqual(order.paid_at is not None, order.status in ('PAID', 'REFUNDED'))
+
+        self.assertEqual(
+            Order.objects.aggregate(total=Sum('total_amount'))['total'],
+            Payment.objects.aggregate(total=Sum('amount'))['total'],
+        )
+
+
+class LoadTestJourneyTests(LiveServerTestCase):
+    """Recorridos de load_test contra el servidor de pruebas y el Wompi simulado"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.wompi = FakeWompiServer(port=0)
+        cls.wompi.start()
+        # La réplica de settings_test es otra base vacía: el servidor lee todo del primario
+        cls.wompi_settings = override_settings(WOMPI_API_BASE_URL=cls.wompi.base_url, DATABASE_REPLICAS=[])
+        cls.wompi_settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.wompi_settings.disable()
+        cls.wompi.stop()
+        super().tearDownClass()
+
+    def test_journeys_complete(self):
+        from apps.payments.models import Order
+
+        SyntheticDataGenerator(seed=3).run(categories=2, products=20, users=0, carts=0, orders=0)
+
+        report = run_load_test(
+            self.live_server_url, concurrency=1, duration=None, journeys=4,
+            payment_methods=('CARD', 'PSE'), seed=3,
+        )
+
+        self.assertEqual(report['journeys'], {'completed': 4, 'failed': 0, 'per_second': report['journeys']['per_second']})
+        steps = {step['step']: step for step in report['steps']}
+        self.assertEqual(steps['pay']['requests'], 4)
+        self.assertTrue(all(step['errors'] == 0 for step in report['steps']))
+        self.assertEqual(Order.objects.filter(customer_email__startswith='carga').count(), 4)
+
+
+class ReplicaRouterTests(TransactionTestCase):
+    """Router de réplicas con dos bases SQLite: el mismo producto con otro nombre en cada una"""
+
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        from apps.products.models import Product, ProductCategory
+
+        for alias, name in (('default', 'Primario'), ('replica', 'Réplica')):
+            category = ProductCategory.objects.using(alias).create(id=1, name='Equipos', slug='equipos')
+            Product.objects.using(alias).create(
+                id=1, category=category, name=name, slug='portatil', sku='SKU-1',
+                short_description='Portátil', full_description='Portátil', price=1000, stock=5,
+            )
+
+    def product_name(self):
+        from apps.products.models import Product
+        return Product.objects.get(slug='portatil').name
+
+    def test_catalog_reads_use_replica(self):
+        from apps.products.models import Cart
+
+        self.assertEqual(self.product_name(), 'Réplica')
+        self.assertEqual(Cart.objects.all().db, 'default')
+
+    def test_transactions_and_use_primary_read_primary(self):
+        with transaction.atomic():
+            self.assertEqual(self.product_name(), 'Primario')
+        with use_primary():
+            self.assertEqual(self.product_name(), 'Primario')
+        self.assertEqual(self.product_name(), 'Réplica')
+
+    def test_session_sticks_to_primary_after_write(self):
+        url = reverse('products:product_detail', args=['portatil'])
+        self.assertContains(self.client.get(url), 'Réplica')
+
+        response = self.client.post(reverse('products:api_add_to_cart', args=[1]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.assertContains(self.client.get(url), 'Primario')
+
+        self.client.cookies[STICKY_COOKIE] = str(int(time.time()) - 1)
+        self.assertContains(self.client.get(url), 'Réplica')
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_page_cache_misses_read_primary(self):
+        caches['pages'].clear()
+        self.assertContains(self.client.get(reverse('products:product_detail', args=['portatil'])), 'Primario')
+
+    def test_primary_views_read_primary(self):
+        with override_settings(DATABASE_PRIMARY_VIEWS=['products:product_detail']):
+            self.assertContains(self.client.get(reverse('products:product_detail', args=['portatil'])), 'Primario')
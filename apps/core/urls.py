@@ -5,4 +5,6 @@ app_name = 'core'
 
 urlpatterns = [
     path('', views.home, name='home'),
+    path('visitor/', views.visitor_fragment, name='visitor_fragment'),
+    path('staff/profiling/', views.profiling_report, name='profiling_report'),
 ]
\ No newline at end of file
@@ -21,12 +21,22 @@ REDUCCIÓN: ~95% menos queries
 # apps/core/views.py - OPTIMIZADO
 # ==========================================
 
-from django.shortcuts import render
+from django.shortcuts import redirect, render
+from django.conf import settings
 from django.core.cache import cache
+from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Sum
+from django.http import JsonResponse
+from django.middleware.csrf import get_token
+from django.views.decorators.cache import never_cache
+from apps.core import profiling
 from apps.core.models import CompanyInfo, ValueCard, Client, Brand
-from apps.products.models import Product
+from apps.core.page_cache import full_page_cache, page_cache_version
+from apps.products.models import CartItem, Product
 from apps.services.models import Service
 
+@full_page_cache
 def home(request):
     """
     Vista optimizada para la página de inicio.
@@ -37,7 +47,8 @@ def home(request):
     3. Caché de datos que no cambian frecuentemente
     """
     # Intentar obtener datos del caché primero
-    cache_key = 'home_page_data'
+    # Con la versión de la caché de páginas: se invalida junto con ellas
+    cache_key = f'home_page_data:{page_cache_version()}'
     cached_data = cache.get(cache_key)
     
     if cached_data:
@@ -91,4 +102,66 @@ def home(request):
         # Cachear por 15 minutos (datos que no cambian frecuentemente)
         cache.set(cache_key, context, 60 * 15)
     
-    return render(request, 'core/home.html', context)
\ No newline at end of file
+    return render(request, 'core/home.html', context)
+
+
+# ==========================================
+# FRAGMENTO DEL VISITANTE
+# ==========================================
+
+@never_cache
+def visitor_fragment(request):
+    """
+    Lo que las páginas cacheadas no incluyen del visitante, en JSON.
+
+    static/js/main.js lo pide en cada página y completa el menú de usuario,
+    el contador del carrito, los mensajes de Django y el token CSRF de los
+    formularios.
+    """
+    user = request.user
+    session_key = request.session.session_key
+
+    item_count = 0
+    if session_key:
+        item_count = CartItem.objects.filter(
+            cart__session_key=session_key
+        ).aggregate(count=Sum('quantity'))['count'] or 0
+
+    return JsonResponse({
+        'user': {'name': user.get_full_name() or user.email} if user.is_authenticated else None,
+        'cart': {'item_count': item_count},
+        'messages': [
+            {'message': str(message), 'tags': message.tags or 'success'}
+            for message in messages.get_messages(request)
+        ],
+        'csrf_token': get_token(request),
+    })
+
+
+# ==========================================
+# PERFILADO (SOLO STAFF)
+# ==========================================
+
+PROFILING_SORTS = {'p95': 'p95', 'avg': 'Promedio', 'max': 'Máximo', 'total': 'Tiempo total'}
+
+
+@staff_member_required
+def profiling_report(request):
+    """Endpoints más lentos según el ring buffer de ProfilingMiddleware"""
+    if request.method == 'POST' and request.POST.get('action') == 'clear':
+        profiling.store.clear()
+        return redirect('core:profiling_report')
+
+    sort = request.GET.get('sort', 'p95')
+    if sort not in PROFILING_SORTS:
+        sort = 'p95'
+
+    context = {
+        'title': 'Endpoints más lentos',
+        'endpoints': profiling.store.slowest_endpoints(sort=sort),
+        'sample_count': len(profiling.store.records()),
+        'sort': sort,
+        'sorts': PROFILING_SORTS,
+        'profiling_enabled': settings.PROFILING_ENABLED,
+    }
+    return render(request, 'core/profiling_report.html', context)
@@ -0,0 +1,131 @@
+"""
+Precarga de workers de Passenger
+
+Passenger crea y recicla workers seguido, y sin precarga la primera petición
+de cada uno paga la importación de las URLconfs y vistas, la compilación de
+templates, la carga del backend de base de datos y de las traducciones.
+passenger_wsgi.py llama a warm_up() al arrancar el worker, antes de atender.
+
+No abre conexiones a la base de datos: una conexión creada antes de un fork
+no se puede compartir entre procesos.
+
+Para ver qué cuesta el arranque: python scripts/import_time_report.py --warmup
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+
+# Templates que el proyecto nunca renderiza (no hay vistas DRF con la API navegable)
+SKIP_TEMPLATE_PREFIXES = ('rest_framework/',)
+
+
+def load_urlconfs():
+    """Importar ROOT_URLCONF y todos los include() (y con ellos las vistas)"""
+    from django.urls import URLResolver, get_resolver
+
+    pending = [get_resolver()]
+    count = 0
+    while pending:
+        resolver = pending.pop()
+        count += 1
+        for pattern in resolver.url_patterns:
+            if isinstance(pattern, URLResolver):
+                pending.append(pattern)
+    return count
+
+
+def compile_templates():
+    """
+    Compilar los templates del proyecto y de las apps
+
+    Quedan en la caché del loader (django.template.loaders.cached, activo por
+    defecto), así la primera petición ya no los lee ni los parsea.
+
+    Returns:
+        (compilados, fallidos)
+    """
+    from django.template import TemplateSyntaxError, engines
+    from django.template.backends.django import DjangoTemplates
+
+    compiled = 0
+    failed = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        seen = set()
+        for directory in engine.template_dirs:
+            directory = Path(directory)
+            if not directory.is_dir():
+                continue
+            for path in directory.rglob('*'):
+                if path.suffix not in TEMPLATE_SUFFIXES or not path.is_file():
+                    continue
+                name = path.relative_to(directory).as_posix()
+                if name in seen or name.startswith(SKIP_TEMPLATE_PREFIXES):
+                    continue
+                seen.add(name)
+                try:
+                    engine.get_template(name)
+                    compiled += 1
+                except (TemplateSyntaxError, UnicodeDecodeError) as e:
+                    # Plantillas parciales o de otras herramientas: se compilarán (o fallarán) al usarse
+                    logger.debug(f"Template no precargado {name}: {e}")
+                    failed += 1
+    return compiled, failed
+
+
+def load_database_backend():
+    """Importar el backend de la base de datos (y su driver) sin conectarse"""
+    from django.db import connections
+
+    for alias in connections:
+        connections[alias].ops
+
+
+def load_translations():
+    """Cargar los catálogos de LANGUAGE_CODE"""
+    from django.utils import translation
+
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext('Home')
+
+
+WARMUP_STEPS = [
+    ('urlconfs', load_urlconfs),
+    ('database', load_database_backend),
+    ('translations', load_translations),
+    ('templates', compile_templates),
+]
+
+
+def warm_up():
+    """
+    Precargar el worker; un paso que falla se registra y no impide atender
+
+    Returns:
+        Dict {paso: milisegundos}
+    """
+    timings = {}
+    started = time.perf_counter()
+    for name, step in WARMUP_STEPS:
+        if name == 'templates' and not settings.WARMUP_TEMPLATES:
+            continue
+        step_started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.error(f"Precarga '{name}' falló: {e}", exc_info=True)
+        timings[name] = round((time.perf_counter() - step_started) * 1000, 1)
+
+    total = (time.perf_counter() - started) * 1000
+    logger.info(
+        f"Worker precargado en {total:.0f} ms ("
+        + ', '.join(f'{name} {ms:.0f} ms' for name, ms in timings.items()) + ')'
+    )
+    return timings
@@ -1,11 +1,29 @@
 """
 Admin interface for Payments app
 """
+from django.conf import settings
 from django.contrib import admin
+from django.db.models import Count
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import Order, OrderItem, Payment, WompiWebhookEvent
+from apps.core.exports import export_background_action, export_csv_action
+from apps.core.paginator import ApproximateCountPaginator
+from .exports import OrderExport, PaymentExport
+from .models import (
+    ArchivedWebhookEvent,
+    CheckoutAttempt,
+    DailyPaymentMethodStats,
+    DailyProductSales,
+    DailySalesRollup,
+    Order,
+    OrderItem,
+    Payment,
+    WompiWebhookEvent,
+)
+from .services.rollups import dashboard_summary
+from .services.state_machine import transition_orders
+from .services.webhooks import enqueue_events, suppressed_duplicates_recent
 
 
 class OrderItemInline(admin.TabularInline):
@@ -15,6 +33,9 @@ class OrderItemInline(admin.TabularInline):
     readonly_fields = ['product_name', 'product_sku', 'quantity', 'unit_price', 'total_price', 'product']
     can_delete = False
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
+
     def total_price(self, obj):
         return f"${obj.total_price:,.0f}"
     total_price.short_description = 'Total'
@@ -52,7 +73,13 @@ class OrderAdmin(admin.ModelAdmin):
     inlines = [OrderItemInline, PaymentInline]
     date_hierarchy = 'created_at'
     ordering = ['-created_at']
-    actions = ['mark_as_processing', 'mark_as_cancelled', 'export_to_csv']
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+    actions = [
+        'mark_as_processing', 'mark_as_cancelled',
+        export_csv_action(OrderExport, 'Exportar pedidos a CSV'),
+        export_background_action(OrderExport, 'Exportar pedidos a CSV (segundo plano, aviso por email)'),
+    ]
     list_per_page = 25
 
     fieldsets = (
@@ -74,59 +101,33 @@ class OrderAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        # Conteo de items en la misma query del changelist
+        return super().get_queryset(request).annotate(items_lines=Count('items'))
+
     def items_count(self, obj):
         """Mostrar cantidad de items en el pedido"""
-        count = obj.items.count()
+        count = obj.items_lines
         return format_html(
             '<span style="background-color: #17a2b8; color: white; padding: 2px 8px; '
             'border-radius: 3px; font-weight: bold;">{}</span>',
             count
         )
     items_count.short_description = 'Items'
+    items_count.admin_order_field = 'items_lines'
 
     def mark_as_processing(self, request, queryset):
         """Marcar pedidos como en procesamiento"""
-        updated = queryset.update(status='PROCESSING')
+        updated = transition_orders(queryset, 'PROCESSING')
         self.message_user(request, f'{updated} pedido(s) marcado(s) como EN PROCESAMIENTO.')
     mark_as_processing.short_description = 'Marcar como EN PROCESAMIENTO'
 
     def mark_as_cancelled(self, request, queryset):
         """Cancelar pedidos"""
-        updated = queryset.update(status='CANCELLED')
+        updated = transition_orders(queryset, 'CANCELLED')
         self.message_user(request, f'{updated} pedido(s) cancelado(s).')
     mark_as_cancelled.short_description = 'Cancelar pedidos seleccionados'
 
-    def export_to_csv(self, request, queryset):
-        """Exportar pedidos a CSV"""
-        import csv
-        from django.http import HttpResponse
-        from django.utils import timezone
-
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="pedidos_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-
-        writer = csv.writer(response)
-        writer.writerow([
-            'Número de Orden', 'Cliente', 'Email', 'Teléfono',
-            'Total', 'Estado', 'Items', 'Fecha Creación', 'Fecha Pago'
-        ])
-
-        for order in queryset:
-            writer.writerow([
-                order.order_number,
-                order.customer_name,
-                order.customer_email,
-                order.customer_phone,
-                f'${order.total_amount:,.0f}',
-                order.get_status_display(),
-                order.items.count(),
-                order.created_at.strftime('%Y-%m-%d %H:%M'),
-                order.paid_at.strftime('%Y-%m-%d %H:%M') if order.paid_at else '-'
-            ])
-
-        return response
-    export_to_csv.short_description = 'Exportar pedidos a CSV'
-
     def total_amount_display(self, obj):
         """Mostrar monto total formateado"""
         return f"${obj.total_amount:,.0f} COP"
@@ -199,6 +200,13 @@ class PaymentAdmin(admin.ModelAdmin):
     date_hierarchy = 'created_at'
     ordering = ['-created_at']
     list_per_page = 25
+    list_select_related = ['order']
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+    actions = [
+        export_csv_action(PaymentExport, 'Exportar pagos a CSV'),
+        export_background_action(PaymentExport, 'Exportar pagos a CSV (segundo plano, aviso por email)'),
+    ]
 
     fieldsets = (
         ('Información del Pago', {
@@ -274,18 +282,22 @@ class WompiWebhookEventAdmin(admin.ModelAdmin):
     """Admin para eventos webhook de Wompi"""
     list_display = [
         'id', 'event_type', 'transaction_id', 'payment_link',
-        'processed_badge', 'created_at'
+        'processed_badge', 'duplicate_count', 'created_at'
     ]
     list_filter = ['event_type', 'processed', 'created_at']
     search_fields = ['transaction_id', 'payment__wompi_transaction_id']
     readonly_fields = [
         'id', 'event_type', 'transaction_id', 'payload',
-        'processed', 'processed_at', 'error_message',
+        'processed', 'processed_at', 'error_message', 'attempts',
+        'idempotency_key', 'duplicate_count', 'last_duplicate_at',
         'payment', 'created_at', 'payload_display'
     ]
     date_hierarchy = 'created_at'
     ordering = ['-created_at']
     list_per_page = 50
+    list_select_related = ['payment']
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
     actions = ['mark_as_unprocessed', 'reprocess_webhooks']
 
     fieldsets = (
@@ -293,7 +305,10 @@ class WompiWebhookEventAdmin(admin.ModelAdmin):
             'fields': ('id', 'event_type', 'transaction_id', 'payment')
         }),
         ('Estado de Procesamiento', {
-            'fields': ('processed', 'processed_at', 'error_message')
+            'fields': ('processed', 'processed_at', 'error_message', 'attempts')
+        }),
+        ('Deduplicación', {
+            'fields': ('idempotency_key', 'duplicate_count', 'last_duplicate_at')
         }),
         ('Payload', {
             'fields': ('payload', 'payload_display'),
@@ -304,66 +319,29 @@ class WompiWebhookEventAdmin(admin.ModelAdmin):
         }),
     )
 
+    def changelist_view(self, request, extra_context=None):
+        """Mostrar el total de reintentos de Wompi descartados"""
+        extra_context = extra_context or {}
+        extra_context['subtitle'] = (
+            f'Entregas duplicadas descartadas (últimas {settings.WOMPI_DUPLICATES_WINDOW_HOURS} h): '
+            f'{suppressed_duplicates_recent()}'
+        )
+        return super().changelist_view(request, extra_context=extra_context)
+
     def mark_as_unprocessed(self, request, queryset):
         """Marcar webhooks como no procesados para reprocesar"""
-        updated = queryset.update(processed=False, error_message=None)
+        updated = enqueue_events(queryset)
         self.message_user(request, f'{updated} webhook(s) marcado(s) como NO PROCESADOS.')
     mark_as_unprocessed.short_description = 'Marcar como NO PROCESADO'
 
     def reprocess_webhooks(self, request, queryset):
-        """Reprocesar webhooks seleccionados"""
-        from django.utils import timezone
-
-        success_count = 0
-        error_count = 0
-
-        for webhook in queryset:
-            try:
-                # Buscar el pago
-                if webhook.payment:
-                    payment = webhook.payment
-                else:
-                    # Intentar encontrar el pago por transaction_id
-                    from .models import Payment
-                    payment = Payment.objects.get(wompi_transaction_id=webhook.transaction_id)
-                    webhook.payment = payment
-
-                # Actualizar estado del pago desde el payload
-                transaction_data = webhook.payload.get('data', {}).get('transaction', {})
-                status = transaction_data.get('status')
-
-                if status:
-                    payment.status = status
-                    payment.wompi_response = transaction_data
-                    payment.save()
-
-                    # Actualizar orden
-                    order = payment.order
-                    if status == 'APPROVED':
-                        order.status = 'PAID'
-                        order.paid_at = timezone.now()
-                    elif status in ['DECLINED', 'ERROR']:
-                        order.status = 'FAILED'
-                    order.save()
-
-                    webhook.processed = True
-                    webhook.processed_at = timezone.now()
-                    webhook.error_message = None
-                    webhook.save()
-
-                    success_count += 1
-                else:
-                    error_count += 1
-
-            except Exception as e:
-                webhook.error_message = str(e)
-                webhook.save()
-                error_count += 1
-
-        if success_count > 0:
-            self.message_user(request, f'{success_count} webhook(s) reprocesado(s) exitosamente.')
-        if error_count > 0:
-            self.message_user(request, f'{error_count} webhook(s) fallaron al reprocesar.', level='ERROR')
+        """Encolar webhooks seleccionados para que el worker los reprocese"""
+        updated = enqueue_events(queryset)
+        self.message_user(
+            request,
+            f'{updated} webhook(s) encolado(s) para reprocesar. '
+            f'El worker process_webhooks los aplicará en orden de llegada.'
+        )
     reprocess_webhooks.short_description = 'Reprocesar webhooks seleccionados'
 
     def payment_link(self, obj):
@@ -395,3 +373,114 @@ class WompiWebhookEventAdmin(admin.ModelAdmin):
         import json
         return mark_safe(f'<pre>{json.dumps(obj.payload, indent=2, ensure_ascii=False)}</pre>')
     payload_display.short_description = 'Payload (JSON)'
+
+
+@admin.register(ArchivedWebhookEvent)
+class ArchivedWebhookEventAdmin(admin.ModelAdmin):
+    """Admin para eventos webhook archivados (solo lectura)"""
+    list_display = ['id', 'event_type', 'transaction_id', 'payment', 'created_at', 'archived_at']
+    list_filter = ['event_type', 'created_at']
+    search_fields = ['transaction_id']
+    readonly_fields = [
+        'id', 'event_type', 'transaction_id', 'idempotency_key', 'payment',
+        'attempts', 'duplicate_count', 'created_at', 'processed_at', 'archived_at', 'payload_display'
+    ]
+    exclude = ['payload_compressed']
+    date_hierarchy = 'created_at'
+    ordering = ['-created_at']
+    list_per_page = 50
+    list_select_related = ['payment']
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # El payload comprimido solo se necesita en el detalle
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name.endswith('_changelist'):
+            queryset = queryset.defer('payload_compressed')
+        return queryset
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def payload_display(self, obj):
+        """Mostrar payload descomprimido"""
+        import json
+        return format_html('<pre>{}</pre>', json.dumps(obj.payload, indent=2, ensure_ascii=False))
+    payload_display.short_description = 'Payload (JSON)'
+
+
+@admin.register(CheckoutAttempt)
+class CheckoutAttemptAdmin(admin.ModelAdmin):
+    """Admin para llaves de idempotencia del checkout (solo lectura)"""
+    list_display = ['key', 'status', 'order', 'created_at', 'expires_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['key', 'order__order_number']
+    readonly_fields = ['key', 'session_key', 'status', 'order', 'result_url', 'created_at', 'expires_at']
+    raw_id_fields = ['order']
+    ordering = ['-created_at']
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+
+# ==========================================
+# REPORTES (ROLLUPS)
+# ==========================================
+
+class RollupAdmin(admin.ModelAdmin):
+    """Base para rollups: se mantienen solos, el admin es de solo lectura"""
+    date_hierarchy = 'date'
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailySalesRollup)
+class DailySalesRollupAdmin(RollupAdmin):
+    """Dashboard de ventas: KPIs leídos solo de los rollups"""
+    list_display = ['date', 'orders_count', 'revenue_display', 'average_order_value_display', 'units']
+    change_list_template = 'admin/payments/sales_dashboard.html'
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {**(extra_context or {}), 'dashboard': dashboard_summary()}
+        return super().changelist_view(request, extra_context=extra_context)
+
+    def revenue_display(self, obj):
+        return f"${obj.revenue:,.0f}"
+    revenue_display.short_description = 'Ingresos'
+    revenue_display.admin_order_field = 'revenue'
+
+    def average_order_value_display(self, obj):
+        return f"${obj.average_order_value:,.0f}"
+    average_order_value_display.short_description = 'Ticket promedio'
+
+
+@admin.register(DailyProductSales)
+class DailyProductSalesAdmin(RollupAdmin):
+    """Unidades vendidas por producto y día"""
+    list_display = ['date', 'product_name', 'product_sku', 'units', 'revenue']
+    search_fields = ['product_name', 'product_sku']
+    ordering = ['-date', '-units']
+
+
+@admin.register(DailyPaymentMethodStats)
+class DailyPaymentMethodStatsAdmin(RollupAdmin):
+    """Tasa de aprobación por método de pago y día"""
+    list_display = ['date', 'payment_method', 'attempts', 'approved', 'approval_rate_display', 'approved_amount']
+    list_filter = ['payment_method']
+
+    def approval_rate_display(self, obj):
+        return f"{obj.approval_rate * 100:.1f}%"
+    approval_rate_display.short_description = 'Aprobación'
@@ -1,17 +1,21 @@
 """
 Utilidades para envío de emails relacionados con órdenes y pagos
+
+Los emails se renderizan aquí y se encolan en el outbox (apps.core.mail);
+el comando `send_queued_emails` los entrega fuera del request.
 """
 import logging
-from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.conf import settings
 
+from apps.core.mail import queue_email
+
 logger = logging.getLogger(__name__)
 
 
 def send_order_confirmation_email(order):
     """
-    Enviar email de confirmación de orden al cliente
+    Encolar email de confirmación de orden al cliente
     """
     try:
         subject = f'Confirmación de pedido #{order.order_number} - Gateway IT'
@@ -21,28 +25,19 @@ def send_order_confirmation_email(order):
             'order': order,
         })
 
-        # Crear email
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body='',  # Texto plano vacío, usaremos solo HTML
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[order.customer_email],
-        )
-
-        email.attach_alternative(html_content, "text/html")
-        email.send()
+        queue_email(subject, [order.customer_email], html_body=html_content)
 
-        logger.info(f"Email de confirmación enviado a {order.customer_email} para orden {order.order_number}")
+        logger.info(f"Email de confirmación encolado para {order.customer_email} (orden {order.order_number})")
         return True
 
     except Exception as e:
-        logger.error(f"Error enviando email de confirmación para orden {order.order_number}: {str(e)}", exc_info=True)
+        logger.error(f"Error encolando email de confirmación para orden {order.order_number}: {str(e)}", exc_info=True)
         return False
 
 
 def send_payment_approved_email(order, payment=None):
     """
-    Enviar email cuando el pago es aprobado
+    Encolar email cuando el pago es aprobado
     """
     try:
         subject = f'Pago confirmado - Pedido #{order.order_number} - Gateway IT'
@@ -53,28 +48,19 @@ def send_payment_approved_email(order, payment=None):
             'payment': payment,
         })
 
-        # Crear email
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body='',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[order.customer_email],
-        )
+        queue_email(subject, [order.customer_email], html_body=html_content)
 
-        email.attach_alternative(html_content, "text/html")
-        email.send()
-
-        logger.info(f"Email de pago aprobado enviado a {order.customer_email} para orden {order.order_number}")
+        logger.info(f"Email de pago aprobado encolado para {order.customer_email} (orden {order.order_number})")
         return True
 
     except Exception as e:
-        logger.error(f"Error enviando email de pago aprobado para orden {order.order_number}: {str(e)}", exc_info=True)
+        logger.error(f"Error encolando email de pago aprobado para orden {order.order_number}: {str(e)}", exc_info=True)
         return False
 
 
 def send_new_order_admin_email(order):
     """
-    Enviar email de notificación de nueva orden al admin
+    Encolar email de notificación de nueva orden al admin
     """
     try:
         # Email de admin desde settings
@@ -87,20 +73,11 @@ def send_new_order_admin_email(order):
             'order': order,
         })
 
-        # Crear email
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body='',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[admin_email],
-        )
-
-        email.attach_alternative(html_content, "text/html")
-        email.send()
+        queue_email(subject, [admin_email], html_body=html_content)
 
-        logger.info(f"Email de nueva orden enviado al admin para orden {order.order_number}")
+        logger.info(f"Email de nueva orden encolado para el admin (orden {order.order_number})")
         return True
 
     except Exception as e:
-        logger.error(f"Error enviando email al admin para orden {order.order_number}: {str(e)}", exc_info=True)
-        return False
\ No newline at end of file
+        logger.error(f"Error encolando email al admin para orden {order.order_number}: {str(e)}", exc_info=True)
+        return False
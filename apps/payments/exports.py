@@ -0,0 +1,53 @@
+"""
+Exportaciones CSV de pedidos y pagos (ver apps/core/exports.py)
+"""
+from django.db.models import Count
+
+from apps.core.exports import CSVExport, format_datetime, format_money
+
+
+class OrderExport(CSVExport):
+    filename_prefix = 'pedidos'
+    columns = [
+        ('Número de Orden', 'order_number'),
+        ('Cliente', 'customer_name'),
+        ('Email', 'customer_email'),
+        ('Teléfono', 'customer_phone'),
+        ('Total', lambda order: format_money(order.total_amount)),
+        ('Estado', lambda order: order.get_status_display()),
+        ('Items', 'export_items_count'),
+        ('Fecha Creación', lambda order: format_datetime(order.created_at)),
+        ('Fecha Pago', lambda order: format_datetime(order.paid_at)),
+    ]
+
+    def get_queryset(self, queryset):
+        # Conteo de items en la misma query (antes era un COUNT por pedido)
+        return queryset.annotate(export_items_count=Count('items')).order_by('-created_at')
+
+
+class PaymentExport(CSVExport):
+    filename_prefix = 'pagos'
+    columns = [
+        ('ID Transacción', 'wompi_transaction_id'),
+        ('Referencia', 'wompi_reference'),
+        ('Número de Orden', lambda payment: payment.order.order_number),
+        ('Email', lambda payment: payment.order.customer_email),
+        ('Método', lambda payment: payment.get_payment_method_display()),
+        ('Monto', lambda payment: format_money(payment.amount)),
+        ('Moneda', 'currency'),
+        ('Estado', lambda payment: payment.get_status_display()),
+        ('Fecha Creación', lambda payment: format_datetime(payment.created_at)),
+        ('Fecha Pago', lambda payment: format_datetime(payment.paid_at)),
+    ]
+
+    def get_queryset(self, queryset):
+        # Sin wompi_response / payment_method_data: pueden pesar varios KB por fila
+        return (
+            queryset
+            .select_related('order')
+            .only(
+                'wompi_transaction_id', 'wompi_reference', 'payment_method', 'amount', 'currency',
+                'status', 'created_at', 'paid_at', 'order__order_number', 'order__customer_email',
+            )
+            .order_by('-created_at')
+        )
@@ -0,0 +1,396 @@
+"""
+Servidor Wompi simulado para pruebas de carga end-to-end
+
+Implementa los endpoints que usa WompiClient con latencia, tasa de errores y
+progresión de estados configurables, y envía webhooks `transaction.updated`
+firmados con WOMPI_EVENTS_SECRET cuando una transacción llega a su estado final.
+
+Uso local:
+    python manage.py run_fake_wompi --port 8765 --webhook-url http://localhost:8000/payments/webhook/wompi/
+    WOMPI_API_BASE_URL=http://localhost:8765/v1 python manage.py runserver
+
+Uso en proceso (benchmarks, tests):
+    server = FakeWompiServer(port=0, latency_ms=50).start()
+    with override_settings(WOMPI_API_BASE_URL=server.base_url): ...
+    server.stop()
+
+Resultados según los datos de prueba del sandbox de Wompi: tarjeta
+4242424242424242 / Nequi 3991111111 / banco PSE "1" aprueban; tarjeta
+4111111111111111 / Nequi 3992222222 / banco PSE "2" rechazan; cualquier otro
+dato termina en `default_outcome`.
+"""
+import hashlib
+import heapq
+import json
+import logging
+import random
+import re
+import threading
+import time
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+APPROVED_DATA = {'4242424242424242', '3991111111', '1'}
+DECLINED_DATA = {'4111111111111111', '3992222222', '2'}
+
+PSE_FINANCIAL_INSTITUTIONS = [
+    {'financial_institution_code': '1', 'financial_institution_name': 'Banco que aprueba'},
+    {'financial_institution_code': '2', 'financial_institution_name': 'Banco que rechaza'},
+    {'financial_institution_code': '1007', 'financial_institution_name': 'Bancolombia'},
+    {'financial_institution_code': '1001', 'financial_institution_name': 'Banco de Bogotá'},
+    {'financial_institution_code': '1051', 'financial_institution_name': 'Davivienda'},
+]
+
+# Segundos que una transacción permanece PENDING por método de pago
+DEFAULT_PENDING_SECONDS = {
+    'CARD': 0,
+    'PSE': 5,
+    'NEQUI': 5,
+    'BANCOLOMBIA_TRANSFER': 5,
+}
+
+
+class FakeWompiServer:
+    """Servidor HTTP que imita la API v1 de Wompi"""
+
+    def __init__(
+        self,
+        host='127.0.0.1',
+        port=8765,
+        latency_ms=0,
+        jitter_ms=0,
+        error_rate=0.0,
+        error_status=503,
+        pending_seconds=None,
+        default_outcome='APPROVED',
+        webhook_url=None,
+        events_secret='',
+        seed=None,
+    ):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.pending_seconds = {**DEFAULT_PENDING_SECONDS, **(pending_seconds or {})}
+        self.default_outcome = default_outcome
+        self.webhook_url = webhook_url
+        self.events_secret = events_secret
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = {}
+        self._transactions = {}
+        self._httpd = None
+        self._thread = None
+
+        # Un solo hilo resuelve las transacciones PENDING cuando vence su plazo
+        self._schedule = []
+        self._schedule_cv = threading.Condition()
+        self._stopped = threading.Event()
+        self._scheduler = threading.Thread(target=self._run_scheduler, daemon=True)
+        self._scheduler.start()
+
+    # ==========================================
+    # CICLO DE VIDA
+    # ==========================================
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/v1"
+
+    def _build_httpd(self):
+        server = self
+
+        class Handler(FakeWompiHandler):
+            fake = server
+
+        httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        httpd.daemon_threads = True
+        # Con port=0 el sistema asigna un puerto libre
+        self.port = httpd.server_address[1]
+        return httpd
+
+    def start(self):
+        """Arrancar el servidor en un hilo (uso en proceso)"""
+        self._httpd = self._build_httpd()
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Arrancar el servidor bloqueando el hilo actual"""
+        self._httpd = self._build_httpd()
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self):
+        self._stopped.set()
+        with self._schedule_cv:
+            self._schedule_cv.notify()
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+    # ==========================================
+    # SIMULACIÓN
+    # ==========================================
+
+    def simulate_latency(self):
+        delay = self.latency_ms + (self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def should_fail(self):
+        return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def tokenize_card(self, data):
+        token = f"tok_test_{uuid.uuid4().hex[:24]}"
+        number = str(data.get('number', ''))
+        with self._lock:
+            self._tokens[token] = number
+        return {
+            'status': 'CREATED',
+            'data': {
+                'id': token,
+                'brand': 'VISA' if number.startswith('4') else 'MASTERCARD',
+                'last_four': number[-4:],
+                'card_holder': data.get('card_holder', ''),
+                'exp_month': data.get('exp_month'),
+                'exp_year': data.get('exp_year'),
+            }
+        }
+
+    def _outcome(self, payment_method):
+        method_type = payment_method.get('type')
+        if method_type == 'CARD':
+            test_value = self._tokens.get(payment_method.get('token'), '')
+        elif method_type == 'NEQUI':
+            test_value = payment_method.get('phone_number', '')
+        elif method_type == 'PSE':
+            test_value = str(payment_method.get('financial_institution_code', ''))
+        else:
+            test_value = ''
+
+        if test_value in APPROVED_DATA:
+            return 'APPROVED'
+        if test_value in DECLINED_DATA:
+            return 'DECLINED'
+        return self.default_outcome
+
+    def create_transaction(self, data):
+        payment_method = dict(data.get('payment_method') or {})
+        method_type = payment_method.get('type', 'CARD')
+        now = time.time()
+        transaction_id = f"{self._random.randint(1000, 9999)}-{int(now)}-{self._random.randint(10000, 99999)}"
+
+        if method_type in ('PSE', 'BANCOLOMBIA_TRANSFER'):
+            payment_method['extra'] = {'async_payment_url': f"http://{self.host}:{self.port}/redirect/{transaction_id}"}
+            payment_method['async_payment_url'] = payment_method['extra']['async_payment_url']
+
+        transaction = {
+            'id': transaction_id,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(now)),
+            'amount_in_cents': data.get('amount_in_cents'),
+            'reference': data.get('reference'),
+            'customer_email': data.get('customer_email'),
+            'currency': data.get('currency', 'COP'),
+            'payment_method_type': method_type,
+            'payment_method': payment_method,
+            'redirect_url': data.get('redirect_url'),
+            'status': 'PENDING',
+            'status_message': None,
+        }
+        final_status = self._outcome(payment_method)
+        resolve_at = now + self.pending_seconds.get(method_type, 0)
+
+        # Como Wompi, la creación siempre responde PENDING
+        response = {'data': dict(transaction)}
+
+        with self._lock:
+            self._transactions[transaction_id] = {
+                'data': transaction,
+                'final_status': final_status,
+                'resolve_at': resolve_at,
+            }
+
+        with self._schedule_cv:
+            heapq.heappush(self._schedule, (resolve_at, transaction_id))
+            self._schedule_cv.notify()
+
+        return response
+
+    def _run_scheduler(self):
+        while not self._stopped.is_set():
+            with self._schedule_cv:
+                while not self._schedule and not self._stopped.is_set():
+                    self._schedule_cv.wait()
+                if self._stopped.is_set():
+                    return
+                resolve_at, transaction_id = self._schedule[0]
+                wait = resolve_at - time.time()
+                if wait > 0:
+                    self._schedule_cv.wait(timeout=wait)
+                    continue
+                heapq.heappop(self._schedule)
+            self._resolve(transaction_id)
+
+    def get_transaction(self, transaction_id):
+        with self._lock:
+            record = self._transactions.get(transaction_id)
+        if record is None:
+            return None
+        if record['data']['status'] == 'PENDING' and time.time() >= record['resolve_at']:
+            self._resolve(transaction_id)
+        return {'data': dict(record['data'])}
+
+    def _resolve(self, transaction_id):
+        """Pasar la transacción a su estado final y notificar por webhook"""
+        with self._lock:
+            record = self._transactions.get(transaction_id)
+            if record is None or record['data']['status'] != 'PENDING':
+                return
+            record['data']['status'] = record['final_status']
+            transaction = dict(record['data'])
+
+        if self.webhook_url:
+            threading.Thread(target=self.send_webhook, args=[transaction], daemon=True).start()
+
+    def build_event(self, transaction, timestamp=None):
+        """Construir un evento transaction.updated firmado como lo hace Wompi"""
+        timestamp = timestamp or int(time.time())
+        properties = ['transaction.id', 'transaction.status', 'transaction.amount_in_cents']
+        values = ''.join(str(transaction.get(prop.split('.', 1)[1], '')) for prop in properties)
+        checksum = hashlib.sha256(f"{values}{timestamp}{self.events_secret}".encode('utf-8')).hexdigest()
+        return {
+            'event': 'transaction.updated',
+            'data': {'transaction': transaction},
+            'environment': 'test',
+            'signature': {'properties': properties, 'checksum': checksum},
+            'timestamp': timestamp,
+            'sent_at': time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(timestamp)),
+        }
+
+    def send_webhook(self, transaction):
+        body = json.dumps(self.build_event(transaction)).encode('utf-8')
+        request = urllib.request.Request(
+            self.webhook_url, data=body, headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                logger.info(f"Fake Wompi: webhook {transaction['id']} -> {response.status}")
+        except Exception as e:
+            logger.warning(f"Fake Wompi: error enviando webhook {transaction['id']}: {e}")
+
+
+class FakeWompiHandler(BaseHTTPRequestHandler):
+    """Handler HTTP; `fake` se inyecta con la instancia de FakeWompiServer"""
+
+    fake = None
+    protocol_version = 'HTTP/1.1'
+
+    ROUTES = [
+        ('GET', re.compile(r'^/v1/merchants/(?P<key>[^/]+)$'), 'merchant'),
+        ('POST', re.compile(r'^/v1/tokens/cards$'), 'tokens_cards'),
+        ('POST', re.compile(r'^/v1/transactions$'), 'transactions_create'),
+        ('GET', re.compile(r'^/v1/transactions/(?P<transaction_id>[^/]+)$'), 'transactions_detail'),
+        ('GET', re.compile(r'^/v1/pse/financial_institutions$'), 'pse_institutions'),
+        ('GET', re.compile(r'^/redirect/(?P<transaction_id>[^/]+)$'), 'async_redirect'),
+    ]
+
+    def log_message(self, format, *args):
+        logger.debug(f"Fake Wompi: {format % args}")
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        path = self.path.split('?', 1)[0]
+        self.fake.simulate_latency()
+
+        for route_method, pattern, handler_name in self.ROUTES:
+            match = pattern.match(path)
+            if route_method == method and match:
+                if handler_name != 'async_redirect' and self.fake.should_fail():
+                    return self._json(self.fake.error_status, {
+                        'error': {'type': 'SIMULATED_ERROR', 'reason': 'Error simulado por el servidor de pruebas'}
+                    })
+                return getattr(self, handler_name)(**match.groupdict())
+
+        self._json(404, {'error': {'type': 'NOT_FOUND_ERROR', 'reason': 'La entidad solicitada no existe'}})
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length).decode('utf-8'))
+        except ValueError:
+            return {}
+
+    def _json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # ==========================================
+    # ENDPOINTS
+    # ==========================================
+
+    def merchant(self, key):
+        self._json(200, {
+            'data': {
+                'id': 1,
+                'name': 'Gateway IT (simulado)',
+                'public_key': key,
+                'presigned_acceptance': {
+                    'acceptance_token': f"fake-acceptance-{uuid.uuid4().hex}",
+                    'permalink': 'https://wompi.co/terminos-y-condiciones-simulados.pdf',
+                    'type': 'END_USER_POLICY',
+                },
+            }
+        })
+
+    def tokens_cards(self):
+        self._json(201, self.fake.tokenize_card(self._read_json()))
+
+    def transactions_create(self):
+        data = self._read_json()
+        if not data.get('reference') or not data.get('amount_in_cents'):
+            return self._json(422, {
+                'error': {'type': 'INPUT_VALIDATION_ERROR', 'reason': 'reference y amount_in_cents son obligatorios'}
+            })
+        self._json(201, self.fake.create_transaction(data))
+
+    def transactions_detail(self, transaction_id):
+        response = self.fake.get_transaction(transaction_id)
+        if response is None:
+            return self._json(404, {'error': {'type': 'NOT_FOUND_ERROR', 'reason': 'La transacción no existe'}})
+        self._json(200, response)
+
+    def pse_institutions(self):
+        self._json(200, {'data': PSE_FINANCIAL_INSTITUTIONS})
+
+    def async_redirect(self, transaction_id):
+        """Simula el portal del banco: redirige de vuelta a redirect_url"""
+        response = self.fake.get_transaction(transaction_id)
+        redirect_url = response and response['data'].get('redirect_url')
+        if not redirect_url:
+            return self._json(404, {'error': {'type': 'NOT_FOUND_ERROR', 'reason': 'La transacción no existe'}})
+        separator = '&' if '?' in redirect_url else '?'
+        self.send_response(302)
+        self.send_header('Location', f"{redirect_url}{separator}id={transaction_id}")
+        self.send_header('Content-Length', '0')
+        self.end_headers()
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.payments.services.webhook_archive import archivable_events, archive_events
+
+
+class Command(BaseCommand):
+    help = 'Mueve los eventos webhook procesados más antiguos que la retención al archivo comprimido (usar desde cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.WOMPI_WEBHOOK_RETENTION_DAYS,
+            help='Archivar eventos procesados con más de estos días'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.WOMPI_WEBHOOK_ARCHIVE_BATCH_SIZE,
+            help='Eventos por lote (cada lote es una transacción)'
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            default=None,
+            help='Detenerse después de estos lotes (por defecto hasta terminar)'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.0,
+            help='Segundos de espera entre lotes'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo contar los eventos que se archivarían'
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = archivable_events(options['days']).count()
+            self.stdout.write(f'Eventos a archivar (más de {options["days"]} días): {count}')
+            return
+
+        archived = archive_events(
+            options['days'],
+            options['batch_size'],
+            max_batches=options['max_batches'],
+            pause=options['pause'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Eventos webhook archivados: {archived}'))
@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.payments.services.webhooks import process_pending_events, suppressed_duplicates_recent
+
+
+class Command(BaseCommand):
+    help = 'Procesa los eventos webhook de Wompi pendientes (usar desde cron o en modo --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.WOMPI_WEBHOOK_BATCH_SIZE,
+            help='Eventos reclamados por lote'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Seguir procesando indefinidamente en lugar de salir cuando la cola está vacía'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Segundos de espera entre lotes cuando la cola está vacía (con --loop)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total_processed = 0
+        total_failed = 0
+
+        while True:
+            processed, failed = process_pending_events(batch_size)
+            total_processed += processed
+            total_failed += failed
+
+            if processed or failed:
+                self.stdout.write(f'Lote: {processed} procesado(s), {failed} fallido(s)')
+
+            # Lote incompleto: la cola quedó vacía (o solo quedan eventos bloqueados)
+            if processed + failed < batch_size:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Webhooks procesados: {total_processed} | Fallidos: {total_failed} | '
+            f'Duplicados descartados (últimas {settings.WOMPI_DUPLICATES_WINDOW_HOURS} h): {suppressed_duplicates_recent()}'
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.payments.services.idempotency import purge_expired_attempts
+
+
+class Command(BaseCommand):
+    help = 'Borra las llaves de idempotencia de checkout vencidas (usar desde cron, ej: diario)'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_attempts()
+        self.stdout.write(self.style.SUCCESS(f'Llaves de checkout vencidas borradas: {deleted}'))
@@ -0,0 +1,59 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.payments.services.rollups import rebuild_day
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los rollups diarios de ventas desde pedidos y pagos (backfill o corrección)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Días hacia atrás desde hoy (ignorado si se usa --from)'
+        )
+        parser.add_argument(
+            '--from',
+            dest='start',
+            default=None,
+            help='Fecha inicial YYYY-MM-DD'
+        )
+        parser.add_argument(
+            '--to',
+            dest='end',
+            default=None,
+            help='Fecha final YYYY-MM-DD (por defecto hoy)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            end = date.fromisoformat(options['end']) if options['end'] else timezone.localdate()
+            if options['start']:
+                start = date.fromisoformat(options['start'])
+            else:
+                start = end - timedelta(days=options['days'] - 1)
+        except ValueError as e:
+            raise CommandError(f'Fecha inválida: {e}')
+
+        if start > end:
+            raise CommandError('--from debe ser anterior a --to')
+
+        total_orders = 0
+        total_payments = 0
+        day = start
+        while day <= end:
+            orders, payments = rebuild_day(day)
+            total_orders += orders
+            total_payments += payments
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{day}: {orders} pedido(s) pagado(s), {payments} pago(s) con resultado')
+            day += timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rollups recalculados del {start} al {end}: '
+            f'{total_orders} pedido(s) pagado(s), {total_payments} pago(s) con resultado'
+        ))
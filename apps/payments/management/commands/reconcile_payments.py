@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.payments.services.reconciliation import reconcile_pending_payments
+
+
+class Command(BaseCommand):
+    help = 'Concilia con Wompi los pagos que siguen PENDING (webhooks perdidos)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=settings.WOMPI_RECONCILE_OLDER_THAN_MINUTES,
+            help='Solo pagos PENDING creados hace más de N minutos'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=settings.WOMPI_RECONCILE_LIMIT,
+            help='Máximo de pagos a revisar por corrida'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.WOMPI_RECONCILE_WORKERS,
+            help='Consultas concurrentes a Wompi'
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=settings.WOMPI_RECONCILE_RATE,
+            help='Máximo de peticiones por segundo a Wompi'
+        )
+
+    def handle(self, *args, **options):
+        stats = reconcile_pending_payments(
+            older_than_minutes=options['older_than'],
+            limit=options['limit'],
+            workers=options['workers'],
+            rate=options['rate'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Revisados: {stats['checked']} | Actualizados: {stats['updated']} | "
+            f"Siguen pendientes: {stats['still_pending']} | Errores: {stats['errors']} "
+            f"(429: {stats['rate_limited']})"
+        ))
+        self.stdout.write(
+            f"Tiempo: {stats['elapsed_seconds']}s | Throughput: {stats['per_second']} pagos/s"
+        )
@@ -0,0 +1,65 @@
+import gzip
+import sys
+from datetime import date, datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.payments.services.webhook_archive import archived_events, export_archived, restore_archived
+
+
+def _parse_date(value):
+    try:
+        return timezone.make_aware(datetime.combine(date.fromisoformat(value), time.min))
+    except ValueError:
+        raise CommandError(f'Fecha inválida: {value}')
+
+
+class Command(BaseCommand):
+    help = 'Recupera eventos webhook archivados para auditoría (JSONL o de vuelta a la tabla de eventos)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transaction-id', default=None, help='ID de transacción de Wompi')
+        parser.add_argument('--payment', default=None, help='ID (UUID) del pago')
+        parser.add_argument('--from', dest='start', default=None, help='Desde YYYY-MM-DD (creación del evento)')
+        parser.add_argument('--to', dest='end', default=None, help='Hasta YYYY-MM-DD (exclusivo)')
+        parser.add_argument(
+            '--output',
+            default=None,
+            help='Archivo JSONL de salida (.gz para comprimir); por defecto la salida estándar'
+        )
+        parser.add_argument(
+            '--restore',
+            action='store_true',
+            help='Devolver los eventos a WompiWebhookEvent en lugar de exportarlos'
+        )
+
+    def handle(self, *args, **options):
+        if not any(options[key] for key in ('transaction_id', 'payment', 'start', 'end')):
+            raise CommandError('Indica al menos un filtro: --transaction-id, --payment, --from o --to')
+
+        queryset = archived_events(
+            transaction_id=options['transaction_id'],
+            payment_id=options['payment'],
+            start=_parse_date(options['start']) if options['start'] else None,
+            end=_parse_date(options['end']) if options['end'] else None,
+        )
+
+        if options['restore']:
+            restored, skipped = restore_archived(queryset)
+            self.stdout.write(self.style.SUCCESS(f'Eventos restaurados a la tabla de webhooks: {restored}'))
+            if skipped:
+                self.stdout.write(self.style.WARNING(
+                    f'Omitidos (ya existe un evento vivo con su id o llave; siguen archivados): {skipped}'
+                ))
+            return
+
+        output = options['output']
+        if not output:
+            export_archived(queryset, sys.stdout)
+            return
+
+        opener = gzip.open if output.endswith('.gz') else open
+        with opener(output, 'wt', encoding='utf-8') as fh:
+            count = export_archived(queryset, fh)
+        self.stderr.write(self.style.SUCCESS(f'Eventos exportados a {output}: {count}'))
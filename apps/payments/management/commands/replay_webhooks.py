@@ -0,0 +1,155 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from apps.core.benchmarking import format_latency_summary, latency_summary
+from apps.payments.services.webhook_replay import (
+    delete_replayed_events,
+    measure_drain,
+    replay_events,
+    stored_payloads,
+    synthetic_payloads,
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark del webhook de Wompi: reproduce eventos guardados o sintéticos y reporta throughput y latencias'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            choices=['stored', 'synthetic'],
+            default='stored',
+            help='Payloads guardados en WompiWebhookEvent o generados'
+        )
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=500,
+            help='Cantidad de eventos a enviar (los guardados se repiten si no alcanzan)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Hilos enviando eventos en paralelo'
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=None,
+            help='Máximo de eventos por segundo (por defecto sin límite)'
+        )
+        parser.add_argument(
+            '--secret',
+            default='replay-test-secret',
+            help='WOMPI_EVENTS_SECRET de prueba con el que se re-firman los eventos'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=None,
+            help='Semilla para los eventos sintéticos'
+        )
+        parser.add_argument(
+            '--drain',
+            action='store_true',
+            help='Medir también el worker procesando la cola (en una transacción que se revierte)'
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='No borrar los eventos creados por el replay'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Imprimir el reporte como JSON'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.WEBHOOK_REPLAY_ALLOWED:
+            raise CommandError(
+                'replay_webhooks escribe en la cola de webhooks: úsalo contra una base de datos aparte '
+                '(copia o staging, sin cron de process_webhooks) con WEBHOOK_REPLAY_ALLOWED=True'
+            )
+
+        count = options['count']
+
+        if options['source'] == 'stored':
+            payloads = stored_payloads(count)
+            if not payloads:
+                raise CommandError('No hay eventos guardados; usa --source synthetic')
+            payloads = [payloads[i % len(payloads)] for i in range(count)]
+        else:
+            payloads = synthetic_payloads(count, seed=options['seed'])
+
+        allowed_hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        with override_settings(WOMPI_EVENTS_SECRET=options['secret'], ALLOWED_HOSTS=allowed_hosts):
+            results = replay_events(
+                payloads,
+                secret=options['secret'],
+                concurrency=options['concurrency'],
+                rate=options['rate'],
+            )
+
+        elapsed = results['elapsed_seconds']
+        queries = results['queries']
+        report = {
+            'source': options['source'],
+            'events': len(payloads),
+            'concurrency': options['concurrency'],
+            'created': results['created'],
+            'duplicates': results['duplicates'],
+            'errors': results['errors'],
+            'status_codes': results['status_codes'],
+            'elapsed_seconds': round(elapsed, 3),
+            'events_per_second': round(len(results['latencies']) / elapsed, 2) if elapsed else 0.0,
+            'latency_ms': latency_summary(results['latencies']),
+            'queries_per_event': {
+                'mean': round(sum(queries) / len(queries), 2) if queries else 0.0,
+                'max': max(queries) if queries else 0,
+            },
+        }
+
+        if options['drain']:
+            drain = measure_drain()
+            report['drain'] = {
+                'processed': drain['processed'],
+                'failed': drain['failed'],
+                'elapsed_seconds': round(drain['elapsed_seconds'], 3),
+                'events_per_second': round(drain['processed'] / drain['elapsed_seconds'], 2) if drain['elapsed_seconds'] else 0.0,
+                'queries_per_event': round(drain['queries'] / drain['processed'], 2) if drain['processed'] else 0.0,
+            }
+
+        if not options['keep']:
+            report['deleted'] = delete_replayed_events(results['event_ids'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"Eventos: {report['events']} ({report['source']}) | Concurrencia: {report['concurrency']} | "
+            f"Creados: {report['created']} | Duplicados: {report['duplicates']} | Errores: {report['errors']}"
+        )
+        self.stdout.write(f"Códigos HTTP: {report['status_codes']}")
+        self.stdout.write(
+            f"Tiempo: {report['elapsed_seconds']}s | Throughput: {report['events_per_second']} eventos/s"
+        )
+        self.stdout.write(f"Latencia: {format_latency_summary(report['latency_ms'])}")
+        self.stdout.write(
+            f"Queries por evento: {report['queries_per_event']['mean']} (max {report['queries_per_event']['max']})"
+        )
+        if 'drain' in report:
+            drain = report['drain']
+            self.stdout.write(
+                f"Worker: {drain['processed']} procesado(s), {drain['failed']} fallido(s) en "
+                f"{drain['elapsed_seconds']}s | {drain['events_per_second']} eventos/s | "
+                f"{drain['queries_per_event']} queries/evento (revertido)"
+            )
+
+        style = self.style.SUCCESS if not report['errors'] else self.style.WARNING
+        self.stdout.write(style('Replay terminado'))
@@ -0,0 +1,55 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.payments.fake_wompi import FakeWompiServer
+
+
+class Command(BaseCommand):
+    help = 'Levanta un servidor Wompi simulado para pruebas de carga (apuntar WOMPI_API_BASE_URL a él)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency-ms', type=float, default=0, help='Latencia base por petición')
+        parser.add_argument('--jitter-ms', type=float, default=0, help='Variación aleatoria de la latencia (+/-)')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fracción de peticiones que fallan (0-1)')
+        parser.add_argument('--error-status', type=int, default=503, help='Código HTTP de los errores simulados')
+        parser.add_argument(
+            '--pending-seconds',
+            default='',
+            help='JSON con segundos en PENDING por método, ej: \'{"PSE": 10, "CARD": 0}\''
+        )
+        parser.add_argument(
+            '--default-outcome',
+            default='APPROVED',
+            choices=['APPROVED', 'DECLINED', 'ERROR'],
+            help='Estado final para datos que no son de prueba del sandbox'
+        )
+        parser.add_argument('--webhook-url', default='', help='URL de wompi_webhook a notificar')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        server = FakeWompiServer(
+            host=options['host'],
+            port=options['port'],
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            error_rate=options['error_rate'],
+            error_status=options['error_status'],
+            pending_seconds=json.loads(options['pending_seconds']) if options['pending_seconds'] else None,
+            default_outcome=options['default_outcome'],
+            webhook_url=options['webhook_url'] or None,
+            events_secret=settings.WOMPI_EVENTS_SECRET,
+            seed=options['seed'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Fake Wompi escuchando en http://{options['host']}:{options['port']}/v1 "
+            f"(WOMPI_API_BASE_URL=http://{options['host']}:{options['port']}/v1)"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('Servidor detenido')
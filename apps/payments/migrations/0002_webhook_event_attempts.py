@@ -0,0 +1,22 @@
+# Generated by Django 4.2.17 on 2026-10-19 07:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wompiwebhookevent',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Intentos fallidos de procesamiento por el worker'),
+        ),
+        migrations.AddIndex(
+            model_name='wompiwebhookevent',
+            index=models.Index(fields=['processed', 'created_at'], name='payments_wo_process_9b3348_idx'),
+        ),
+    ]
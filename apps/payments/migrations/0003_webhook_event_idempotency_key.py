@@ -0,0 +1,28 @@
+# Generated by Django 4.2.17 on 2026-10-19 07:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_webhook_event_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wompiwebhookevent',
+            name='duplicate_count',
+            field=models.PositiveIntegerField(default=0, help_text='Entregas duplicadas recibidas y descartadas'),
+        ),
+        migrations.AddField(
+            model_name='wompiwebhookevent',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, help_text='SHA256 de evento + transacción + estado + timestamp', max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='wompiwebhookevent',
+            name='last_duplicate_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
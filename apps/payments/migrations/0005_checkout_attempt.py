@@ -0,0 +1,32 @@
+# Generated by Django 4.2.17 on 2026-10-19 07:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_payment_status_created_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckoutAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('session_key', models.CharField(blank=True, max_length=40)),
+                ('status', models.CharField(choices=[('IN_PROGRESS', 'En proceso'), ('COMPLETED', 'Completado')], default='IN_PROGRESS', max_length=20)),
+                ('result_url', models.CharField(blank=True, max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='checkout_attempts', to='payments.order')),
+            ],
+            options={
+                'verbose_name': 'Intento de checkout',
+                'verbose_name_plural': 'Intentos de checkout',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.17 on 2026-10-19 07:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_checkout_attempt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderNumberBlock',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Bloque de números de orden',
+                'verbose_name_plural': 'Bloques de números de orden',
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.17 on 2026-10-19 07:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0006_order_number_block'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyPaymentMethodStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('payment_method', models.CharField(choices=[('CARD', 'Tarjeta de Crédito/Débito'), ('PSE', 'PSE'), ('NEQUI', 'Nequi'), ('BANCOLOMBIA', 'Bancolombia'), ('BANCOLOMBIA_TRANSFER', 'Bancolombia Transfer'), ('BANCOLOMBIA_COLLECT', 'Bancolombia Collect'), ('BANCOLOMBIA_QR', 'Bancolombia QR')], max_length=50)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Pagos con resultado final')),
+                ('approved', models.PositiveIntegerField(default=0)),
+                ('approved_amount', models.DecimalField(decimal_places=0, default=0, max_digits=16)),
+            ],
+            options={
+                'verbose_name': 'Pagos diarios por método',
+                'verbose_name_plural': 'Pagos diarios por método',
+                'ordering': ['-date', 'payment_method'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('product_sku', models.CharField(blank=True, max_length=100)),
+                ('product_name', models.CharField(max_length=200)),
+                ('units', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=0, default=0, max_digits=16)),
+            ],
+            options={
+                'verbose_name': 'Ventas diarias por producto',
+                'verbose_name_plural': 'Ventas diarias por producto',
+                'ordering': ['-date', '-units'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('orders_count', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=0, default=0, max_digits=16)),
+                ('units', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Ventas diarias',
+                'verbose_name_plural': 'Ventas diarias',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyproductsales',
+            constraint=models.UniqueConstraint(fields=('date', 'product_sku', 'product_name'), name='uniq_daily_product_sales'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailypaymentmethodstats',
+            constraint=models.UniqueConstraint(fields=('date', 'payment_method'), name='uniq_daily_payment_method_stats'),
+        ),
+    ]
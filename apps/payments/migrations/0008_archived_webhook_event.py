@@ -0,0 +1,35 @@
+# Generated by Django 4.2.17 on 2026-10-19 07:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0007_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedWebhookEvent',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('event_type', models.CharField(choices=[('transaction.updated', 'Transacción actualizada'), ('nequi_token.updated', 'Token Nequi actualizado')], max_length=50)),
+                ('transaction_id', models.CharField(blank=True, db_index=True, max_length=100)),
+                ('idempotency_key', models.CharField(blank=True, db_index=True, max_length=64, null=True)),
+                ('payload_compressed', models.BinaryField(help_text='Payload JSON comprimido con zlib')),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('duplicate_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('payment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_webhook_events', to='payments.payment')),
+            ],
+            options={
+                'verbose_name': 'Evento Webhook archivado',
+                'verbose_name_plural': 'Eventos Webhook archivados',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-19 08:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0009_order_user_created_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='wompiwebhookevent',
+            index=models.Index(fields=['last_duplicate_at'], name='webhook_last_duplicate_idx'),
+        ),
+    ]
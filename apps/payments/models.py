@@ -4,7 +4,9 @@ from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from django.utils.text import slugify
 from decimal import Decimal
+import json
 import uuid
+import zlib
 
 User = get_user_model()
 
@@ -81,6 +83,8 @@ class Order(models.Model):
             models.Index(fields=['-created_at']),
             models.Index(fields=['status']),
             models.Index(fields=['customer_email']),
+            # Historial "Mis Compras" (paginación por cursor)
+            models.Index(fields=['user', '-created_at'], name='order_user_created_idx'),
         ]
 
     def __str__(self):
@@ -88,12 +92,9 @@ class Order(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.order_number:
-            # Generar número de orden único
-            import random
-            import string
-            timestamp = str(int(self.created_at.timestamp())) if self.created_at else str(int(uuid.uuid4().int))[:10]
-            random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-            self.order_number = f"GW-{timestamp}-{random_str}"
+            # Número consecutivo por bloques (ver services/order_numbers.py)
+            from .services.order_numbers import next_order_number
+            self.order_number = next_order_number()
         super().save(*args, **kwargs)
 
     @property
@@ -259,6 +260,7 @@ class Payment(models.Model):
         indexes = [
             models.Index(fields=['-created_at']),
             models.Index(fields=['status']),
+            models.Index(fields=['status', 'created_at']),
             models.Index(fields=['wompi_transaction_id']),
             models.Index(fields=['wompi_reference']),
         ]
@@ -279,6 +281,25 @@ class Payment(models.Model):
         return f"${self.amount:,.0f}"
 
 
+class OrderNumberBlock(models.Model):
+    """
+    Bloque de números de orden reservado por un proceso
+
+    Cada fila es un bloque: el id autoincremental define el rango de números
+    que el proceso puede asignar sin volver a la base de datos.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Bloque de números de orden"
+        verbose_name_plural = "Bloques de números de orden"
+
+    def __str__(self):
+        return f"Bloque {self.id}"
+
+
 class WompiWebhookEvent(models.Model):
     """Registro de eventos webhook de Wompi"""
 
@@ -295,10 +316,29 @@ class WompiWebhookEvent(models.Model):
     transaction_id = models.CharField(max_length=100, blank=True)
     payload = models.JSONField(help_text="Payload completo del webhook")
 
+    # Deduplicación de reintentos de Wompi
+    idempotency_key = models.CharField(
+        max_length=64,
+        unique=True,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="SHA256 de evento + transacción + estado + timestamp"
+    )
+    duplicate_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Entregas duplicadas recibidas y descartadas"
+    )
+    last_duplicate_at = models.DateTimeField(null=True, blank=True)
+
     # Procesamiento
     processed = models.BooleanField(default=False)
     processed_at = models.DateTimeField(null=True, blank=True)
     error_message = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Intentos fallidos de procesamiento por el worker"
+    )
 
     # Relacionado con pago (si se encontró)
     payment = models.ForeignKey(
@@ -319,8 +359,172 @@ class WompiWebhookEvent(models.Model):
         indexes = [
             models.Index(fields=['-created_at']),
             models.Index(fields=['processed']),
+            models.Index(fields=['processed', 'created_at']),
             models.Index(fields=['transaction_id']),
+            # Duplicados recientes (suppressed_duplicates_recent)
+            models.Index(fields=['last_duplicate_at'], name='webhook_last_duplicate_idx'),
         ]
 
     def __str__(self):
         return f"{self.event_type} - {self.transaction_id} - {'Procesado' if self.processed else 'Pendiente'}"
+
+
+class ArchivedWebhookEvent(models.Model):
+    """
+    Evento webhook procesado movido fuera de WompiWebhookEvent
+
+    Guarda una fila delgada con los campos de búsqueda y el payload
+    comprimido con zlib (ver services/webhook_archive.py).
+    """
+
+    # Mismo id que tenía el evento original
+    id = models.UUIDField(primary_key=True, editable=False)
+    event_type = models.CharField(max_length=50, choices=WompiWebhookEvent.EVENT_CHOICES)
+    transaction_id = models.CharField(max_length=100, blank=True, db_index=True)
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True, db_index=True)
+    payment = models.ForeignKey(
+        Payment,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_webhook_events'
+    )
+
+    payload_compressed = models.BinaryField(help_text="Payload JSON comprimido con zlib")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    duplicate_count = models.PositiveIntegerField(default=0)
+
+    # Timestamps
+    created_at = models.DateTimeField(db_index=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Evento Webhook archivado"
+        verbose_name_plural = "Eventos Webhook archivados"
+
+    def __str__(self):
+        return f"{self.event_type} - {self.transaction_id} - archivado"
+
+    @staticmethod
+    def compress_payload(payload):
+        raw = json.dumps(payload, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+        return zlib.compress(raw.encode('utf-8'), 9)
+
+    @property
+    def payload(self):
+        return json.loads(zlib.decompress(bytes(self.payload_compressed)).decode('utf-8'))
+
+
+class CheckoutAttempt(models.Model):
+    """
+    Llave de idempotencia de un intento de checkout
+
+    El formulario de checkout lleva una llave única; si el mismo envío llega
+    dos veces (doble clic, reintento del navegador) se devuelve el resultado
+    del primero sin crear otra orden ni llamar de nuevo a Wompi.
+    """
+
+    STATUS_CHOICES = [
+        ('IN_PROGRESS', 'En proceso'),
+        ('COMPLETED', 'Completado'),
+    ]
+
+    key = models.CharField(max_length=64, unique=True)
+    session_key = models.CharField(max_length=40, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='IN_PROGRESS')
+
+    # Resultado del primer envío
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='checkout_attempts'
+    )
+    result_url = models.CharField(max_length=500, blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Intento de checkout"
+        verbose_name_plural = "Intentos de checkout"
+
+    def __str__(self):
+        return f"{self.key} - {self.get_status_display()}"
+
+
+# ==========================================
+# ROLLUPS DE REPORTES (ver services/rollups.py)
+# ==========================================
+
+class DailySalesRollup(models.Model):
+    """Ventas del día: órdenes pagadas, ingresos y unidades (por fecha de pago)"""
+
+    date = models.DateField(unique=True)
+    orders_count = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=16, decimal_places=0, default=0)
+    units = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+        verbose_name = "Ventas diarias"
+        verbose_name_plural = "Ventas diarias"
+
+    def __str__(self):
+        return f"{self.date} - {self.orders_count} pedidos"
+
+    @property
+    def average_order_value(self):
+        return self.revenue / self.orders_count if self.orders_count else Decimal('0')
+
+
+class DailyProductSales(models.Model):
+    """Unidades e ingresos por producto y día (snapshot de OrderItem)"""
+
+    date = models.DateField()
+    product_sku = models.CharField(max_length=100, blank=True)
+    product_name = models.CharField(max_length=200)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=16, decimal_places=0, default=0)
+
+    class Meta:
+        ordering = ['-date', '-units']
+        verbose_name = "Ventas diarias por producto"
+        verbose_name_plural = "Ventas diarias por producto"
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'product_sku', 'product_name'], name='uniq_daily_product_sales'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.product_name}: {self.units}"
+
+
+class DailyPaymentMethodStats(models.Model):
+    """Resultados de pagos por método y día (por fecha de creación del pago)"""
+
+    date = models.DateField()
+    payment_method = models.CharField(max_length=50, choices=Payment.PAYMENT_METHOD_CHOICES)
+    attempts = models.PositiveIntegerField(default=0, help_text="Pagos con resultado final")
+    approved = models.PositiveIntegerField(default=0)
+    approved_amount = models.DecimalField(max_digits=16, decimal_places=0, default=0)
+
+    class Meta:
+        ordering = ['-date', 'payment_method']
+        verbose_name = "Pagos diarios por método"
+        verbose_name_plural = "Pagos diarios por método"
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'payment_method'], name='uniq_daily_payment_method_stats'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.payment_method}: {self.approved}/{self.attempts}"
+
+    @property
+    def approval_rate(self):
+        return self.approved / self.attempts if self.attempts else 0.0
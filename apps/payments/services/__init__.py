@@ -1,3 +1,24 @@
-from .wompi_client import WompiClient
+"""
+Servicios de pagos
 
-__all__ = ['WompiClient']
+WompiClient y AsyncWompiClient se importan al primer uso (PEP 562): su módulo
+carga `requests` (~70 ms) y lo demás de services (rollups, webhooks,
+state_machine), que se importa desde el admin y los comandos de cron, no lo
+necesita.
+"""
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    'WompiClient': '.wompi_client',
+    'AsyncWompiClient': '.async_wompi_client',
+}
+
+__all__ = ['WompiClient', 'AsyncWompiClient']
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,172 @@
+"""
+Cliente asíncrono de Wompi para despliegues ASGI (config/asgi.py)
+
+Misma API que WompiClient, pero los métodos que llaman a Wompi son corrutinas
+y usan un httpx.AsyncClient compartido (pool de conexiones keep-alive por
+event loop). Así una espera larga de PSE/Nequi no ocupa un hilo del servidor y
+varias llamadas pueden solaparse:
+
+    client = AsyncWompiClient()
+    acceptance, transaction = await asyncio.gather(
+        client.get_acceptance_token(),
+        client.get_transaction(transaction_id),
+    )
+
+Firma de integridad, headers, builders de payment_method y manejo de errores
+se heredan de WompiClient.
+"""
+import asyncio
+import logging
+import weakref
+from typing import Dict, List, Optional
+
+from django.core.exceptions import ImproperlyConfigured
+
+from apps.core.profiling import span
+from .wompi_client import WompiAPIException, WompiClient
+
+logger = logging.getLogger(__name__)
+
+# Un AsyncClient por event loop: los clientes de httpx no se pueden compartir entre loops
+_http_clients = weakref.WeakKeyDictionary()
+
+# Máximo de conexiones abiertas hacia Wompi por proceso
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+
+
+def _import_httpx():
+    try:
+        import httpx
+    except ImportError:
+        raise ImproperlyConfigured('AsyncWompiClient requiere httpx (pip install httpx)')
+    return httpx
+
+
+def get_http_client(timeout):
+    """AsyncClient compartido del event loop actual (se crea la primera vez)"""
+    httpx = _import_httpx()
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+        _http_clients[loop] = client
+    return client
+
+
+async def close_http_client():
+    """Cerrar el AsyncClient del event loop actual (ej: en el shutdown del servidor ASGI)"""
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+class AsyncWompiClient(WompiClient):
+    """
+    Variante asíncrona de WompiClient
+
+    get_acceptance_token, tokenize_card, create_transaction, get_transaction y
+    get_pse_financial_institutions deben usarse con `await`.
+    """
+
+    def __init__(self):
+        """Inicializar cliente con configuración de Django settings"""
+        self._load_settings()
+
+    async def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        use_private_key: bool = False
+    ) -> Dict:
+        """
+        Realizar petición a la API de Wompi
+
+        Raises:
+            WompiAPIException: En caso de error
+        """
+        httpx = _import_httpx()
+        url = f"{self.base_url}{endpoint}"
+        headers = self._get_headers(use_private_key=use_private_key)
+        client = get_http_client(self.timeout)
+
+        try:
+            key_type = "PRIVATE" if use_private_key else "PUBLIC"
+            logger.info(f"Wompi API (async): {method} {endpoint} (Auth: {key_type})")
+
+            with span('wompi'):
+                if method.upper() == 'GET':
+                    response = await client.get(url, headers=headers, params=data)
+                elif method.upper() == 'POST':
+                    response = await client.post(url, headers=headers, json=data)
+                else:
+                    raise WompiAPIException(f"Método HTTP no soportado: {method}")
+
+            return self._handle_response(response)
+
+        except httpx.TimeoutException:
+            logger.error(f"Timeout conectando a Wompi: {url}")
+            raise WompiAPIException("Timeout al conectar con Wompi. Intenta de nuevo.")
+        except httpx.HTTPError as e:
+            logger.error(f"Error de conexión: {str(e)}")
+            raise WompiAPIException(f"Error de conexión: {str(e)}")
+
+    # ==========================================
+    # ENDPOINTS
+    # ==========================================
+
+    async def get_acceptance_token(self) -> Dict:
+        """Obtener el token de aceptación (ver WompiClient.get_acceptance_token)"""
+        return await self._make_request('GET', f'/merchants/{self.public_key}', use_private_key=False)
+
+    async def tokenize_card(
+        self,
+        card_number: str,
+        cvc: str,
+        exp_month: str,
+        exp_year: str,
+        card_holder: str
+    ) -> Dict:
+        """Tokenizar una tarjeta (ver WompiClient.tokenize_card)"""
+        data = self._build_card_token_data(card_number, cvc, exp_month, exp_year, card_holder)
+        return await self._make_request('POST', '/tokens/cards', data=data, use_private_key=False)
+
+    async def create_transaction(
+        self,
+        amount_in_cents: int,
+        currency: str,
+        customer_email: str,
+        payment_method: Dict,
+        reference: str,
+        acceptance_token: str,
+        signature: Optional[str] = None,
+        redirect_url: Optional[str] = None,
+        customer_data: Optional[Dict] = None,
+        shipping_address: Optional[Dict] = None,
+        expiration_time: Optional[str] = None,
+        payment_source_id: Optional[int] = None
+    ) -> Dict:
+        """Crear una transacción (ver WompiClient.create_transaction)"""
+        data, use_private = self._build_transaction_data(
+            amount_in_cents, currency, customer_email, payment_method, reference, acceptance_token,
+            signature=signature, redirect_url=redirect_url, customer_data=customer_data,
+            shipping_address=shipping_address, expiration_time=expiration_time,
+            payment_source_id=payment_source_id,
+        )
+        return await self._make_request('POST', '/transactions', data=data, use_private_key=use_private)
+
+    async def get_transaction(self, transaction_id: str) -> Dict:
+        """Consultar una transacción por su ID (ver WompiClient.get_transaction)"""
+        return await self._make_request('GET', f'/transactions/{transaction_id}', use_private_key=True)
+
+    async def get_pse_financial_institutions(self) -> List[Dict]:
+        """Lista de bancos PSE (ver WompiClient.get_pse_financial_institutions)"""
+        response = await self._make_request('GET', '/pse/financial_institutions', use_private_key=False)
+        return response.get('data', [])
@@ -0,0 +1,147 @@
+"""
+Idempotencia del checkout
+
+Las vistas de checkout renderizan una llave única (`idempotency_key`) en el
+formulario. `idempotent_checkout` la registra antes de crear la orden; si el
+mismo formulario se envía otra vez, redirige al resultado del primer envío
+sin volver a crear la orden ni llamar a Wompi.
+
+Las llaves vencen a las CHECKOUT_IDEMPOTENCY_TTL_HOURS horas; el comando
+`purge_checkout_attempts` borra las vencidas.
+"""
+import logging
+import time
+import uuid
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.db import IntegrityError, transaction
+from django.shortcuts import redirect
+from django.utils import timezone
+
+from ..models import CheckoutAttempt
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_FIELD = 'idempotency_key'
+
+# Cada cuánto revisar si el envío concurrente ya terminó
+WAIT_POLL_SECONDS = 0.5
+
+
+def new_idempotency_key():
+    """Llave para un formulario de checkout recién renderizado"""
+    return uuid.uuid4().hex
+
+
+def begin_attempt(key, session_key):
+    """
+    Registrar un intento de checkout
+
+    Returns:
+        Tupla (intento, creado). Si la llave ya existía y no ha vencido,
+        creado es False y el intento es el registrado previamente.
+    """
+    expires_at = timezone.now() + timedelta(hours=settings.CHECKOUT_IDEMPOTENCY_TTL_HOURS)
+
+    # Una llave vencida se puede reutilizar
+    CheckoutAttempt.objects.filter(key=key, expires_at__lte=timezone.now()).delete()
+
+    try:
+        with transaction.atomic():
+            attempt = CheckoutAttempt.objects.create(key=key, session_key=session_key or '', expires_at=expires_at)
+    except IntegrityError:
+        return CheckoutAttempt.objects.get(key=key), False
+
+    return attempt, True
+
+
+def wait_for_result(attempt, timeout):
+    """
+    Esperar a que un envío concurrente con la misma llave termine
+
+    Deja de esperar apenas el primer envío asocia su orden: payment_pending
+    sigue el resultado desde el navegador sin retener el worker.
+    """
+    deadline = time.monotonic() + timeout
+    while attempt.status == 'IN_PROGRESS' and not attempt.order_id and time.monotonic() < deadline:
+        time.sleep(WAIT_POLL_SECONDS)
+        attempt.refresh_from_db(fields=['status', 'result_url', 'order'])
+    return attempt
+
+
+def attach_order(request, order):
+    """Asociar la orden creada al intento de checkout en curso (si hay llave)"""
+    attempt = getattr(request, 'checkout_attempt', None)
+    if attempt is not None:
+        attempt.order = order
+        attempt.save(update_fields=['order'])
+
+
+def complete_attempt(attempt, result_url):
+    """Guardar el resultado del primer envío"""
+    attempt.status = 'COMPLETED'
+    attempt.result_url = result_url
+    attempt.save(update_fields=['status', 'result_url'])
+
+
+def purge_expired_attempts():
+    """Borrar llaves vencidas"""
+    deleted, _ = CheckoutAttempt.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+def idempotent_checkout(fallback_url):
+    """
+    Decorador para vistas POST de checkout que terminan en un redirect
+
+    Sin llave en el POST la vista corre normal (formularios viejos en caché).
+
+    Args:
+        fallback_url: Nombre de URL a la que ir si la llave no es válida o el
+                      envío concurrente no terminó a tiempo
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            key = request.POST.get(IDEMPOTENCY_FIELD, '').strip()
+            if not key:
+                return view_func(request, *args, **kwargs)
+
+            session_key = request.session.session_key or ''
+            attempt, created = begin_attempt(key[:64], session_key)
+
+            if not created:
+                if attempt.session_key != session_key:
+                    logger.warning(f"Llave de checkout {attempt.key} usada desde otra sesión")
+                    messages.error(request, 'La sesión de pago no es válida. Intenta de nuevo.')
+                    return redirect(fallback_url)
+
+                attempt = wait_for_result(attempt, settings.CHECKOUT_IDEMPOTENCY_WAIT)
+                if attempt.status == 'COMPLETED' and attempt.result_url:
+                    logger.info(f"Checkout repetido con llave {attempt.key}: se devuelve el resultado original")
+                    return redirect(attempt.result_url)
+
+                messages.info(request, 'Tu pedido se está procesando. No envíes el formulario de nuevo.')
+                if attempt.order_id:
+                    return redirect('payments:payment_pending', order_id=attempt.order_id)
+                return redirect(fallback_url)
+
+            request.checkout_attempt = attempt
+            try:
+                response = view_func(request, *args, **kwargs)
+            except Exception:
+                # Nada que repetir: liberar la llave para que el cliente pueda reintentar
+                attempt.delete()
+                raise
+
+            if response.status_code in (301, 302, 303) and response.get('Location'):
+                complete_attempt(attempt, response['Location'])
+            else:
+                attempt.delete()
+            return response
+
+        return wrapper
+    return decorator
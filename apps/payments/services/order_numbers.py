@@ -0,0 +1,118 @@
+"""
+Asignación de números de orden (GW-00000001, GW-00000002, ...)
+
+Cada proceso reserva un bloque de BLOCK_SIZE números insertando una fila en
+OrderNumberBlock y los reparte en memoria; solo vuelve a la base de datos
+cuando agota el bloque. El id autoincremental de MySQL (InnoDB) no se reutiliza
+aunque la transacción haga rollback ni tras reiniciar el servidor, así que dos
+procesos nunca reciben el mismo rango y no hace falta bloquear filas.
+
+La fila del bloque se confirma aparte de la transacción del llamador (ver
+`_insert_block`): si Order.save hace rollback el bloque sigue reservado y
+ningún otro proceso puede recibir el mismo rango.
+
+Los números que un proceso no alcanzó a usar (reinicio, reciclaje de
+Passenger, rollback) quedan como huecos en la numeración.
+"""
+import os
+import threading
+
+from django.db import connections, router
+from django.utils import timezone
+
+from ..models import OrderNumberBlock
+
+# No cambiar: define los rangos de los bloques ya reservados
+BLOCK_SIZE = 50
+
+ORDER_NUMBER_PREFIX = 'GW-'
+
+
+def format_order_number(number):
+    return f"{ORDER_NUMBER_PREFIX}{number:08d}"
+
+
+class OrderNumberAllocator:
+    """Reparte números del bloque reservado por el proceso actual (thread-safe)"""
+
+    def __init__(self, block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = None
+        self._end = None
+        self._pid = None
+
+    def _insert_block(self):
+        """
+        Insertar una fila de OrderNumberBlock confirmada y devolver su id
+
+        Dentro de una transacción se usa una conexión aparte en autocommit.
+        SQLite no admite dos escritores a la vez: ahí se usa la misma conexión
+        (solo desarrollo y pruebas).
+        """
+        alias = router.db_for_write(OrderNumberBlock)
+        connection = connections[alias]
+        if not connection.in_atomic_block or connection.vendor == 'sqlite':
+            return OrderNumberBlock.objects.using(alias).create().id
+
+        separate = connections.create_connection(alias)
+        try:
+            table = OrderNumberBlock._meta.db_table
+            with separate.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {separate.ops.quote_name(table)} ({separate.ops.quote_name("created_at")}) VALUES (%s)',
+                    [separate.ops.adapt_datetimefield_value(timezone.now())],
+                )
+                return separate.ops.last_insert_id(cursor, table, 'id')
+        finally:
+            separate.close()
+
+    def _reserve_block(self):
+        block_id = self._insert_block()
+        self._next = (block_id - 1) * self.block_size + 1
+        self._end = block_id * self.block_size
+        self._pid = os.getpid()
+
+    def next_number(self):
+        with self._lock:
+            # Tras un fork (Passenger smart spawning) el hijo no puede usar el bloque del padre
+            if self._next is None or self._next > self._end or self._pid != os.getpid():
+                self._reserve_block()
+            number = self._next
+            self._next += 1
+            return number
+
+
+_allocator = OrderNumberAllocator()
+
+
+def next_order_number():
+    """Siguiente número de orden con formato GW-XXXXXXXX"""
+    return format_order_number(_allocator.next_number())
+
+
+# ==========================================
+# REFERENCIAS DEL WIDGET
+# ==========================================
+
+WIDGET_REFERENCES_SESSION_KEY = 'widget_references'
+
+# Referencias recordadas por sesión (varias pestañas de checkout abiertas)
+WIDGET_REFERENCES_KEPT = 5
+
+
+def remember_widget_reference(request, reference):
+    """Guardar en la sesión una referencia emitida por checkout_widget_view"""
+    references = request.session.get(WIDGET_REFERENCES_SESSION_KEY, [])
+    request.session[WIDGET_REFERENCES_SESSION_KEY] = (references + [reference])[-WIDGET_REFERENCES_KEPT:]
+
+
+def widget_reference_issued(request, reference):
+    """True si la referencia fue emitida a esta sesión y todavía no tiene orden"""
+    return reference in request.session.get(WIDGET_REFERENCES_SESSION_KEY, [])
+
+
+def forget_widget_reference(request, reference):
+    """Quitar de la sesión una referencia que ya tiene orden"""
+    references = request.session.get(WIDGET_REFERENCES_SESSION_KEY, [])
+    request.session[WIDGET_REFERENCES_SESSION_KEY] = [r for r in references if r != reference]
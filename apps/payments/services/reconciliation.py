@@ -0,0 +1,146 @@
+"""
+Conciliación de pagos PENDING contra Wompi
+
+Cuando se pierde un webhook, los pagos PSE/Nequi/Bancolombia se quedan en
+PENDING. `reconcile_pending_payments` consulta en paralelo el estado real en
+Wompi (pool de hilos acotado + rate limit) y aplica el resultado con la misma
+máquina de estados que usan los webhooks.
+
+Solo los hilos hablan con Wompi; las escrituras en la base de datos se hacen
+en el hilo principal a medida que llegan las respuestas.
+
+Cron sugerido en cPanel (cada 15 minutos):
+    */15 * * * * cd /home4/gatewayi/gateway_app && python manage.py reconcile_payments
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.utils import timezone
+
+from ..models import Payment
+from .state_machine import apply_transaction_status
+from .wompi_client import WompiAPIException, WompiClient
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Token bucket thread-safe: como máximo `rate` llamadas por segundo"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloquear hasta que haya un token disponible"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def stale_pending_payments(older_than_minutes=15, limit=None):
+    """
+    Pagos PENDING con transacción en Wompi creados hace más de N minutos
+
+    Usa el índice (status, created_at). Trae el pago completo con su orden:
+    apply_transaction_status, los rollups y el email de pago aprobado leen
+    monto, método, fechas y la orden, y con .only() serían queries por pago.
+    """
+    cutoff = timezone.now() - timedelta(minutes=older_than_minutes)
+    queryset = (
+        Payment.objects
+        .filter(status='PENDING', created_at__lt=cutoff, wompi_transaction_id__isnull=False)
+        .order_by('created_at')
+        .select_related('order')
+    )
+    if limit:
+        queryset = queryset[:limit]
+    return queryset
+
+
+def reconcile_pending_payments(older_than_minutes=15, limit=None, workers=8, rate=10):
+    """
+    Consultar en Wompi los pagos PENDING antiguos y aplicar su estado
+
+    Args:
+        older_than_minutes: Antigüedad mínima del pago
+        limit: Máximo de pagos a revisar en esta corrida
+        workers: Tamaño del pool de hilos
+        rate: Máximo de peticiones por segundo a Wompi
+
+    Returns:
+        Dict con contadores y throughput de la corrida
+    """
+    payments = {payment.wompi_transaction_id: payment for payment in stale_pending_payments(older_than_minutes, limit)}
+    stats = {
+        'checked': 0,
+        'updated': 0,
+        'still_pending': 0,
+        'errors': 0,
+        'rate_limited': 0,
+    }
+
+    limiter = RateLimiter(rate)
+    local = threading.local()
+
+    def fetch(transaction_id):
+        # requests.Session no es thread-safe: un cliente por hilo
+        if not hasattr(local, 'client'):
+            local.client = WompiClient()
+        limiter.acquire()
+        return local.client.get_transaction(transaction_id).get('data', {})
+
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fetch, transaction_id): transaction_id for transaction_id in payments}
+
+        for future in as_completed(futures):
+            transaction_id = futures[future]
+            stats['checked'] += 1
+            try:
+                transaction_info = future.result()
+            except WompiAPIException as e:
+                if e.status_code == 429:
+                    stats['rate_limited'] += 1
+                stats['errors'] += 1
+                logger.warning(f"Conciliación: error consultando {transaction_id}: {e.message}")
+                continue
+            except Exception as e:
+                stats['errors'] += 1
+                logger.error(f"Conciliación: error consultando {transaction_id}: {e}", exc_info=True)
+                continue
+
+            status = transaction_info.get('status')
+            if not status or status == 'PENDING':
+                stats['still_pending'] += 1
+                continue
+
+            try:
+                payment_changed, order_changed = apply_transaction_status(payments[transaction_id], status, transaction_info)
+            except Exception as e:
+                stats['errors'] += 1
+                logger.error(f"Conciliación: error aplicando {status} a {transaction_id}: {e}", exc_info=True)
+                continue
+
+            if payment_changed or order_changed:
+                stats['updated'] += 1
+                logger.info(f"Conciliación: {transaction_id} -> {status}")
+
+    elapsed = time.monotonic() - started
+    stats['elapsed_seconds'] = round(elapsed, 2)
+    stats['per_second'] = round(stats['checked'] / elapsed, 2) if elapsed else 0.0
+    return stats
@@ -0,0 +1,250 @@
+"""
+Rollups diarios de ventas para reportes
+
+Tres tablas se mantienen al día desde la máquina de estados:
+
+- DailySalesRollup: órdenes pagadas, ingresos y unidades por fecha de pago
+- DailyProductSales: unidades e ingresos por producto (SKU + nombre) y día
+- DailyPaymentMethodStats: intentos con resultado final y aprobados por
+  método de pago, por fecha de creación del pago
+
+Los incrementos son UPDATE ... SET x = x + n (sin leer la fila), así dos
+workers pueden sumar al mismo día sin pisarse. Si un incremento falla se
+registra en el log y no afecta el pago; `rebuild_sales_rollups` recalcula
+cualquier rango de días desde Order/OrderItem/Payment.
+
+El dashboard del admin lee solo de estas tablas.
+"""
+import logging
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from ..models import (
+    DailyPaymentMethodStats,
+    DailyProductSales,
+    DailySalesRollup,
+    Order,
+    OrderItem,
+    Payment,
+)
+
+logger = logging.getLogger(__name__)
+
+# Estados de pago que cuentan como intento con resultado
+FINAL_PAYMENT_STATUSES = ('APPROVED', 'DECLINED', 'ERROR')
+
+
+def _increment(model, lookup, **deltas):
+    """
+    Sumar `deltas` a la fila `lookup`, creándola si no existe
+
+    Una resta (reembolso, anulación) sobre una fila que no existe no se puede
+    aplicar: lanza ValueError para que el llamador la registre y el día se
+    corrija con `rebuild_sales_rollups`.
+    """
+    updates = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(**lookup).update(**updates):
+        return
+
+    if any(value < 0 for value in deltas.values()):
+        raise ValueError(f"No hay fila de {model.__name__} para {lookup}: la resta no se aplicó")
+
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Otro proceso creó la fila entre el UPDATE y el INSERT
+        if not model.objects.filter(**lookup).update(**updates):
+            raise
+
+
+def _day_bounds(day):
+    """Inicio y fin (exclusivo) del día en la zona horaria local"""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+# ==========================================
+# ACTUALIZACIÓN INCREMENTAL
+# ==========================================
+
+def record_order_paid(order, sign=1):
+    """
+    Sumar una orden pagada a los rollups del día de pago
+
+    Con sign=-1 la resta (reembolso).
+    """
+    day = timezone.localdate(order.paid_at or timezone.now())
+    items = list(OrderItem.objects.filter(order_id=order.pk).values_list(
+        'product_sku', 'product_name', 'quantity', 'unit_price'
+    ))
+
+    try:
+        with transaction.atomic():
+            _increment(
+                DailySalesRollup, {'date': day},
+                orders_count=sign,
+                revenue=sign * order.total_amount,
+                units=sign * sum(quantity for _, _, quantity, _ in items),
+            )
+            for sku, name, quantity, unit_price in items:
+                _increment(
+                    DailyProductSales, {'date': day, 'product_sku': sku, 'product_name': name},
+                    units=sign * quantity,
+                    revenue=sign * quantity * unit_price,
+                )
+    except Exception as e:
+        logger.error(f"No se pudo actualizar el rollup de ventas para la orden {order.order_number}: {e}", exc_info=True)
+
+
+def record_order_refunded(order):
+    """Restar una orden reembolsada del día en que se pagó"""
+    record_order_paid(order, sign=-1)
+
+
+def _record_payment_stats(payment, sign, approved):
+    day = timezone.localdate(payment.created_at or timezone.now())
+
+    try:
+        with transaction.atomic():
+            _increment(
+                DailyPaymentMethodStats, {'date': day, 'payment_method': payment.payment_method},
+                attempts=sign,
+                approved=sign if approved else 0,
+                approved_amount=sign * payment.amount if approved else 0,
+            )
+    except Exception as e:
+        logger.error(f"No se pudo actualizar el rollup de pagos para {payment.id}: {e}", exc_info=True)
+
+
+def record_payment_result(payment):
+    """Contar un pago con resultado final en las estadísticas de su método"""
+    if payment.status not in FINAL_PAYMENT_STATUSES:
+        return
+    _record_payment_stats(payment, 1, approved=payment.status == 'APPROVED')
+
+
+def record_payment_voided(payment):
+    """
+    Descontar un pago aprobado que se anuló (APPROVED -> VOIDED)
+
+    VOIDED no es un resultado final: `rebuild_day` tampoco cuenta el pago.
+    """
+    _record_payment_stats(payment, -1, approved=True)
+
+
+# ==========================================
+# RECÁLCULO (BACKFILL)
+# ==========================================
+
+def rebuild_day(day):
+    """
+    Recalcular los rollups de un día desde las tablas de origen
+
+    Returns:
+        Tupla (órdenes pagadas, pagos con resultado) del día
+    """
+    start, end = _day_bounds(day)
+
+    paid_orders = Order.objects.filter(status='PAID', paid_at__gte=start, paid_at__lt=end)
+    totals = paid_orders.aggregate(orders_count=Count('id'), revenue=Sum('total_amount'))
+
+    products = list(
+        OrderItem.objects
+        .filter(order__status='PAID', order__paid_at__gte=start, order__paid_at__lt=end)
+        .values('product_sku', 'product_name')
+        .annotate(units=Sum('quantity'), revenue=Sum(F('quantity') * F('unit_price')))
+        .order_by()
+    )
+
+    methods = list(
+        Payment.objects
+        .filter(status__in=FINAL_PAYMENT_STATUSES, created_at__gte=start, created_at__lt=end)
+        .values('payment_method')
+        .annotate(
+            attempts=Count('id'),
+            approved=Count('id', filter=Q(status='APPROVED')),
+            approved_amount=Sum('amount', filter=Q(status='APPROVED')),
+        )
+        .order_by()
+    )
+
+    with transaction.atomic():
+        DailySalesRollup.objects.filter(date=day).delete()
+        DailyProductSales.objects.filter(date=day).delete()
+        DailyPaymentMethodStats.objects.filter(date=day).delete()
+
+        if totals['orders_count']:
+            DailySalesRollup.objects.create(
+                date=day,
+                orders_count=totals['orders_count'],
+                revenue=totals['revenue'] or 0,
+                units=sum(row['units'] for row in products),
+            )
+        DailyProductSales.objects.bulk_create([
+            DailyProductSales(date=day, **row) for row in products
+        ])
+        DailyPaymentMethodStats.objects.bulk_create([
+            DailyPaymentMethodStats(
+                date=day,
+                payment_method=row['payment_method'],
+                attempts=row['attempts'],
+                approved=row['approved'],
+                approved_amount=row['approved_amount'] or 0,
+            )
+            for row in methods
+        ])
+
+    return totals['orders_count'], sum(row['attempts'] for row in methods)
+
+
+# ==========================================
+# DASHBOARD
+# ==========================================
+
+def dashboard_summary(days=30, top=10):
+    """KPIs de los últimos `days` días y top de productos del mes, leídos de los rollups"""
+    today = timezone.localdate()
+    since = today - timedelta(days=days - 1)
+    month_start = today.replace(day=1)
+
+    daily = list(DailySalesRollup.objects.filter(date__gte=since).order_by('date'))
+    orders_count = sum(row.orders_count for row in daily)
+    revenue = sum((row.revenue for row in daily), Decimal('0'))
+
+    methods = list(
+        DailyPaymentMethodStats.objects
+        .filter(date__gte=since)
+        .values('payment_method')
+        .annotate(attempts=Sum('attempts'), approved=Sum('approved'), approved_amount=Sum('approved_amount'))
+        .order_by('-attempts')
+    )
+    method_names = dict(Payment.PAYMENT_METHOD_CHOICES)
+    for row in methods:
+        row['label'] = method_names.get(row['payment_method'], row['payment_method'])
+        row['approval_rate'] = row['approved'] / row['attempts'] * 100 if row['attempts'] else 0.0
+
+    top_products = list(
+        DailyProductSales.objects
+        .filter(date__gte=month_start)
+        .values('product_sku', 'product_name')
+        .annotate(units=Sum('units'), revenue=Sum('revenue'))
+        .order_by('-units')[:top]
+    )
+
+    return {
+        'days': days,
+        'since': since,
+        'month_start': month_start,
+        'orders_count': orders_count,
+        'revenue': revenue,
+        'units': sum(row.units for row in daily),
+        'average_order_value': revenue / orders_count if orders_count else Decimal('0'),
+        'daily': daily,
+        'payment_methods': methods,
+        'top_products': top_products,
+    }
@@ -0,0 +1,189 @@
+"""
+Máquina de estados de Order y Payment
+
+Las transiciones se aplican como un único UPDATE condicional:
+
+    UPDATE ... SET status='PAID', paid_at=... WHERE id=... AND status IN (...)
+
+Si otro proceso (webhook, callback, worker) ya aplicó la transición, el UPDATE
+no afecta filas y la función devuelve False, así los efectos secundarios
+(emails, rollups de ventas) se disparan una sola vez aunque lleguen
+notificaciones concurrentes.
+"""
+import logging
+
+from django.utils import timezone
+
+from ..email_utils import send_payment_approved_email
+from ..models import Order, Payment
+from .rollups import record_order_paid, record_order_refunded, record_payment_result, record_payment_voided
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================
+# TRANSICIONES PERMITIDAS
+# ==========================================
+
+# Estado actual -> estados a los que puede pasar
+ORDER_TRANSITIONS = {
+    'PENDING': {'PROCESSING', 'PAID', 'FAILED', 'CANCELLED'},
+    'PROCESSING': {'PAID', 'FAILED', 'CANCELLED'},
+    # Un pago aprobado tarde por Wompi debe reflejarse aunque la orden haya fallado
+    'FAILED': {'PAID', 'CANCELLED'},
+    'PAID': {'REFUNDED'},
+    'CANCELLED': set(),
+    'REFUNDED': set(),
+}
+
+PAYMENT_TRANSITIONS = {
+    'PENDING': {'APPROVED', 'DECLINED', 'ERROR', 'VOIDED'},
+    'APPROVED': {'VOIDED'},
+    'DECLINED': set(),
+    'ERROR': set(),
+    'VOIDED': set(),
+}
+
+# Estado de la transacción en Wompi -> estado de la orden
+WOMPI_TO_ORDER_STATUS = {
+    'PENDING': 'PROCESSING',
+    'APPROVED': 'PAID',
+    'DECLINED': 'FAILED',
+    'ERROR': 'FAILED',
+    'VOIDED': 'REFUNDED',
+}
+
+
+def allowed_sources(transitions, to_status):
+    """Estados desde los que se puede llegar a `to_status`"""
+    return [status for status, targets in transitions.items() if to_status in targets]
+
+
+# ==========================================
+# TRANSICIONES
+# ==========================================
+
+def transition_order(order, to_status, **fields):
+    """
+    Pasar una orden a `to_status` si la transición está permitida
+
+    Actualiza también la instancia en memoria cuando el UPDATE cambió la fila.
+
+    Returns:
+        True si la fila cambió
+    """
+    now = timezone.now()
+    values = {'status': to_status, 'updated_at': now, **fields}
+    if to_status == 'PAID':
+        values.setdefault('paid_at', now)
+
+    changed = Order.objects.filter(
+        pk=order.pk,
+        status__in=allowed_sources(ORDER_TRANSITIONS, to_status)
+    ).update(**values) > 0
+
+    if changed:
+        for field, value in values.items():
+            setattr(order, field, value)
+        logger.info(f"Orden {order.order_number} -> {to_status}")
+
+        if to_status == 'PAID':
+            record_order_paid(order)
+        elif to_status == 'REFUNDED':
+            record_order_refunded(order)
+
+    return changed
+
+
+def transition_orders(queryset, to_status):
+    """
+    Transición en bloque (acciones del admin)
+
+    Returns:
+        Cantidad de órdenes que cambiaron
+    """
+    if to_status in ('PAID', 'REFUNDED'):
+        # Afectan los rollups de ventas: una por una para saber cuáles cambiaron
+        return sum(transition_order(order, to_status) for order in queryset)
+
+    now = timezone.now()
+    values = {'status': to_status, 'updated_at': now}
+    if to_status == 'PAID':
+        values['paid_at'] = now
+
+    return queryset.filter(
+        status__in=allowed_sources(ORDER_TRANSITIONS, to_status)
+    ).update(**values)
+
+
+def transition_payment(payment, to_status, wompi_response=None):
+    """
+    Pasar un pago a `to_status` si la transición está permitida
+
+    Returns:
+        True si la fila cambió
+    """
+    now = timezone.now()
+    values = {'status': to_status, 'updated_at': now}
+    if wompi_response is not None:
+        values['wompi_response'] = wompi_response
+    if to_status == 'APPROVED':
+        values['paid_at'] = now
+
+    sources = allowed_sources(PAYMENT_TRANSITIONS, to_status)
+    voided_approval = False
+    if to_status == 'VOIDED':
+        # Anular un pago aprobado descuenta la aprobación de los rollups:
+        # se intenta primero desde APPROVED para saber de qué estado venía
+        voided_approval = Payment.objects.filter(pk=payment.pk, status='APPROVED').update(**values) > 0
+        sources = [status for status in sources if status != 'APPROVED']
+
+    changed = voided_approval or Payment.objects.filter(
+        pk=payment.pk,
+        status__in=sources
+    ).update(**values) > 0
+
+    if changed:
+        for field, value in values.items():
+            setattr(payment, field, value)
+        logger.info(f"Payment {payment.id} -> {to_status}")
+        if voided_approval:
+            record_payment_voided(payment)
+        else:
+            record_payment_result(payment)
+
+    return changed
+
+
+def apply_transaction_status(payment, status, transaction_data=None):
+    """
+    Aplicar el estado reportado por Wompi a un pago y a su orden
+
+    Punto único usado por el worker de webhooks, payment_callback, el widget
+    y la conciliación. El email de pago aprobado solo se envía si este llamado
+    fue el que pasó la orden a PAID.
+
+    Returns:
+        Tupla (pago_cambió, orden_cambió)
+    """
+    payment_changed = transition_payment(payment, status, wompi_response=transaction_data)
+
+    order_status = WOMPI_TO_ORDER_STATUS.get(status)
+    if order_status is None:
+        logger.warning(f"Estado de Wompi desconocido para payment {payment.id}: {status}")
+        return payment_changed, False
+
+    # La orden se sincroniza aunque el pago ya estuviera en ese estado
+    # (ej: el pago se creó APPROVED y la orden aún no se marcó PAID), pero no
+    # si el pago rechazó el cambio: un reporte viejo no reescribe la orden
+    if not payment_changed and payment.status != status:
+        logger.info(f"Estado {status} ignorado para payment {payment.id} (está en {payment.status})")
+        return payment_changed, False
+
+    order = payment.order
+    order_changed = transition_order(order, order_status)
+
+    if order_changed and order_status == 'PAID':
+        send_payment_approved_email(order, payment)
+
+    return payment_changed, order_changed
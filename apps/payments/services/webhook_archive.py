@@ -0,0 +1,203 @@
+"""
+Retención de eventos webhook de Wompi
+
+Los eventos procesados con más de WOMPI_WEBHOOK_RETENTION_DAYS días se mueven
+por lotes a ArchivedWebhookEvent: una fila delgada (id, tipo, transacción,
+pago, fechas) con el payload comprimido. La tabla viva queda con los eventos
+recientes y los que siguen pendientes o fallidos.
+
+Cada lote es una transacción corta (SELECT ... FOR UPDATE SKIP LOCKED, INSERT,
+DELETE), así el archivado puede correr junto al worker de webhooks.
+
+Para auditorías, `export_archived` escribe los eventos como JSONL y
+`restore_archived` los devuelve a WompiWebhookEvent.
+"""
+import json
+import logging
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import ArchivedWebhookEvent, WompiWebhookEvent
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================
+# ARCHIVADO
+# ==========================================
+
+def archivable_events(older_than_days):
+    """Eventos procesados anteriores al corte de retención"""
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    return WompiWebhookEvent.objects.filter(processed=True, created_at__lt=cutoff)
+
+
+def archive_batch(older_than_days, batch_size):
+    """
+    Mover un lote de eventos procesados al archivo
+
+    Returns:
+        Cantidad de eventos archivados
+    """
+    with transaction.atomic():
+        events = list(
+            archivable_events(older_than_days)
+            .select_for_update(skip_locked=True)
+            .order_by('created_at')[:batch_size]
+        )
+        if not events:
+            return 0
+
+        ArchivedWebhookEvent.objects.bulk_create([
+            ArchivedWebhookEvent(
+                id=event.id,
+                event_type=event.event_type,
+                transaction_id=event.transaction_id,
+                idempotency_key=event.idempotency_key,
+                payment_id=event.payment_id,
+                payload_compressed=ArchivedWebhookEvent.compress_payload(event.payload),
+                attempts=event.attempts,
+                duplicate_count=event.duplicate_count,
+                created_at=event.created_at,
+                processed_at=event.processed_at,
+            )
+            for event in events
+        ], ignore_conflicts=True)
+        WompiWebhookEvent.objects.filter(pk__in=[event.pk for event in events]).delete()
+
+    return len(events)
+
+
+def archive_events(older_than_days, batch_size, max_batches=None, pause=0.0):
+    """
+    Archivar por lotes hasta vaciar el rango o llegar a `max_batches`
+
+    Args:
+        pause: Segundos de espera entre lotes para no competir con el tráfico
+
+    Returns:
+        Cantidad total de eventos archivados
+    """
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        archived = archive_batch(older_than_days, batch_size)
+        total += archived
+        batches += 1
+        if archived < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    if total:
+        logger.info(f"Webhooks archivados: {total} (anteriores a {older_than_days} días)")
+    return total
+
+
+# ==========================================
+# REHIDRATACIÓN (AUDITORÍAS)
+# ==========================================
+
+def archived_events(transaction_id=None, payment_id=None, start=None, end=None):
+    """Eventos archivados filtrados por transacción, pago y/o rango de fechas"""
+    queryset = ArchivedWebhookEvent.objects.all()
+    if transaction_id:
+        queryset = queryset.filter(transaction_id=transaction_id)
+    if payment_id:
+        queryset = queryset.filter(payment_id=payment_id)
+    if start:
+        queryset = queryset.filter(created_at__gte=start)
+    if end:
+        queryset = queryset.filter(created_at__lt=end)
+    return queryset.order_by('created_at')
+
+
+def archived_event_as_dict(archived):
+    """Evento archivado con su payload descomprimido"""
+    return {
+        'id': str(archived.id),
+        'event_type': archived.event_type,
+        'transaction_id': archived.transaction_id,
+        'payment_id': str(archived.payment_id) if archived.payment_id else None,
+        'created_at': archived.created_at.isoformat(),
+        'processed_at': archived.processed_at.isoformat() if archived.processed_at else None,
+        'archived_at': archived.archived_at.isoformat(),
+        'payload': archived.payload,
+    }
+
+
+def export_archived(queryset, fh):
+    """
+    Escribir los eventos como JSON lines en `fh`
+
+    Returns:
+        Cantidad de eventos escritos
+    """
+    count = 0
+    for archived in queryset.iterator(chunk_size=500):
+        fh.write(json.dumps(archived_event_as_dict(archived), ensure_ascii=False) + '\n')
+        count += 1
+    return count
+
+
+def restore_archived(queryset):
+    """
+    Devolver eventos archivados a WompiWebhookEvent (como procesados)
+
+    El próximo archivado los vuelve a mover si siguen fuera de la retención.
+    Los que chocan con un evento vivo (mismo id o idempotency_key: Wompi
+    reenvió el evento después de archivarlo) se omiten y quedan en el archivo.
+
+    Returns:
+        Tupla (restaurados, omitidos)
+    """
+    with transaction.atomic():
+        archived = list(queryset.select_for_update())
+
+        keys = {item.idempotency_key for item in archived if item.idempotency_key}
+        taken_keys = set(
+            WompiWebhookEvent.objects.filter(idempotency_key__in=keys).values_list('idempotency_key', flat=True)
+        )
+        taken_ids = set(
+            WompiWebhookEvent.objects.filter(pk__in=[item.id for item in archived]).values_list('pk', flat=True)
+        )
+
+        restorable = []
+        skipped = []
+        for item in archived:
+            if item.id in taken_ids or (item.idempotency_key and item.idempotency_key in taken_keys):
+                skipped.append(item)
+                continue
+            if item.idempotency_key:
+                taken_keys.add(item.idempotency_key)
+            restorable.append(item)
+
+        WompiWebhookEvent.objects.bulk_create([
+            WompiWebhookEvent(
+                id=item.id,
+                event_type=item.event_type,
+                transaction_id=item.transaction_id,
+                payload=item.payload,
+                idempotency_key=item.idempotency_key,
+                duplicate_count=item.duplicate_count,
+                processed=True,
+                processed_at=item.processed_at,
+                attempts=item.attempts,
+                payment_id=item.payment_id,
+            )
+            for item in restorable
+        ])
+        # created_at es auto_now_add: se restaura con un UPDATE aparte
+        for item in restorable:
+            WompiWebhookEvent.objects.filter(pk=item.id).update(created_at=item.created_at)
+        ArchivedWebhookEvent.objects.filter(pk__in=[item.id for item in restorable]).delete()
+
+    if skipped:
+        logger.warning(
+            f"Eventos archivados no restaurados (ya existe un evento vivo con su id o llave): "
+            f"{', '.join(str(item.id) for item in skipped)}"
+        )
+    return len(restorable), len(skipped)
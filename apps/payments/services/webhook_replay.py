@@ -0,0 +1,224 @@
+"""
+Benchmark del webhook de Wompi reproduciendo eventos
+
+Toma payloads guardados en WompiWebhookEvent (o sintéticos), los vuelve a
+firmar con un secreto de prueba y un timestamp nuevo (para que la idempotencia
+no los descarte como duplicados) y los envía al endpoint `wompi_webhook` con
+el cliente de pruebas de Django, pasando por todo el stack de middleware.
+
+Los eventos re-firmados son nuevos para la idempotencia y quedan en la cola
+real: el worker de webhooks los aplicaría a pagos y órdenes reales, y
+`--drain` bloquea los eventos pendientes mientras mide. Por eso el comando
+solo corre con WEBHOOK_REPLAY_ALLOWED (una base de datos aparte, sin cron).
+
+Uso:
+    WEBHOOK_REPLAY_ALLOWED=True DB_NAME=gateway_bench \\
+    python manage.py replay_webhooks --source stored --count 2000 --concurrency 8 --drain
+"""
+import copy
+import itertools
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.test import Client
+from django.urls import reverse
+
+from apps.core.benchmarking import QueryCounter
+
+from ..models import WompiWebhookEvent
+from .reconciliation import RateLimiter
+from .webhooks import compute_checksum, process_pending_events
+
+SIGNATURE_PROPERTIES = ['transaction.id', 'transaction.status', 'transaction.amount_in_cents']
+SYNTHETIC_STATUSES = ['APPROVED', 'APPROVED', 'APPROVED', 'DECLINED', 'PENDING', 'ERROR']
+
+
+# ==========================================
+# PAYLOADS
+# ==========================================
+
+def stored_payloads(limit, event_type='transaction.updated'):
+    """Payloads reales más recientes guardados en WompiWebhookEvent"""
+    return list(
+        WompiWebhookEvent.objects
+        .filter(event_type=event_type)
+        .order_by('-created_at')
+        .values_list('payload', flat=True)[:limit]
+    )
+
+
+def synthetic_payloads(count, seed=None):
+    """
+    Eventos transaction.updated inventados
+
+    Sus referencias no corresponden a ningún pago, así que al procesarlos el
+    worker solo registra "Payment no encontrado".
+    """
+    rnd = random.Random(seed)
+    payloads = []
+    for _ in range(count):
+        transaction_id = f"replay-{uuid.uuid4().hex[:16]}"
+        payloads.append({
+            'event': 'transaction.updated',
+            'data': {
+                'transaction': {
+                    'id': transaction_id,
+                    'status': rnd.choice(SYNTHETIC_STATUSES),
+                    'reference': f"REPLAY-{transaction_id}",
+                    'amount_in_cents': rnd.randint(10_000, 5_000_000) * 100,
+                    'currency': 'COP',
+                    'payment_method_type': rnd.choice(['CARD', 'PSE', 'NEQUI']),
+                    'customer_email': 'replay@example.com',
+                },
+            },
+            'environment': 'test',
+        })
+    return payloads
+
+
+def resign_payload(payload, secret, timestamp):
+    """Copia del payload con timestamp nuevo firmada con `secret`"""
+    payload = copy.deepcopy(payload)
+    payload['timestamp'] = timestamp
+    payload['sent_at'] = time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(timestamp))
+    signature = payload.setdefault('signature', {})
+    signature.setdefault('properties', SIGNATURE_PROPERTIES)
+    signature['checksum'] = compute_checksum(payload, secret)
+    return payload
+
+
+# ==========================================
+# REPLAY
+# ==========================================
+
+def replay_events(payloads, secret, concurrency=4, rate=None):
+    """
+    Enviar los payloads al webhook y medir cada petición
+
+    Debe llamarse con WOMPI_EVENTS_SECRET = `secret` (override_settings) y con
+    'testserver' en ALLOWED_HOSTS.
+
+    Args:
+        payloads: Lista de payloads (se re-firman antes de enviarse)
+        secret: Secreto con el que se firman los eventos
+        concurrency: Hilos enviando en paralelo
+        rate: Máximo de eventos por segundo (None = sin límite)
+
+    Returns:
+        Dict con latencias (s), queries por evento, códigos de respuesta,
+        ids de eventos creados, errores y tiempo total
+    """
+    url = reverse('payments:wompi_webhook')
+    limiter = RateLimiter(rate) if rate else None
+
+    # Timestamps únicos: evita que dos eventos iguales compartan llave de idempotencia
+    base_timestamp = int(time.time())
+    timestamps = itertools.count(base_timestamp)
+
+    work = queue.Queue()
+    for payload in payloads:
+        work.put(resign_payload(payload, secret, next(timestamps)))
+
+    results = {
+        'latencies': [],
+        'queries': [],
+        'status_codes': {},
+        'created': 0,
+        'duplicates': 0,
+        'errors': 0,
+        'event_ids': [],
+    }
+    lock = threading.Lock()
+
+    def worker():
+        client = Client()
+        try:
+            while True:
+                try:
+                    payload = work.get_nowait()
+                except queue.Empty:
+                    return
+                if limiter:
+                    limiter.acquire()
+
+                body = json.dumps(payload)
+                started = time.perf_counter()
+                try:
+                    with QueryCounter() as queries:
+                        response = client.post(url, data=body, content_type='application/json', secure=True)
+                except Exception:
+                    with lock:
+                        results['errors'] += 1
+                    continue
+                elapsed = time.perf_counter() - started
+
+                data = response.json() if response.get('Content-Type', '').startswith('application/json') else {}
+                with lock:
+                    results['latencies'].append(elapsed)
+                    results['queries'].append(queries.count)
+                    results['status_codes'][response.status_code] = results['status_codes'].get(response.status_code, 0) + 1
+                    if response.status_code != 200:
+                        results['errors'] += 1
+                    elif data.get('status') == 'duplicate':
+                        results['duplicates'] += 1
+                    else:
+                        results['created'] += 1
+                        if data.get('event_id'):
+                            results['event_ids'].append(data['event_id'])
+        finally:
+            # Cada hilo abre su propia conexión a la base de datos
+            connections.close_all()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(max(1, concurrency))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results['elapsed_seconds'] = time.perf_counter() - started
+
+    return results
+
+
+def measure_drain(batch_size=None):
+    """
+    Medir el worker de webhooks drenando la cola, sin dejar efectos
+
+    Todo el drenaje corre dentro de una transacción que se revierte al final:
+    pagos, órdenes y emails encolados quedan como estaban.
+
+    Returns:
+        Dict con eventos procesados, fallidos, queries y tiempo total
+    """
+    batch_size = batch_size or settings.WOMPI_WEBHOOK_BATCH_SIZE
+    started = time.perf_counter()
+    processed_total = failed_total = 0
+
+    with QueryCounter() as queries:
+        with transaction.atomic():
+            while True:
+                processed, failed = process_pending_events(batch_size)
+                processed_total += processed
+                failed_total += failed
+                if processed + failed < batch_size:
+                    break
+            transaction.set_rollback(True)
+
+    return {
+        'processed': processed_total,
+        'failed': failed_total,
+        'queries': queries.count,
+        'elapsed_seconds': time.perf_counter() - started,
+    }
+
+
+def delete_replayed_events(event_ids):
+    """Borrar los eventos creados por el replay"""
+    deleted, _ = WompiWebhookEvent.objects.filter(id__in=event_ids).delete()
+    return deleted
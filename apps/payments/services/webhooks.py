@@ -0,0 +1,259 @@
+"""
+Procesamiento de eventos webhook de Wompi
+
+El endpoint `wompi_webhook` solo valida la firma, guarda el evento y responde 200.
+Los eventos guardados se procesan fuera del request con el comando
+`process_webhooks`, que reclama filas con SELECT ... FOR UPDATE SKIP LOCKED para
+que varios workers puedan drenar la cola en paralelo sin procesar dos veces el
+mismo evento.
+
+Cron sugerido en cPanel (cada minuto):
+    * * * * * cd /home4/gatewayi/gateway_app && python manage.py process_webhooks
+"""
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from ..models import Payment, WompiWebhookEvent
+from .state_machine import apply_transaction_status
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================
+# VALIDACIÓN DE FIRMA
+# ==========================================
+
+def compute_checksum(payload, secret):
+    """
+    Calcular la firma de un evento según la documentación de Wompi
+
+    SHA256(valores de las properties + timestamp + events_secret)
+    """
+    signature_data = payload.get('signature', {})
+    properties = signature_data.get('properties', [])
+    timestamp = payload.get('timestamp', '')
+
+    # Las propiedades vienen como "transaction.id", "transaction.status", etc.
+    transaction_data = payload.get('data', {}).get('transaction', {})
+    values_to_concat = [
+        str(transaction_data.get(prop.replace('transaction.', ''), ''))
+        for prop in properties
+    ]
+
+    concat_string = ''.join(values_to_concat) + str(timestamp) + secret
+    return hashlib.sha256(concat_string.encode('utf-8')).hexdigest()
+
+
+def verify_signature(payload):
+    """
+    Validar la firma de integridad de un evento
+
+    La firma viene en payload.signature.checksum (ver compute_checksum).
+
+    Returns:
+        True si la firma es válida o no hay secreto/firma que validar
+    """
+    if not settings.WOMPI_EVENTS_SECRET or 'signature' not in payload:
+        return True
+
+    checksum_received = payload.get('signature', {}).get('checksum', '')
+    expected_checksum = compute_checksum(payload, settings.WOMPI_EVENTS_SECRET)
+
+    if checksum_received != expected_checksum:
+        logger.warning(f"Webhook signature mismatch: received={checksum_received}, expected={expected_checksum}")
+        return False
+
+    return True
+
+
+# ==========================================
+# IDEMPOTENCIA
+# ==========================================
+
+def compute_idempotency_key(payload):
+    """
+    Calcular la llave de idempotencia de un evento
+
+    Wompi reintenta la misma entrega con el mismo timestamp, así que
+    evento + transacción + estado + timestamp identifica cada evento. Si falta
+    alguno de esos datos se usa el hash del payload completo.
+    """
+    transaction_data = payload.get('data', {}).get('transaction', {})
+    parts = [
+        payload.get('event'),
+        transaction_data.get('id'),
+        transaction_data.get('status'),
+        payload.get('timestamp'),
+    ]
+
+    if all(parts):
+        raw = ':'.join(str(part) for part in parts)
+    else:
+        raw = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def record_duplicate(idempotency_key):
+    """
+    Registrar una entrega duplicada con un único UPDATE sobre el índice único
+
+    Returns:
+        True si ya existía un evento con esa llave
+    """
+    return WompiWebhookEvent.objects.filter(idempotency_key=idempotency_key).update(
+        duplicate_count=F('duplicate_count') + 1,
+        last_duplicate_at=timezone.now(),
+    ) > 0
+
+
+def store_event(payload):
+    """
+    Guardar un evento entrante descartando reintentos ya recibidos
+
+    Returns:
+        Tupla (evento, creado). Si es un duplicado el evento es None.
+    """
+    idempotency_key = compute_idempotency_key(payload)
+
+    if record_duplicate(idempotency_key):
+        return None, False
+
+    transaction_data = payload.get('data', {}).get('transaction', {})
+    try:
+        with transaction.atomic():
+            webhook_event = WompiWebhookEvent.objects.create(
+                event_type=payload.get('event'),
+                transaction_id=transaction_data.get('id') or '',
+                payload=payload,
+                idempotency_key=idempotency_key,
+                processed=False
+            )
+    except IntegrityError:
+        # Entrega concurrente con la misma llave: la otra ganó el INSERT
+        record_duplicate(idempotency_key)
+        return None, False
+
+    return webhook_event, True
+
+
+def suppressed_duplicates_recent(hours=None):
+    """
+    Entregas duplicadas descartadas de los eventos con algún duplicado en las
+    últimas `hours` horas (WOMPI_DUPLICATES_WINDOW_HOURS por defecto)
+
+    Usa el índice de last_duplicate_at: no recorre toda la tabla de webhooks.
+    """
+    hours = hours or settings.WOMPI_DUPLICATES_WINDOW_HOURS
+    since = timezone.now() - timedelta(hours=hours)
+    return (
+        WompiWebhookEvent.objects
+        .filter(last_duplicate_at__gte=since)
+        .aggregate(total=Sum('duplicate_count'))['total'] or 0
+    )
+
+
+# ==========================================
+# PROCESAMIENTO DE EVENTOS
+# ==========================================
+
+def process_event(webhook_event):
+    """
+    Aplicar un evento webhook guardado sobre Payment y Order
+
+    Debe llamarse dentro de una transacción; las excepciones se propagan para
+    que el worker registre el error y reintente el evento.
+    """
+    if webhook_event.event_type == 'transaction.updated':
+        _process_transaction_updated(webhook_event)
+    else:
+        # Evento no manejado (ej: nequi_token.updated)
+        logger.info(f"Evento no manejado: {webhook_event.event_type}")
+        webhook_event.error_message = f"Evento no manejado: {webhook_event.event_type}"
+
+    webhook_event.processed = True
+    webhook_event.processed_at = timezone.now()
+    webhook_event.save(update_fields=['processed', 'processed_at', 'error_message', 'payment'])
+
+
+def _process_transaction_updated(webhook_event):
+    """Actualizar pago y orden a partir de un evento transaction.updated"""
+    transaction_data = webhook_event.payload.get('data', {}).get('transaction', {})
+    transaction_id = transaction_data.get('id')
+    status = transaction_data.get('status')
+    reference = transaction_data.get('reference')
+
+    # Buscar el pago por transaction_id o reference
+    payment = webhook_event.payment
+    if payment is None and transaction_id:
+        payment = Payment.objects.select_related('order').filter(wompi_transaction_id=transaction_id).first()
+    if payment is None and reference:
+        payment = Payment.objects.select_related('order').filter(wompi_reference=reference).first()
+
+    if payment is None:
+        logger.error(f"Payment no encontrado: transaction_id={transaction_id}, reference={reference}")
+        webhook_event.error_message = "Payment no encontrado"
+        return
+
+    webhook_event.payment = payment
+
+    if not status:
+        webhook_event.error_message = "Evento sin estado de transacción"
+        return
+
+    payment_changed, order_changed = apply_transaction_status(payment, status, transaction_data)
+    if not (payment_changed or order_changed):
+        logger.info(f"Payment {payment.id} ya estaba en {status}, sin cambios")
+
+    webhook_event.error_message = ''
+
+
+def process_pending_events(batch_size=None):
+    """
+    Drenar un lote de eventos pendientes en orden de llegada
+
+    Las filas se reclaman con SKIP LOCKED, así que varios workers pueden correr
+    a la vez. Cada evento se procesa en su propio savepoint: un error no
+    revierte el resto del lote, solo incrementa `attempts` del evento fallido.
+
+    Returns:
+        Tupla (procesados, fallidos)
+    """
+    batch_size = batch_size or settings.WOMPI_WEBHOOK_BATCH_SIZE
+    processed_count = 0
+    failed_count = 0
+
+    with transaction.atomic():
+        events = list(
+            WompiWebhookEvent.objects
+            .select_for_update(skip_locked=True)
+            .filter(processed=False, attempts__lt=settings.WOMPI_WEBHOOK_MAX_ATTEMPTS)
+            .order_by('created_at')[:batch_size]
+        )
+
+        for webhook_event in events:
+            try:
+                with transaction.atomic():
+                    process_event(webhook_event)
+                processed_count += 1
+            except Exception as e:
+                logger.error(f"Error procesando webhook {webhook_event.id}: {e}", exc_info=True)
+                WompiWebhookEvent.objects.filter(pk=webhook_event.pk).update(
+                    attempts=F('attempts') + 1,
+                    error_message=str(e),
+                )
+                failed_count += 1
+
+    return processed_count, failed_count
+
+
+def enqueue_events(queryset):
+    """Reencolar eventos para que el worker los vuelva a procesar"""
+    return queryset.update(processed=False, processed_at=None, error_message='', attempts=0)
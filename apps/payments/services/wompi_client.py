@@ -14,6 +14,8 @@ import hashlib
 from typing import Dict, Optional, List
 from django.conf import settings
 
+from apps.core.profiling import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -55,15 +57,19 @@ class WompiClient:
 
     def __init__(self):
         """Inicializar cliente con configuración de Django settings"""
+        self._load_settings()
+
+        # Sesión para reutilizar conexiones
+        self._session = requests.Session()
+
+    def _load_settings(self):
+        """Leer llaves y URL base desde Django settings"""
         self.base_url = getattr(settings, 'WOMPI_API_BASE_URL', 'https://sandbox.wompi.co/v1')
         self.public_key = settings.WOMPI_PUBLIC_KEY
         self.private_key = settings.WOMPI_PRIVATE_KEY
         self.integrity_key = getattr(settings, 'WOMPI_INTEGRITY_KEY', None)
         self.environment = getattr(settings, 'WOMPI_ENVIRONMENT', 'sandbox')
         self.timeout = 30
-        
-        # Sesión para reutilizar conexiones
-        self._session = requests.Session()
 
     def _get_headers(self, use_private_key: bool = False) -> Dict[str, str]:
         """
@@ -110,6 +116,10 @@ class WompiClient:
         logger.debug(f"Signature para ref {reference}: {signature[:20]}...")
         return signature
 
+    def get_integrity_signature(self, reference: str, amount_in_cents: int, currency: str = 'COP') -> str:
+        """Firma de integridad para el Widget de Wompi (se calcula en el servidor)"""
+        return self._calculate_signature(reference, amount_in_cents, currency)
+
     def _make_request(
         self,
         method: str,
@@ -139,45 +149,15 @@ class WompiClient:
             key_type = "PRIVATE" if use_private_key else "PUBLIC"
             logger.info(f"Wompi API: {method} {endpoint} (Auth: {key_type})")
             
-            if method.upper() == 'GET':
-                response = self._session.get(url, headers=headers, params=data, timeout=self.timeout)
-            elif method.upper() == 'POST':
-                response = self._session.post(url, headers=headers, json=data, timeout=self.timeout)
-            else:
-                raise WompiAPIException(f"Método HTTP no soportado: {method}")
-
-            logger.info(f"Wompi Response: {response.status_code}")
-            
-            # Detectar bloqueo de WAF (respuesta HTML en lugar de JSON)
-            content_type = response.headers.get('Content-Type', '')
-            if 'text/html' in content_type and response.status_code in [403, 503, 429]:
-                logger.error(f"BLOQUEADO POR WAF - Status: {response.status_code}")
-                raise WompiAPIException(
-                    message="Request bloqueado por firewall. Intenta desde otra red o espera unos minutos.",
-                    status_code=response.status_code,
-                    response_data={'blocked_by_waf': True}
-                )
-
-            # Respuesta exitosa
-            if response.status_code in [200, 201]:
-                return response.json()
-            
-            # Error de la API
-            try:
-                error_data = response.json() if response.text else {}
-                error_type = error_data.get('error', {}).get('type', 'UNKNOWN_ERROR')
-                error_reason = error_data.get('error', {}).get('reason', 'Error desconocido')
-                error_message = f"{error_type}: {error_reason}"
-            except:
-                error_data = {}
-                error_message = f"Error HTTP {response.status_code}: {response.text[:200]}"
-
-            logger.error(f"Wompi API Error: {error_message}")
-            raise WompiAPIException(
-                message=error_message,
-                status_code=response.status_code,
-                response_data=error_data
-            )
+            with span('wompi'):
+                if method.upper() == 'GET':
+                    response = self._session.get(url, headers=headers, params=data, timeout=self.timeout)
+                elif method.upper() == 'POST':
+                    response = self._session.post(url, headers=headers, json=data, timeout=self.timeout)
+                else:
+                    raise WompiAPIException(f"Método HTTP no soportado: {method}")
+
+            return self._handle_response(response)
 
         except requests.exceptions.Timeout:
             logger.error(f"Timeout conectando a Wompi: {url}")
@@ -186,6 +166,48 @@ class WompiClient:
             logger.error(f"Error de conexión: {str(e)}")
             raise WompiAPIException(f"Error de conexión: {str(e)}")
 
+    def _handle_response(self, response) -> Dict:
+        """
+        Interpretar la respuesta HTTP de Wompi
+
+        Funciona con respuestas de requests y de httpx (misma interfaz).
+
+        Raises:
+            WompiAPIException: Si Wompi respondió con error o bloqueo de WAF
+        """
+        logger.info(f"Wompi Response: {response.status_code}")
+        
+        # Detectar bloqueo de WAF (respuesta HTML en lugar de JSON)
+        content_type = response.headers.get('Content-Type', '')
+        if 'text/html' in content_type and response.status_code in [403, 503, 429]:
+            logger.error(f"BLOQUEADO POR WAF - Status: {response.status_code}")
+            raise WompiAPIException(
+                message="Request bloqueado por firewall. Intenta desde otra red o espera unos minutos.",
+                status_code=response.status_code,
+                response_data={'blocked_by_waf': True}
+            )
+
+        # Respuesta exitosa
+        if response.status_code in [200, 201]:
+            return response.json()
+        
+        # Error de la API
+        try:
+            error_data = response.json() if response.text else {}
+            error_type = error_data.get('error', {}).get('type', 'UNKNOWN_ERROR')
+            error_reason = error_data.get('error', {}).get('reason', 'Error desconocido')
+            error_message = f"{error_type}: {error_reason}"
+        except:
+            error_data = {}
+            error_message = f"Error HTTP {response.status_code}: {response.text[:200]}"
+
+        logger.error(f"Wompi API Error: {error_message}")
+        raise WompiAPIException(
+            message=error_message,
+            status_code=response.status_code,
+            response_data=error_data
+        )
+
     # ==========================================
     # ACCEPTANCE TOKEN (Obligatorio para transacciones)
     # ==========================================
@@ -245,15 +267,19 @@ class WompiClient:
                 }
             }
         """
-        data = {
+        data = self._build_card_token_data(card_number, cvc, exp_month, exp_year, card_holder)
+        return self._make_request('POST', '/tokens/cards', data=data, use_private_key=False)
+
+    @staticmethod
+    def _build_card_token_data(card_number: str, cvc: str, exp_month: str, exp_year: str, card_holder: str) -> Dict:
+        """Armar el body de POST /tokens/cards"""
+        return {
             "number": card_number.replace(" ", ""),  # Quitar espacios
             "cvc": cvc,
             "exp_month": exp_month.zfill(2),  # Asegurar 2 dígitos
             "exp_year": exp_year[-2:],  # Solo últimos 2 dígitos
             "card_holder": card_holder.upper()
         }
-        
-        return self._make_request('POST', '/tokens/cards', data=data, use_private_key=False)
 
     # ==========================================
     # CREAR TRANSACCIONES
@@ -294,6 +320,35 @@ class WompiClient:
         Returns:
             Respuesta con datos de la transacción creada
         """
+        data, use_private = self._build_transaction_data(
+            amount_in_cents, currency, customer_email, payment_method, reference, acceptance_token,
+            signature=signature, redirect_url=redirect_url, customer_data=customer_data,
+            shipping_address=shipping_address, expiration_time=expiration_time,
+            payment_source_id=payment_source_id,
+        )
+        return self._make_request('POST', '/transactions', data=data, use_private_key=use_private)
+
+    def _build_transaction_data(
+        self,
+        amount_in_cents: int,
+        currency: str,
+        customer_email: str,
+        payment_method: Dict,
+        reference: str,
+        acceptance_token: str,
+        signature: Optional[str] = None,
+        redirect_url: Optional[str] = None,
+        customer_data: Optional[Dict] = None,
+        shipping_address: Optional[Dict] = None,
+        expiration_time: Optional[str] = None,
+        payment_source_id: Optional[int] = None
+    ):
+        """
+        Armar el body de POST /transactions
+
+        Returns:
+            Tupla (data, usar_llave_privada)
+        """
         # Calcular firma si no se proporciona y tenemos integrity_key
         if not signature and self.integrity_key:
             signature = self._calculate_signature(reference, amount_in_cents, currency)
@@ -323,8 +378,8 @@ class WompiClient:
 
         # Usar llave privada SOLO con payment_source_id (fuentes de pago)
         use_private = payment_source_id is not None
-        
-        return self._make_request('POST', '/transactions', data=data, use_private_key=use_private)
+
+        return data, use_private
 
     # ==========================================
     # CONSULTAR TRANSACCIONES
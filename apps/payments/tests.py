@@ -1,3 +1,728 @@
-from django.test import TestCase
+import asyncio
+import base64
+import json
+import os
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.testing import ViewBenchmarkTestCase
+from apps.payments.fake_wompi import FakeWompiServer
+from apps.core.models import OutboundEmail
+from apps.payments.models import (
+    ArchivedWebhookEvent, CheckoutAttempt, DailyPaymentMethodStats, DailyProductSales, DailySalesRollup, Order,
+    OrderItem, OrderNumberBlock, Payment, WompiWebhookEvent,
+)
+from apps.payments import views
+from apps.payments.services import AsyncWompiClient, WompiClient
+from apps.payments.services.async_wompi_client import close_http_client
+from apps.payments.services.idempotency import (
+    WAIT_POLL_SECONDS, begin_attempt, idempotent_checkout, purge_expired_attempts,
+)
+from apps.payments.services.order_numbers import OrderNumberAllocator
+from apps.payments.services.reconciliation import stale_pending_payments
+from apps.payments.services.rollups import rebuild_day
+from apps.payments.services.state_machine import (
+    ORDER_TRANSITIONS, PAYMENT_TRANSITIONS, apply_transaction_status, transition_order, transition_payment,
+)
+from apps.payments.services.wompi_client import WompiAPIException
+from apps.payments.services.webhook_archive import (
+    archive_events, archived_events, export_archived, restore_archived,
+)
+from apps.payments.services.webhook_replay import resign_payload, synthetic_payloads
+from apps.payments.services.webhooks import enqueue_events, process_pending_events, suppressed_duplicates_recent
+
+
+class FakeWompiMixin:
+    """Wompi simulado en un puerto libre durante toda la clase de pruebas"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.wompi = FakeWompiServer(port=0)
+        cls.wompi.start()
+        cls.wompi_settings = override_settings(WOMPI_API_BASE_URL=cls.wompi.base_url)
+        cls.wompi_settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.wompi_settings.disable()
+        cls.wompi.stop()
+        super().tearDownClass()
+
+
+class CheckoutViewBenchmarks(FakeWompiMixin, ViewBenchmarkTestCase):
+    """Presupuesto de queries del checkout, pagando contra el Wompi simulado"""
+
+    def setUp(self):
+        self.login_customer()
+        for product in self.data.products[:3]:
+            self.client.post(reverse('products:api_add_to_cart', args=[product.id]), {'quantity': 1})
+
+    def test_checkout(self):
+        self.benchmark('payments:checkout', lambda: self.client.get(reverse('payments:checkout')), max_queries=20)
+
+    def test_checkout_widget(self):
+        self.benchmark(
+            'payments:checkout_widget',
+            lambda: self.client.get(reverse('payments:checkout_widget')),
+            max_queries=22,
+        )
+
+    def test_process_payment_pse(self):
+        data = {
+            'payment_method': 'PSE',
+            'customer_name': 'Cliente Benchmark',
+            'customer_email': 'cliente@example.com',
+            'customer_phone': '3001234567',
+            'pse_bank': '1022',
+            'pse_user_type': '0',
+            'pse_document_type': 'CC',
+            'pse_document_number': '1000000000',
+        }
+        response = self.benchmark(
+            'payments:process_payment[PSE]',
+            lambda: self.client.post(reverse('payments:process_payment'), data),
+            max_queries=15,
+            expected_status=302,
+        )
+        # PSE redirige al banco (la página de redirección del Wompi simulado)
+        self.assertIn(f'{self.wompi.host}:{self.wompi.port}/redirect/', response['Location'])
+
+
+class CheckoutIdempotencyTests(FakeWompiMixin, ViewBenchmarkTestCase):
+    """Doble envío del formulario de checkout (idempotent_checkout)"""
+
+    def setUp(self):
+        self.login_customer()
+        self.client.post(reverse('products:api_add_to_cart', args=[self.data.products[0].id]), {'quantity': 1})
+
+    def pay(self, key):
+        return self.client.post(reverse('payments:process_payment'), {
+            'idempotency_key': key,
+            'payment_method': 'PSE',
+            'customer_name': 'Cliente Benchmark',
+            'customer_email': 'cliente@example.com',
+            'customer_phone': '3001234567',
+            'pse_bank': '1022',
+            'pse_user_type': '0',
+            'pse_document_type': 'CC',
+            'pse_document_number': '1000000000',
+        })
+
+    def test_replayed_key_returns_original_redirect(self):
+        orders = Order.objects.count()
+        with mock.patch.object(
+            WompiClient, 'create_transaction', autospec=True, side_effect=WompiClient.create_transaction,
+        ) as create_transaction:
+            first = self.pay('llave-repetida')
+            second = self.pay('llave-repetida')
+
+        self.assertEqual(second['Location'], first['Location'])
+        self.assertEqual(create_transaction.call_count, 1)
+        self.assertEqual(Order.objects.count(), orders + 1)
+        self.assertEqual(CheckoutAttempt.objects.get(key='llave-repetida').status, 'COMPLETED')
+
+    def test_key_from_another_session_rejected(self):
+        CheckoutAttempt.objects.create(
+            key='llave-ajena', session_key='otra-sesion', expires_at=timezone.now() + timedelta(hours=1),
+        )
+        orders = Order.objects.count()
+
+        response = self.pay('llave-ajena')
+        self.assertRedirects(response, reverse('payments:checkout'), fetch_redirect_response=False)
+        self.assertEqual(Order.objects.count(), orders)
+
+    def test_in_progress_attempt_with_order_goes_to_pending(self):
+        order = create_payment().order
+        CheckoutAttempt.objects.create(
+            key='llave-en-curso', session_key=self.client.session.session_key, order=order,
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+
+        started = time.monotonic()
+        response = self.pay('llave-en-curso')
+        self.assertLess(time.monotonic() - started, WAIT_POLL_SECONDS)
+        self.assertRedirects(
+            response, reverse('payments:payment_pending', args=[order.id]), fetch_redirect_response=False,
+        )
+
+    def test_exception_releases_key(self):
+        @idempotent_checkout('payments:checkout')
+        def failing_view(request):
+            raise RuntimeError('Wompi caído')
+
+        request = RequestFactory().post('/', {'idempotency_key': 'llave-fallida'})
+        request.session = SessionStore()
+        request.session.create()
+
+        with self.assertRaises(RuntimeError):
+            failing_view(request)
+        self.assertFalse(CheckoutAttempt.objects.filter(key='llave-fallida').exists())
+
+    @override_settings(CHECKOUT_IDEMPOTENCY_TTL_HOURS=1)
+    def test_purge_honors_ttl(self):
+        attempt, created = begin_attempt('llave-vigente', 'sesion')
+        self.assertTrue(created)
+        self.assertAlmostEqual(attempt.expires_at, timezone.now() + timedelta(hours=1), delta=timedelta(seconds=5))
+        CheckoutAttempt.objects.create(key='llave-vencida', session_key='sesion', expires_at=timezone.now())
+
+        self.assertEqual(purge_expired_attempts(), 1)
+        self.assertEqual(list(CheckoutAttempt.objects.values_list('key', flat=True)), ['llave-vigente'])
+
+        # Una llave vencida se puede volver a usar
+        CheckoutAttempt.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(begin_attempt('llave-vigente', 'otra-sesion')[1])
+
+
+class AsyncWompiClientTests(FakeWompiMixin, TestCase):
+    """AsyncWompiClient y las vistas ASGI contra el Wompi simulado, comparados con la versión síncrona"""
+
+    def run_async(self, make_coroutine):
+        async def main():
+            try:
+                return await make_coroutine()
+            finally:
+                await close_http_client()
+        return async_to_sync(main)()
+
+    def create_card_transaction(self, client):
+        token = client.tokenize_card('4242424242424242', '123', '12', '30', 'Cliente')['data']['id']
+        acceptance = client.get_acceptance_token()['data']['presigned_acceptance']['acceptance_token']
+        return client.create_transaction(
+            amount_in_cents=11900000, currency='COP', customer_email='cliente@example.com',
+            payment_method=client.build_card_payment_method(token, 1),
+            reference=f'TEST-{uuid.uuid4().hex[:12]}', acceptance_token=acceptance,
+        )['data']
+
+    def test_methods_match_sync_client(self):
+        sync_client, async_client = WompiClient(), AsyncWompiClient()
+        transaction_id = self.create_card_transaction(sync_client)['id']
+
+        self.assertEqual(
+            self.run_async(async_client.get_pse_financial_institutions),
+            sync_client.get_pse_financial_institutions(),
+        )
+        self.assertEqual(
+            self.run_async(lambda: async_client.get_transaction(transaction_id)),
+            sync_client.get_transaction(transaction_id),
+        )
+
+        # Tokens e ids son nuevos en cada llamada: se compara el resto
+        sync_acceptance = sync_client.get_acceptance_token()['data']
+        async_acceptance = self.run_async(async_client.get_acceptance_token)['data']
+        for acceptance in (sync_acceptance, async_acceptance):
+            acceptance['presigned_acceptance'].pop('acceptance_token')
+        self.assertEqual(async_acceptance, sync_acceptance)
+
+        card = ('4242424242424242', '123', '12', '30', 'Cliente')
+        sync_token = sync_client.tokenize_card(*card)['data']
+        async_token = self.run_async(lambda: async_client.tokenize_card(*card))['data']
+        self.assertEqual({**async_token, 'id': None}, {**sync_token, 'id': None})
+
+        async def create_with_async_client():
+            token = (await async_client.tokenize_card(*card))['data']['id']
+            acceptance = (await async_client.get_acceptance_token())['data']['presigned_acceptance']
+            return (await async_client.create_transaction(
+                amount_in_cents=11900000, currency='COP', customer_email='cliente@example.com',
+                payment_method=async_client.build_card_payment_method(token, 1),
+                reference='TEST-ASYNC', acceptance_token=acceptance['acceptance_token'],
+            ))['data']
+        created = self.run_async(create_with_async_client)
+        self.assertEqual(
+            (created['status'], created['reference'], created['amount_in_cents']), ('PENDING', 'TEST-ASYNC', 11900000),
+        )
+
+        with self.assertRaises(WompiAPIException) as sync_error:
+            sync_client.get_transaction('tx-desconocida')
+        with self.assertRaises(WompiAPIException) as async_error:
+            self.run_async(lambda: async_client.get_transaction('tx-desconocida'))
+        self.assertEqual(str(async_error.exception), str(sync_error.exception))
+
+    def test_calls_overlap(self):
+        client = AsyncWompiClient()
+        transaction_id = self.create_card_transaction(WompiClient())['id']
+
+        self.wompi.latency_ms = 300
+        self.addCleanup(setattr, self.wompi, 'latency_ms', 0)
+
+        started = time.monotonic()
+        acceptance, transaction_data = self.run_async(lambda: asyncio.gather(
+            client.get_acceptance_token(),
+            client.get_transaction(transaction_id),
+        ))
+        self.assertLess(time.monotonic() - started, 0.55)
+        self.assertIn('acceptance_token', acceptance['data']['presigned_acceptance'])
+        self.assertEqual(transaction_data['data']['id'], transaction_id)
+
+    def view_result(self, view, factory, params, is_async=False):
+        request = factory.get(reverse('payments:payment_callback'), params)
+        request.session = SessionStore()
+        request._messages = FallbackStorage(request)
+        response = self.run_async(lambda: view(request)) if is_async else view(request)
+        return response.status_code, response.get('Location'), response.content, [str(m) for m in request._messages]
+
+    def test_async_views_match_sync_views(self):
+        payment = create_payment()
+        transaction_id = self.create_card_transaction(WompiClient())['id']
+        Payment.objects.filter(pk=payment.pk).update(wompi_transaction_id=transaction_id)
+
+        cases = [
+            (views.payment_callback, views.payment_callback_async, {'id': transaction_id}),
+            (views.payment_callback, views.payment_callback_async, {'id': 'tx-sin-pago'}),
+            (views.payment_callback, views.payment_callback_async, {}),
+            (views.get_pse_banks, views.get_pse_banks_async, {}),
+        ]
+        for sync_view, async_view, params in cases:
+            with self.subTest(view=sync_view.__name__, params=params):
+                self.assertEqual(
+                    self.view_result(async_view, AsyncRequestFactory(), params, is_async=True),
+                    self.view_result(sync_view, RequestFactory(), params),
+                )
+
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'APPROVED')
+        self.assertEqual(
+            self.view_result(views.payment_callback, RequestFactory(), {'id': transaction_id})[1],
+            reverse('payments:payment_success', args=[payment.order_id]),
+        )
+
+
+class WidgetReferenceTests(FakeWompiMixin, ViewBenchmarkTestCase):
+    """La referencia (número de orden) del widget la emite el servidor"""
+
+    def setUp(self):
+        self.login_customer()
+        self.client.post(reverse('products:api_add_to_cart', args=[self.data.products[0].id]), {'quantity': 1})
+
+    def create_order(self, reference):
+        return self.client.post(reverse('payments:create_order_from_widget'), {
+            'customer_name': 'Cliente Widget',
+            'customer_email': 'cliente@example.com',
+            'customer_phone': '3001234567',
+            'transaction_id': 'tx-desconocida',
+            'reference': reference,
+        })
+
+    def test_issued_reference_creates_order_once(self):
+        reference = self.client.get(reverse('payments:checkout_widget')).context['reference']
+
+        self.create_order(reference)
+        self.assertTrue(Order.objects.filter(order_number=reference).exists())
+
+        # La misma referencia no sirve dos veces
+        self.client.post(reverse('products:api_add_to_cart', args=[self.data.products[0].id]), {'quantity': 1})
+        response = self.create_order(reference)
+        self.assertRedirects(response, reverse('payments:checkout_widget'), fetch_redirect_response=False)
+        self.assertEqual(Order.objects.filter(order_number=reference).count(), 1)
+
+    def test_client_chosen_reference_rejected(self):
+        self.client.get(reverse('payments:checkout_widget'))
+        response = self.create_order('GW-99999999')
+        self.assertRedirects(response, reverse('payments:checkout_widget'), fetch_redirect_response=False)
+        self.assertFalse(Order.objects.filter(order_number='GW-99999999').exists())
+
+
+class OrderNumberAllocatorTests(TestCase):
+    """Bloques de números de orden"""
+
+    def test_numbers_from_consecutive_blocks(self):
+        allocator = OrderNumberAllocator(block_size=3)
+        numbers = [allocator.next_number() for _ in range(5)]
+        blocks = list(OrderNumberBlock.objects.order_by('id').values_list('id', flat=True))
+        self.assertEqual(len(blocks), 2)
+        self.assertEqual(numbers[:3], [(blocks[0] - 1) * 3 + i for i in (1, 2, 3)])
+        self.assertEqual(numbers[3:], [(blocks[1] - 1) * 3 + i for i in (1, 2)])
+
+    def test_new_block_after_fork(self):
+        allocator = OrderNumberAllocator(block_size=10)
+        first = allocator.next_number()
+        with mock.patch('apps.payments.services.order_numbers.os.getpid', return_value=os.getpid() + 1):
+            after_fork = allocator.next_number()
+        self.assertEqual(OrderNumberBlock.objects.count(), 2)
+        self.assertGreaterEqual(after_fork, first + 10)
+
+
+class OrderNumberBlockCommitTests(TransactionTestCase):
+    """El bloque queda reservado aunque la transacción del llamador haga rollback"""
+
+    def test_block_survives_rollback(self):
+        allocator = OrderNumberAllocator(block_size=10)
+        # SQLite usa la misma conexión; así se prueba el camino de MySQL (conexión aparte)
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    number = allocator.next_number()
+                    raise RuntimeError('rollback')
+
+        block = OrderNumberBlock.objects.get()
+        self.assertEqual(number, (block.id - 1) * 10 + 1)
+
+
+def create_payment(order_status='PROCESSING', payment_status='PENDING'):
+    # Número explícito: el bloque del asignador se pierde con el rollback de cada prueba
+    order = Order.objects.create(
+        order_number=f'TEST-{uuid.uuid4().hex[:12]}', customer_name='Cliente', customer_email='cliente@example.com',
+        total_amount=Decimal('119000'), status=order_status,
+    )
+    return Payment.objects.create(
+        order=order, wompi_transaction_id=f'tx-{order.order_number}', wompi_reference=order.order_number,
+        payment_method='CARD', amount=order.total_amount, status=payment_status,
+    )
+
+
+class StateMachineTests(TestCase):
+    """Transiciones de Order y Payment"""
+
+    def approved_emails(self):
+        return OutboundEmail.objects.filter(subject__startswith='Pago confirmado').count()
+
+    def test_transition_tables(self):
+        for transitions, transition, create in (
+            (ORDER_TRANSITIONS, transition_order, lambda status: create_payment(order_status=status).order),
+            (PAYMENT_TRANSITIONS, transition_payment, lambda status: create_payment(payment_status=status)),
+        ):
+            for from_status in transitions:
+                for to_status in transitions:
+                    with self.subTest(from_status=from_status, to_status=to_status):
+                        obj = create(from_status)
+                        self.assertEqual(transition(obj, to_status), to_status in transitions[from_status])
+                        obj.refresh_from_db()
+                        expected = to_status if to_status in transitions[from_status] else from_status
+                        self.assertEqual(obj.status, expected)
+
+    def test_concurrent_approvals_apply_once(self):
+        payment = create_payment()
+        stale = Payment.objects.get(pk=payment.pk)
+
+        self.assertEqual(apply_transaction_status(payment, 'APPROVED'), (True, True))
+        self.assertEqual(apply_transaction_status(stale, 'APPROVED'), (False, False))
+        self.assertEqual(self.approved_emails(), 1)
+
+    def test_stale_report_does_not_rewrite_failed_order(self):
+        payment = create_payment(order_status='FAILED', payment_status='DECLINED')
+
+        for status in ('PENDING', 'APPROVED'):
+            self.assertEqual(apply_transaction_status(payment, status), (False, False))
+        payment.order.refresh_from_db()
+        self.assertEqual(payment.order.status, 'FAILED')
+        self.assertEqual(self.approved_emails(), 0)
+
+    def test_order_synced_when_payment_already_in_status(self):
+        # Widget: el pago se crea APPROVED y la orden sigue en PROCESSING
+        payment = create_payment(payment_status='APPROVED')
+        self.assertEqual(apply_transaction_status(payment, 'APPROVED'), (False, True))
+        self.assertEqual(payment.order.status, 'PAID')
+        self.assertEqual(self.approved_emails(), 1)
+
+
+class RollupConsistencyTests(TestCase):
+    """Los rollups en vivo coinciden con rebuild_day"""
+
+    def snapshot(self, day):
+        return (
+            list(DailySalesRollup.objects.filter(date=day).values_list('orders_count', 'revenue', 'units')),
+            sorted(DailyProductSales.objects.filter(date=day).values_list('product_sku', 'units', 'revenue')),
+            sorted(DailyPaymentMethodStats.objects.filter(date=day).values_list(
+                'payment_method', 'attempts', 'approved', 'approved_amount',
+            )),
+        )
+
+    def test_live_updates_match_rebuild(self):
+        payments = [create_payment() for _ in range(4)]
+        for payment in payments:
+            OrderItem.objects.create(
+                order=payment.order, product_name='Producto', product_sku='SKU-1', quantity=2, unit_price=Decimal('59500'),
+            )
+            apply_transaction_status(payment, 'APPROVED')
+        apply_transaction_status(create_payment(), 'DECLINED')
+
+        # Pagada -> reembolsada desde el admin, y aprobado -> anulado por Wompi
+        transition_order(payments[0].order, 'REFUNDED')
+        self.assertEqual(apply_transaction_status(payments[1], 'VOIDED'), (True, True))
+
+        day = timezone.localdate()
+        live = self.snapshot(day)
+        self.assertEqual(live[0], [(2, Decimal('238000'), 4)])
+        self.assertEqual(live[2], [('CARD', 4, 3, Decimal('357000'))])
+
+        rebuild_day(day)
+        self.assertEqual(self.snapshot(day), live)
+
+    def test_refund_without_day_row_is_logged(self):
+        payment = create_payment()
+        apply_transaction_status(payment, 'APPROVED')
+        DailySalesRollup.objects.all().delete()
+
+        with self.assertLogs('apps.payments.services.rollups', 'ERROR'):
+            transition_order(payment.order, 'REFUNDED')
+        self.assertFalse(DailySalesRollup.objects.exists())
+
+
+class StalePendingPaymentsTests(TestCase):
+    """Pagos que revisa reconcile_payments"""
+
+    def test_loaded_with_order_in_one_query(self):
+        for _ in range(3):
+            create_payment()
+        Payment.objects.update(created_at=timezone.now() - timedelta(hours=1))
+
+        with self.assertNumQueries(1):
+            for payment in stale_pending_payments():
+                # Lo que leen apply_transaction_status, los rollups y el email
+                payment.amount, payment.payment_method, payment.created_at, payment.order.customer_email
+
+
+class WebhookViewBenchmarks(ViewBenchmarkTestCase):
+    """Presupuesto de queries del webhook de Wompi (solo guarda el evento)"""
+
+    def test_wompi_webhook(self):
+        payloads = iter(synthetic_payloads(settings.BENCHMARK_ITERATIONS + 1, seed=1))
+        url = reverse('payments:wompi_webhook')
+
+        def post_event():
+            payload = resign_payload(next(payloads), settings.WOMPI_EVENTS_SECRET, int(time.time()))
+            return self.client.post(url, payload, content_type='application/json')
+
+        self.benchmark('payments:wompi_webhook', post_event, max_queries=4)
+
+    def test_recent_duplicates_counter(self):
+        payload = resign_payload(synthetic_payloads(1, seed=2)[0], settings.WOMPI_EVENTS_SECRET, int(time.time()))
+        url = reverse('payments:wompi_webhook')
+        for _ in range(3):
+            self.client.post(url, payload, content_type='application/json')
+        self.assertEqual(suppressed_duplicates_recent(), 2)
+
+        WompiWebhookEvent.objects.update(last_duplicate_at=timezone.now() - timedelta(hours=settings.WOMPI_DUPLICATES_WINDOW_HOURS + 1))
+        self.assertEqual(suppressed_duplicates_recent(), 0)
+
+    def test_replay_refused_without_separate_database(self):
+        with self.assertRaisesMessage(CommandError, 'WEBHOOK_REPLAY_ALLOWED'):
+            call_command('replay_webhooks', '--source', 'synthetic', '--count', '1', stdout=StringIO())
+        self.assertFalse(WompiWebhookEvent.objects.filter(payload__data__transaction__reference__startswith='REPLAY-').exists())
+
+
+class WebhookWorkerTests(ViewBenchmarkTestCase):
+    """Worker de webhooks (process_pending_events) y reproceso desde el admin"""
+
+    def store_event(self, payment, status='APPROVED', **fields):
+        return WompiWebhookEvent.objects.create(
+            event_type='transaction.updated',
+            transaction_id=payment.wompi_transaction_id,
+            payload={'event': 'transaction.updated', 'data': {'transaction': {
+                'id': payment.wompi_transaction_id, 'reference': payment.wompi_reference, 'status': status,
+            }}},
+            **fields,
+        )
+
+    def test_transaction_updated_applies_to_payment_and_order(self):
+        payment = create_payment()
+        event = self.store_event(payment)
+
+        self.assertEqual(process_pending_events(), (1, 0))
+        payment.refresh_from_db()
+        event.refresh_from_db()
+        self.assertEqual((payment.status, payment.order.status), ('APPROVED', 'PAID'))
+        self.assertEqual((event.processed, event.payment_id, event.error_message), (True, payment.pk, ''))
+
+    def test_failing_event_does_not_roll_back_batch(self):
+        good, bad = create_payment(), create_payment()
+        good_event, bad_event = self.store_event(good), self.store_event(bad)
+
+        def apply_or_fail(payment, status, transaction_data=None):
+            if payment.pk == bad.pk:
+                raise RuntimeError('Fallo aplicando el evento')
+            return apply_transaction_status(payment, status, transaction_data)
+
+        with mock.patch('apps.payments.services.webhooks.apply_transaction_status', side_effect=apply_or_fail), \
+                self.assertLogs('apps.payments.services.webhooks', 'ERROR'):
+            self.assertEqual(process_pending_events(), (1, 1))
+
+        good_event.refresh_from_db()
+        bad_event.refresh_from_db()
+        good.refresh_from_db()
+        bad.refresh_from_db()
+        self.assertEqual((good_event.processed, good_event.attempts, good.status), (True, 0, 'APPROVED'))
+        self.assertEqual((bad_event.processed, bad_event.attempts, bad.status), (False, 1, 'PENDING'))
+        self.assertEqual(bad_event.error_message, 'Fallo aplicando el evento')
+
+    def test_exhausted_events_are_not_claimed(self):
+        payment = create_payment()
+        event = self.store_event(payment, attempts=settings.WOMPI_WEBHOOK_MAX_ATTEMPTS)
+
+        self.assertEqual(process_pending_events(), (0, 0))
+        event.refresh_from_db()
+        self.assertFalse(event.processed)
+
+    def test_admin_reprocess_goes_through_enqueue(self):
+        payment = create_payment()
+        event = self.store_event(
+            payment, processed=True, processed_at=timezone.now(), attempts=settings.WOMPI_WEBHOOK_MAX_ATTEMPTS,
+        )
+
+        self.login_admin()
+        with mock.patch('apps.payments.admin.enqueue_events', side_effect=enqueue_events) as enqueue:
+            self.client.post(reverse('admin:payments_wompiwebhookevent_changelist'), {
+                'action': 'reprocess_webhooks',
+                '_selected_action': [event.pk],
+            })
+        self.assertEqual(enqueue.call_count, 1)
+
+        event.refresh_from_db()
+        self.assertEqual((event.processed, event.attempts), (False, 0))
+        self.assertEqual(process_pending_events(), (1, 0))
+
+
+class WebhookArchiveTests(TestCase):
+    """Archivo de eventos webhook: archivar, exportar y restaurar"""
+
+    def create_event(self, days_ago, processed=True, key=None):
+        event = WompiWebhookEvent.objects.create(
+            event_type='transaction.updated',
+            transaction_id=f'tx-{uuid.uuid4().hex[:8]}',
+            payload={'event': 'transaction.updated', 'data': {'transaction': {'status': 'APPROVED', 'nota': 'Añejo ñandú'}}},
+            idempotency_key=key or uuid.uuid4().hex,
+            processed=processed,
+            processed_at=timezone.now() - timedelta(days=days_ago) if processed else None,
+        )
+        WompiWebhookEvent.objects.filter(pk=event.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        event.refresh_from_db()
+        return event
+
+    def test_archive_export_restore_round_trip(self):
+        old = self.create_event(days_ago=100)
+        pending = self.create_event(days_ago=100, processed=False)
+        recent = self.create_event(days_ago=1)
+
+        self.assertEqual(archive_events(older_than_days=30, batch_size=1), 1)
+        self.assertEqual(
+            set(WompiWebhookEvent.objects.values_list('pk', flat=True)), {pending.pk, recent.pk},
+        )
+        archived = ArchivedWebhookEvent.objects.get()
+        self.assertEqual(archived.pk, old.pk)
+        self.assertEqual(archived.payload, old.payload)
+
+        output = StringIO()
+        self.assertEqual(export_archived(archived_events(transaction_id=old.transaction_id), output), 1)
+        exported = json.loads(output.getvalue())
+        self.assertEqual(exported['payload'], old.payload)
+        self.assertEqual(exported['created_at'], old.created_at.isoformat())
+
+        self.assertEqual(restore_archived(archived_events(transaction_id=old.transaction_id)), (1, 0))
+        restored = WompiWebhookEvent.objects.get(pk=old.pk)
+        self.assertEqual(
+            (restored.payload, restored.created_at, restored.processed, restored.idempotency_key),
+            (old.payload, old.created_at, True, old.idempotency_key),
+        )
+        self.assertFalse(ArchivedWebhookEvent.objects.exists())
+
+    def test_restore_skips_events_already_live(self):
+        old = self.create_event(days_ago=100, key='llave-reenviada')
+        archive_events(older_than_days=30, batch_size=100)
+        # Wompi reenvió el mismo evento después del archivado
+        self.create_event(days_ago=0, key='llave-reenviada')
+        other = self.create_event(days_ago=100)
+        archive_events(older_than_days=30, batch_size=100)
+
+        with self.assertLogs('apps.payments.services.webhook_archive', 'WARNING'):
+            self.assertEqual(restore_archived(archived_events()), (1, 1))
+        self.assertTrue(WompiWebhookEvent.objects.filter(pk=other.pk).exists())
+        self.assertEqual(list(ArchivedWebhookEvent.objects.values_list('pk', flat=True)), [old.pk])
+
+
+class CustomerOrderViewBenchmarks(ViewBenchmarkTestCase):
+    """Presupuesto de queries de 'Mis Compras' (cliente con 150 pedidos)"""
+
+    def setUp(self):
+        self.login_customer()
+
+    def test_my_orders(self):
+        self.benchmark('payments:my_orders', lambda: self.client.get(reverse('payments:my_orders')), max_queries=6)
+
+    def test_my_orders_json(self):
+        self.benchmark(
+            'payments:my_orders_json',
+            lambda: self.client.get(reverse('payments:my_orders_json')),
+            max_queries=5,
+        )
+
+    def test_cursor_pages_do_not_overlap(self):
+        url = reverse('payments:my_orders_json')
+        first = self.client.get(url).json()
+        second = self.client.get(first['next_url']).json()
+
+        first_ids = [order['id'] for order in first['orders']]
+        second_ids = [order['id'] for order in second['orders']]
+        self.assertEqual(len(first_ids), settings.MY_ORDERS_PAGE_SIZE)
+        self.assertFalse(set(first_ids) & set(second_ids))
+        self.assertLess(second['orders'][0]['created_at'], first['orders'][-1]['created_at'])
+
+        response = self.client.get(reverse('payments:my_orders'), {'after': first['next_cursor']})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, second['orders'][0]['order_number'])
+
+    def test_tampered_cursor_shows_first_page(self):
+        first = self.client.get(reverse('payments:my_orders_json')).json()
+        tampered = base64.urlsafe_b64encode(b'2024-01-01T00:00:00|notauuid').decode('ascii')
+
+        for cursor in (tampered, 'no-es-base64!', 'A'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse('payments:my_orders_json'), {'after': cursor})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['orders'], first['orders'])
+                self.assertEqual(self.client.get(reverse('payments:my_orders'), {'after': cursor}).status_code, 200)
+
+    def test_order_detail(self):
+        url = reverse('payments:order_detail', args=[self.data.orders[0].id])
+        self.benchmark('payments:order_detail', lambda: self.client.get(url), max_queries=6)
+
+    def test_payment_status(self):
+        url = reverse('payments:payment_status', args=[self.data.orders[0].id])
+        self.benchmark('payments:payment_status', lambda: self.client.get(url), max_queries=1)
+
+    @override_settings(PAYMENT_STATUS_MAX_WAIT=1, PAYMENT_STATUS_POLL_INTERVAL=0.2)
+    def test_payment_status_wait_is_short(self):
+        url = reverse('payments:payment_status', args=[self.data.orders[0].id])
+        state = self.client.get(url).json()['state']
+
+        started = time.monotonic()
+        data = self.client.get(url, {'since': state}).json()
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(data['state'], state)
+
+
+class PaymentAdminBenchmarks(ViewBenchmarkTestCase):
+    """Presupuesto de queries de los changelists de pagos"""
+
+    def setUp(self):
+        self.login_admin()
+
+    def test_order_changelist(self):
+        url = reverse('admin:payments_order_changelist')
+        self.benchmark('admin:payments_order_changelist', lambda: self.client.get(url), max_queries=8)
+
+    def test_payment_changelist(self):
+        url = reverse('admin:payments_payment_changelist')
+        self.benchmark('admin:payments_payment_changelist', lambda: self.client.get(url), max_queries=8)
+
+    def test_webhook_changelist(self):
+        url = reverse('admin:payments_wompiwebhookevent_changelist')
+        self.benchmark('admin:payments_wompiwebhookevent_changelist', lambda: self.client.get(url), max_queries=9)
+
+    def test_sales_dashboard(self):
+        url = reverse('admin:payments_dailysalesrollup_changelist')
+        self.benchmark('admin:payments_dailysalesrollup_changelist', lambda: self.client.get(url), max_queries=12)
@@ -2,23 +2,33 @@
 Views for payment processing
 """
 import json
+import time
 import uuid
 import logging
 from decimal import Decimal
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse, HttpResponse
+from django.http import HttpResponseNotAllowed, JsonResponse
 from django.views.decorators.http import require_http_methods, require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.urls import reverse
 from django.conf import settings
-from django.utils import timezone
+from django.db.models import OuterRef, Prefetch, Subquery
+from asgiref.sync import sync_to_async
 
+from apps.core.paginator import keyset_paginate
 from apps.products.models import Cart, CartItem
-from .models import Order, OrderItem, Payment, WompiWebhookEvent
-from .services import WompiClient
-from .email_utils import send_order_confirmation_email, send_payment_approved_email, send_new_order_admin_email
+from .models import Order, OrderItem, Payment
+from .services import AsyncWompiClient, WompiClient
+from .services.webhooks import store_event, verify_signature
+from .services.state_machine import apply_transaction_status, transition_order
+from .services.idempotency import attach_order, idempotent_checkout, new_idempotency_key
+from .services.order_numbers import (
+    forget_widget_reference, next_order_number, remember_widget_reference, widget_reference_issued,
+)
+from .services.rollups import record_payment_result
+from .email_utils import send_order_confirmation_email, send_new_order_admin_email
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +77,7 @@ def checkout_view(request):
         'total': total,
         'wompi_public_key': settings.WOMPI_PUBLIC_KEY,
         'environment': settings.WOMPI_ENVIRONMENT,
+        'idempotency_key': new_idempotency_key(),
     }
 
     return render(request, 'payments/checkout.html', context)
@@ -97,6 +108,12 @@ def checkout_widget_view(request):
     total = cart.total * Decimal('1.19')
     total_in_cents = int(total * 100)  # Wompi necesita centavos
 
+    # Referencia (futuro número de orden) y firma de integridad se generan en el
+    # servidor: el integrity key nunca llega al navegador
+    reference = next_order_number()
+    remember_widget_reference(request, reference)
+    integrity_signature = WompiClient().get_integrity_signature(reference, total_in_cents)
+
     # URL de redirección después del pago
     redirect_url = request.build_absolute_uri(reverse('payments:payment_callback'))
 
@@ -112,10 +129,12 @@ def checkout_widget_view(request):
         'total': total,
         'total_in_cents': total_in_cents,
         'wompi_public_key': settings.WOMPI_PUBLIC_KEY,
-        'wompi_integrity_key': settings.WOMPI_INTEGRITY_KEY,
+        'reference': reference,
+        'integrity_signature': integrity_signature,
         'redirect_url': redirect_url,
         'environment': settings.WOMPI_ENVIRONMENT,
         'saved_addresses': saved_addresses,
+        'idempotency_key': new_idempotency_key(),
     }
 
     return render(request, 'payments/checkout_widget.html', context)
@@ -126,6 +145,7 @@ def checkout_widget_view(request):
 # ==========================================
 
 @require_POST
+@idempotent_checkout('payments:checkout')
 def process_payment(request):
     """Procesar el pago según el método seleccionado"""
     try:
@@ -152,6 +172,7 @@ def process_payment(request):
             total_amount=cart.total,  # En pesos
             status='PENDING'
         )
+        attach_order(request, order)
 
         # Crear items de la orden
         for cart_item in cart.items.all():
@@ -244,30 +265,26 @@ def process_card_payment(request, order):
             payment_method_data=payment_method_data,
             wompi_response=transaction_data
         )
+        record_payment_result(payment)
 
         # Actualizar estado de la orden
         if payment.status == 'APPROVED':
-            order.status = 'PAID'
-            order.paid_at = timezone.now()
-            order.save()
+            transition_order(order, 'PAID')
 
             # Limpiar carrito
             clear_cart(request)
 
             return redirect('payments:payment_success', order_id=order.id)
         elif payment.status == 'PENDING':
-            order.status = 'PROCESSING'
-            order.save()
+            transition_order(order, 'PROCESSING')
             return redirect('payments:payment_pending', order_id=order.id)
         else:
-            order.status = 'FAILED'
-            order.save()
+            transition_order(order, 'FAILED')
             return redirect('payments:payment_failed', order_id=order.id)
 
     except Exception as e:
         logger.error(f"Error en pago con tarjeta: {str(e)}", exc_info=True)
-        order.status = 'FAILED'
-        order.save()
+        transition_order(order, 'FAILED')
         messages.error(request, f'Error procesando el pago: {str(e)}')
         return redirect('payments:payment_failed', order_id=order.id)
 
@@ -348,22 +365,20 @@ def process_pse_payment(request, order):
             payment_method_data=payment_method_data,
             wompi_response=transaction_data
         )
+        record_payment_result(payment)
 
         # PSE siempre redirige al banco
         async_payment_url = transaction_data.get('payment_method', {}).get('async_payment_url')
         if async_payment_url:
-            order.status = 'PROCESSING'
-            order.save()
+            transition_order(order, 'PROCESSING')
             return redirect(async_payment_url)
         else:
-            order.status = 'PENDING'
-            order.save()
+            # La orden sigue PENDING hasta que Wompi confirme
             return redirect('payments:payment_pending', order_id=order.id)
 
     except Exception as e:
         logger.error(f"Error en pago con PSE: {str(e)}", exc_info=True)
-        order.status = 'FAILED'
-        order.save()
+        transition_order(order, 'FAILED')
         messages.error(request, f'Error procesando el pago: {str(e)}')
         return redirect('payments:payment_failed', order_id=order.id)
 
@@ -428,10 +443,10 @@ def process_nequi_payment(request, order):
             payment_method_data=payment_method_data,
             wompi_response=transaction_data
         )
+        record_payment_result(payment)
 
         # Nequi siempre es asíncrono (usuario debe aprobar en su app)
-        order.status = 'PROCESSING'
-        order.save()
+        transition_order(order, 'PROCESSING')
 
         # Limpiar carrito
         clear_cart(request)
@@ -440,8 +455,7 @@ def process_nequi_payment(request, order):
 
     except Exception as e:
         logger.error(f"Error en pago con Nequi: {str(e)}", exc_info=True)
-        order.status = 'FAILED'
-        order.save()
+        transition_order(order, 'FAILED')
         messages.error(request, f'Error procesando el pago: {str(e)}')
         return redirect('payments:payment_failed', order_id=order.id)
 
@@ -496,9 +510,9 @@ def process_bancolombia_payment(request, order, payment_type='BANCOLOMBIA_TRANSF
             payment_method_data=payment_method_data,
             wompi_response=transaction_data
         )
+        record_payment_result(payment)
 
-        order.status = 'PROCESSING'
-        order.save()
+        transition_order(order, 'PROCESSING')
 
         # Limpiar carrito
         clear_cart(request)
@@ -512,8 +526,7 @@ def process_bancolombia_payment(request, order, payment_type='BANCOLOMBIA_TRANSF
 
     except Exception as e:
         logger.error(f"Error en pago con {payment_type}: {str(e)}", exc_info=True)
-        order.status = 'FAILED'
-        order.save()
+        transition_order(order, 'FAILED')
         messages.error(request, f'Error procesando el pago: {str(e)}')
         return redirect('payments:payment_failed', order_id=order.id)
 
@@ -529,9 +542,10 @@ def payment_success(request, order_id):
 
 
 def payment_pending(request, order_id):
-    """Vista de pago pendiente"""
+    """Vista de pago pendiente (la página consulta payment_status por long-poll)"""
     order = get_object_or_404(Order, id=order_id)
-    return render(request, 'payments/payment_pending.html', {'order': order})
+    payment = order.payments.first()
+    return render(request, 'payments/payment_pending.html', {'order': order, 'payment': payment})
 
 
 def payment_failed(request, order_id):
@@ -540,102 +554,64 @@ def payment_failed(request, order_id):
     return render(request, 'payments/payment_failed.html', {'order': order})
 
 
-# ==========================================
-# WEBHOOK
-# ==========================================
-
-@csrf_exempt
-@require_POST
-def wompi_webhook(request):
-    """Recibir notificaciones de Wompi sobre cambios en transacciones"""
-    try:
-        # Leer el payload
-        payload = json.loads(request.body.decode('utf-8'))
-
-        logger.info(f"Webhook recibido de Wompi: {payload}")
-
-        # Extraer datos del evento
-        event = payload.get('event')
-        data = payload.get('data', {})
-        transaction_id = data.get('transaction', {}).get('id')
-
-        # Guardar el evento webhook
-        webhook_event = WompiWebhookEvent.objects.create(
-            event_type=event,
-            transaction_id=transaction_id,
-            payload=payload,
-            processed=False
-        )
-
-        # Procesar el evento
-        if event == 'transaction.updated':
-            process_transaction_updated(webhook_event, data)
-        elif event == 'nequi_token.updated':
-            process_nequi_token_updated(webhook_event, data)
-
-        return HttpResponse(status=200)
-
-    except Exception as e:
-        logger.error(f"Error procesando webhook: {str(e)}", exc_info=True)
-        return HttpResponse(status=500)
-
-
-def process_transaction_updated(webhook_event, data):
-    """Procesar actualización de transacción"""
-    try:
-        transaction_data = data.get('transaction', {})
-        transaction_id = transaction_data.get('id')
-        status = transaction_data.get('status')
-
-        # Buscar el pago
-        payment = Payment.objects.filter(wompi_transaction_id=transaction_id).first()
-
-        if payment:
-            # Actualizar el pago
-            payment.status = status
-            payment.wompi_response = transaction_data
-            payment.save()
-
-            # Actualizar la orden
-            order = payment.order
-            if status == 'APPROVED':
-                order.status = 'PAID'
-                order.paid_at = timezone.now()
-            elif status == 'DECLINED' or status == 'ERROR':
-                order.status = 'FAILED'
-            elif status == 'VOIDED':
-                order.status = 'REFUNDED'
-
-            order.save()
-
-            # Marcar webhook como procesado
-            webhook_event.payment = payment
-            webhook_event.processed = True
-            webhook_event.processed_at = timezone.now()
-            webhook_event.save()
+def _payment_status_snapshot(order_id):
+    """Estado de la orden y de su último pago en una sola query"""
+    latest_payment_status = Payment.objects.filter(order=OuterRef('pk')).order_by('-created_at').values('status')[:1]
+    return (
+        Order.objects
+        .filter(id=order_id)
+        .annotate(payment_status=Subquery(latest_payment_status))
+        .values('status', 'payment_status')
+        .first()
+    )
 
-            logger.info(f"Pago {payment.id} actualizado a {status}")
 
-    except Exception as e:
-        logger.error(f"Error procesando transaction.updated: {str(e)}", exc_info=True)
-        webhook_event.error_message = str(e)
-        webhook_event.save()
+def _payment_status_redirect(order_id, snapshot):
+    """URL a la que debe ir la página pendiente, o None si sigue pendiente"""
+    if snapshot['status'] == 'PAID' or snapshot['payment_status'] == 'APPROVED':
+        return reverse('payments:payment_success', kwargs={'order_id': order_id})
+    if snapshot['status'] in ('FAILED', 'CANCELLED') or snapshot['payment_status'] in ('DECLINED', 'ERROR', 'VOIDED'):
+        return reverse('payments:payment_failed', kwargs={'order_id': order_id})
+    return None
 
 
-def process_nequi_token_updated(webhook_event, data):
-    """Procesar actualización de token Nequi"""
-    try:
-        # Aquí se puede manejar la actualización de tokens Nequi si es necesario
-        logger.info(f"Token Nequi actualizado: {data}")
-
-        webhook_event.processed = True
-        webhook_event.processed_at = timezone.now()
-        webhook_event.save()
+@require_http_methods(["GET"])
+def payment_status(request, order_id):
+    """
+    Estado del pago de una orden (JSON)
 
-    except Exception as e:
-        logger.error(f"Error procesando nequi_token.updated: {str(e)}", exc_info=True)
-        webhook_event.error_message = str(e)
-        webhook_event.save()
+    Lee solo Order/Payment locales, que actualizan el worker de webhooks y la
+    conciliación; nunca consulta a Wompi. Si el cliente envía `?since=` con el
+    estado que ya conoce, la respuesta espera hasta PAYMENT_STATUS_MAX_WAIT
+    segundos (1-2: ocupa un worker) a que cambie; la página pendiente espera
+    entre consultas con backoff.
+    """
+    snapshot = _payment_status_snapshot(order_id)
+    if snapshot is None:
+        return JsonResponse({'error': 'Orden no encontrada'}, status=404)
+
+    since = request.GET.get('since')
+    if since:
+        deadline = time.monotonic() + settings.PAYMENT_STATUS_MAX_WAIT
+        while (
+            f"{snapshot['status']}:{snapshot['payment_status']}" == since
+            and time.monotonic() < deadline
+        ):
+            time.sleep(settings.PAYMENT_STATUS_POLL_INTERVAL)
+            snapshot = _payment_status_snapshot(order_id)
+            if snapshot is None:
+                return JsonResponse({'error': 'Orden no encontrada'}, status=404)
+
+    redirect_url = _payment_status_redirect(order_id, snapshot)
+    response = JsonResponse({
+        'order_status': snapshot['status'],
+        'payment_status': snapshot['payment_status'],
+        'state': f"{snapshot['status']}:{snapshot['payment_status']}",
+        'final': redirect_url is not None,
+        'redirect_url': redirect_url,
+    })
+    response['Cache-Control'] = 'no-store'
+    return response
 
 
 # ==========================================
@@ -733,6 +709,7 @@ def clear_cart(request):
 # ==========================================
 
 @require_POST
+@idempotent_checkout('payments:checkout_widget')
 def create_order_from_widget(request):
     """
     Crear orden después de que el Widget de Wompi procesó el pago
@@ -759,6 +736,12 @@ def create_order_from_widget(request):
             messages.error(request, 'Datos incompletos del pago')
             return redirect('payments:checkout_widget')
 
+        # La referencia (número de orden) solo puede ser una emitida por checkout_widget_view a esta sesión
+        if not widget_reference_issued(request, reference):
+            logger.warning(f"Referencia de widget no emitida para esta sesión: {reference!r}")
+            messages.error(request, 'La sesión de pago no es válida. Intenta de nuevo.')
+            return redirect('payments:checkout_widget')
+
         # Obtener carrito
         session_key = request.session.session_key
         try:
@@ -792,6 +775,8 @@ def create_order_from_widget(request):
             shipping_address=shipping_address_data,
             status='PROCESSING'
         )
+        attach_order(request, order)
+        forget_widget_reference(request, reference)
 
         # Crear items de la orden
         for cart_item in cart.items.all():
@@ -828,27 +813,24 @@ def create_order_from_widget(request):
             status=status,
             wompi_response=transaction_info
         )
+        record_payment_result(payment)
 
         # Actualizar estado de la orden según el pago
+        # (el email de pago aprobado sale solo si esta llamada marcó la orden PAID)
         if status == 'APPROVED':
-            order.status = 'PAID'
-            order.paid_at = timezone.now()
-            order.save()
+            apply_transaction_status(payment, status)
 
             # Limpiar carrito
             cart.items.all().delete()
             cart.delete()
 
-            # Enviar emails
-            send_payment_approved_email(order, payment)
             send_new_order_admin_email(order)
 
             messages.success(request, '¡Pago exitoso! Tu pedido ha sido confirmado.')
             return redirect('payments:payment_success', order_id=order.id)
 
         elif status == 'PENDING':
-            order.status = 'PROCESSING'
-            order.save()
+            # La orden ya se creó en PROCESSING
 
             # Enviar email de confirmación de orden
             send_order_confirmation_email(order)
@@ -858,8 +840,7 @@ def create_order_from_widget(request):
             return redirect('payments:payment_pending', order_id=order.id)
 
         else:  # DECLINED, ERROR
-            order.status = 'FAILED'
-            order.save()
+            apply_transaction_status(payment, status)
             messages.error(request, 'El pago no pudo ser procesado. Intenta nuevamente.')
             return redirect('payments:payment_failed', order_id=order.id)
 
@@ -884,7 +865,7 @@ def payment_callback(request):
 
     try:
         # Buscar el pago por transaction_id
-        payment = Payment.objects.get(wompi_transaction_id=transaction_id)
+        payment = Payment.objects.select_related('order').get(wompi_transaction_id=transaction_id)
         order = payment.order
 
         # Consultar estado actualizado en Wompi
@@ -894,26 +875,16 @@ def payment_callback(request):
             transaction_info = transaction_data.get('data', {})
             status = transaction_info.get('status')
 
-            # Actualizar estado del pago
-            payment.status = status
-            payment.wompi_response = transaction_info
-            payment.save()
+            # Actualizar pago y orden (sin efecto si el webhook ya lo hizo)
+            apply_transaction_status(payment, status, transaction_info)
 
-            # Actualizar estado de la orden
             if status == 'APPROVED':
-                order.status = 'PAID'
-                order.paid_at = timezone.now()
-                order.save()
                 return redirect('payments:payment_success', order_id=order.id)
 
             elif status == 'PENDING':
-                order.status = 'PROCESSING'
-                order.save()
                 return redirect('payments:payment_pending', order_id=order.id)
 
             else:  # DECLINED, ERROR
-                order.status = 'FAILED'
-                order.save()
                 return redirect('payments:payment_failed', order_id=order.id)
 
         except Exception as e:
@@ -927,6 +898,72 @@ def payment_callback(request):
         return redirect('payments:checkout_widget')
 
 
+# ==========================================
+# VERSIONES ASÍNCRONAS (ASGI)
+# Se activan con WOMPI_ASYNC_VIEWS=True; bajo ASGI la espera a Wompi no
+# ocupa un hilo del servidor.
+# ==========================================
+
+async def payment_callback_async(request):
+    """Versión asíncrona de payment_callback"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    transaction_id = request.GET.get('id')
+
+    if not transaction_id:
+        messages.error(request, 'Transacción no encontrada')
+        return redirect('products:product_list')
+
+    try:
+        # Buscar el pago por transaction_id
+        payment = await Payment.objects.select_related('order').aget(wompi_transaction_id=transaction_id)
+    except Payment.DoesNotExist:
+        # Si el pago no existe aún, redirigir a checkout
+        messages.warning(request, 'Pago no encontrado. Por favor completa el proceso de checkout.')
+        return redirect('payments:checkout_widget')
+
+    order = payment.order
+
+    # Consultar estado actualizado en Wompi
+    client = AsyncWompiClient()
+    try:
+        transaction_data = await client.get_transaction(transaction_id)
+        transaction_info = transaction_data.get('data', {})
+        status = transaction_info.get('status')
+
+        # Actualizar pago y orden (sin efecto si el webhook ya lo hizo)
+        await sync_to_async(apply_transaction_status)(payment, status, transaction_info)
+
+    except Exception as e:
+        logger.error(f"Error consultando estado de transacción: {e}")
+        # Redirigir a pending si no podemos confirmar
+        return redirect('payments:payment_pending', order_id=order.id)
+
+    if status == 'APPROVED':
+        return redirect('payments:payment_success', order_id=order.id)
+
+    elif status == 'PENDING':
+        return redirect('payments:payment_pending', order_id=order.id)
+
+    else:  # DECLINED, ERROR
+        return redirect('payments:payment_failed', order_id=order.id)
+
+
+async def get_pse_banks_async(request):
+    """Versión asíncrona de get_pse_banks"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    try:
+        client = AsyncWompiClient()
+        banks = await client.get_pse_financial_institutions()
+        return JsonResponse({'banks': banks})
+    except Exception as e:
+        logger.error(f"Error obteniendo bancos PSE: {str(e)}", exc_info=True)
+        return JsonResponse({'error': str(e)}, status=500)
+
+
 # ==========================================
 # WEBHOOKS DE WOMPI
 # ==========================================
@@ -941,143 +978,37 @@ def wompi_webhook(request):
     - Una transacción cambie de estado (PENDING -> APPROVED/DECLINED)
     - Se complete un pago asíncrono (PSE, Bancolombia, Nequi)
 
+    Solo valida la firma, guarda el evento y responde 200. La actualización de
+    Payment/Order y los emails los aplica el worker `process_webhooks`, así un
+    SMTP lento no hace que Wompi agote el tiempo de espera y reintente.
+
     Documentación: https://docs.wompi.co/docs/colombia/eventos-webhooks/
     """
     try:
         # 1. Leer el body del request
         payload = json.loads(request.body.decode('utf-8'))
 
-        # 2. Validar firma de integridad según documentación de Wompi
-        # La firma viene en payload.signature.checksum
-        # Se calcula: SHA256(concatenar valores de las properties + timestamp + events_secret)
-        if settings.WOMPI_EVENTS_SECRET and 'signature' in payload:
-            import hashlib
-
-            signature_data = payload.get('signature', {})
-            checksum_received = signature_data.get('checksum', '')
-            properties = signature_data.get('properties', [])
-            timestamp = payload.get('timestamp', '')
-
-            # Construir string para validar
-            # Concatenar valores de las propiedades especificadas
-            values_to_concat = []
-            transaction_data = payload.get('data', {}).get('transaction', {})
-
-            for prop in properties:
-                # Las propiedades vienen como "transaction.id", "transaction.status", etc.
-                prop_key = prop.replace('transaction.', '')
-                value = transaction_data.get(prop_key, '')
-                values_to_concat.append(str(value))
-
-            # Agregar timestamp y secret
-            concat_string = ''.join(values_to_concat) + str(timestamp) + settings.WOMPI_EVENTS_SECRET
-
-            # Calcular checksum esperado
-            expected_checksum = hashlib.sha256(concat_string.encode('utf-8')).hexdigest()
-
-            # Validar
-            if checksum_received != expected_checksum:
-                logger.warning(f"Webhook signature mismatch: received={checksum_received}, expected={expected_checksum}, concat_string={concat_string}")
-                return JsonResponse({'error': 'Invalid signature'}, status=401)
-
-            logger.info(f"Webhook signature validated successfully")
-
-        # 3. Extraer datos del evento
-        event_type = payload.get('event')
-        timestamp = payload.get('timestamp')
-        data = payload.get('data', {})
-        transaction_data = data.get('transaction', {})
-
-        transaction_id = transaction_data.get('id')
-        status = transaction_data.get('status')
-        reference = transaction_data.get('reference')
-
-        logger.info(f"Webhook recibido: {event_type} | Transaction: {transaction_id} | Status: {status}")
-
-        # 4. Guardar el evento en la base de datos
-        webhook_event = WompiWebhookEvent.objects.create(
-            event_type=event_type,
-            transaction_id=transaction_id,
-            payload=payload,
-            signature=signature_header,
-            processed=False
-        )
+        # 2. Validar firma de integridad
+        if not verify_signature(payload):
+            return JsonResponse({'error': 'Invalid signature'}, status=401)
 
-        # 5. Procesar según el tipo de evento
-        if event_type == 'transaction.updated':
-            # Buscar el pago por transaction_id o reference
-            try:
-                payment = Payment.objects.get(wompi_transaction_id=transaction_id)
-            except Payment.DoesNotExist:
-                # Intentar por referencia
-                try:
-                    payment = Payment.objects.get(wompi_reference=reference)
-                except Payment.DoesNotExist:
-                    logger.error(f"Payment no encontrado: transaction_id={transaction_id}, reference={reference}")
-                    webhook_event.processed = True
-                    webhook_event.error_message = f"Payment no encontrado"
-                    webhook_event.save()
-                    return JsonResponse({'status': 'payment_not_found'}, status=404)
-
-            # Actualizar estado del pago
-            old_status = payment.status
-            payment.status = status
-            payment.wompi_response = transaction_data
-            payment.updated_at = timezone.now()
-            payment.save()
-
-            logger.info(f"Payment {payment.id} actualizado: {old_status} -> {status}")
-
-            # Actualizar estado de la orden
-            order = payment.order
-
-            if status == 'APPROVED' and old_status != 'APPROVED':
-                # Solo actualizar si el estado cambió a APPROVED
-                order.status = 'PAID'
-                order.paid_at = timezone.now()
-                order.save()
-                logger.info(f"Orden {order.order_number} marcada como PAID")
-
-                # Enviar email de pago aprobado
-                send_payment_approved_email(order, payment)
-                logger.info(f"Email de pago aprobado enviado para orden {order.order_number}")
-
-            elif status == 'DECLINED':
-                order.status = 'FAILED'
-                order.save()
-                logger.info(f"Orden {order.order_number} marcada como FAILED")
-
-            elif status == 'ERROR':
-                order.status = 'FAILED'
-                order.save()
-                logger.info(f"Orden {order.order_number} marcada como FAILED (ERROR)")
-
-            # Marcar webhook como procesado
-            webhook_event.processed = True
-            webhook_event.save()
+        # 3. Guardar el evento para procesarlo en segundo plano
+        #    (los reintentos de Wompi se reconocen sin reprocesar)
+        webhook_event, created = store_event(payload)
+        if not created:
+            logger.info(f"Webhook duplicado descartado: {payload.get('event')}")
+            return JsonResponse({'status': 'duplicate'})
 
-            return JsonResponse({
-                'status': 'success',
-                'message': 'Webhook procesado correctamente',
-                'payment_id': str(payment.id),
-                'order_id': str(order.id),
-                'new_status': status
-            })
+        logger.info(f"Webhook recibido: {webhook_event.event_type} | Transaction: {webhook_event.transaction_id}")
 
-        else:
-            # Evento no manejado
-            logger.info(f"Evento no manejado: {event_type}")
-            webhook_event.processed = True
-            webhook_event.error_message = f"Evento no manejado: {event_type}"
-            webhook_event.save()
-            return JsonResponse({'status': 'event_not_handled', 'event': event_type})
+        return JsonResponse({'status': 'received', 'event_id': str(webhook_event.id)})
 
     except json.JSONDecodeError as e:
         logger.error(f"Error decodificando JSON del webhook: {e}")
         return JsonResponse({'error': 'Invalid JSON'}, status=400)
 
     except Exception as e:
-        logger.error(f"Error procesando webhook: {e}", exc_info=True)
+        logger.error(f"Error guardando webhook: {e}", exc_info=True)
         return JsonResponse({'error': str(e)}, status=500)
 
 
@@ -1085,23 +1016,81 @@ def wompi_webhook(request):
 # MIS COMPRAS - CUSTOMER ORDER VIEWS
 # ==========================================
 
+def _customer_orders(user):
+    """Pedidos del usuario con items y pagos precargados (sin queries por pedido)"""
+    return Order.objects.filter(user=user).prefetch_related(
+        'items',
+        Prefetch(
+            'payments',
+            queryset=Payment.objects.defer('wompi_response', 'payment_method_data').order_by('-created_at'),
+            to_attr='payments_by_date',
+        ),
+    )
+
+
+def _order_history_page(request):
+    """Página de pedidos del usuario según el cursor `?after=`"""
+    orders, next_cursor = keyset_paginate(
+        _customer_orders(request.user),
+        cursor=request.GET.get('after'),
+        per_page=settings.MY_ORDERS_PAGE_SIZE,
+    )
+    for order in orders:
+        order.latest_payment = order.payments_by_date[0] if order.payments_by_date else None
+    return orders, next_cursor
+
+
 @login_required
 def my_orders_view(request):
     """Vista de 'Mis Compras' - Listado de pedidos del usuario"""
-    orders = Order.objects.filter(user=request.user).order_by('-created_at')
+    orders, next_cursor = _order_history_page(request)
 
     context = {
         'orders': orders,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('after'),
     }
 
     return render(request, 'payments/my_orders.html', context)
 
 
+@login_required
+def my_orders_json(request):
+    """Variante JSON de 'Mis Compras' para el dashboard de la cuenta"""
+    orders, next_cursor = _order_history_page(request)
+
+    data = []
+    for order in orders:
+        payment = order.latest_payment
+        data.append({
+            'id': str(order.id),
+            'order_number': order.order_number,
+            'status': order.status,
+            'status_display': order.get_status_display(),
+            'total_amount': int(order.total_amount),
+            'created_at': order.created_at.isoformat(),
+            'paid_at': order.paid_at.isoformat() if order.paid_at else None,
+            'items_count': len(order.items.all()),
+            'payment': {
+                'method': payment.payment_method,
+                'method_display': payment.get_payment_method_display(),
+                'status': payment.status,
+            } if payment else None,
+            'detail_url': reverse('payments:order_detail', args=[order.id]),
+        })
+
+    next_url = None
+    if next_cursor:
+        next_url = f"{reverse('payments:my_orders_json')}?after={next_cursor}"
+
+    return JsonResponse({'orders': data, 'next_cursor': next_cursor, 'next_url': next_url})
+
+
 @login_required
 def order_detail_view(request, order_id):
     """Vista de detalle de un pedido específico"""
-    order = get_object_or_404(Order, id=order_id, user=request.user)
-    payment = order.payments.first()  # Cambio: payment_set -> payments
+    order = get_object_or_404(_customer_orders(request.user), id=order_id)
+    payment = order.payments_by_date[0] if order.payments_by_date else None
 
     context = {
         'order': order,
@@ -1,6 +1,13 @@
 # apps/products/admin.py
 from django.contrib import admin
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.utils import timezone
 from django.utils.html import format_html
+from apps.core.exports import export_background_action, export_csv_action
+from apps.core.page_cache import invalidate_pages
+from apps.core.paginator import ApproximateCountPaginator
+from .exports import ProductExport
 from .models import ProductCategory, Product, ProductImage, Cart, CartItem
 
 @admin.register(ProductCategory)
@@ -37,6 +44,7 @@ class ProductAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
     readonly_fields = ['created_at', 'updated_at', 'last_api_sync']
     inlines = [ProductImageInline]
+    list_select_related = ['category']
 
     fieldsets = (
         ('Información Básica', {
@@ -72,25 +80,39 @@ class ProductAdmin(admin.ModelAdmin):
         }),
     )
 
-    actions = ['mark_as_featured', 'mark_as_not_featured', 'deactivate_products']
+    actions = [
+        'mark_as_featured', 'mark_as_not_featured', 'deactivate_products',
+        export_csv_action(ProductExport, 'Exportar productos a CSV'),
+        export_background_action(ProductExport, 'Exportar productos a CSV (segundo plano, aviso por email)'),
+    ]
+
+    def get_queryset(self, request):
+        # Conteo de imágenes en la misma query del changelist
+        return super().get_queryset(request).annotate(images_total=Count('images'))
 
     def image_count(self, obj):
-        count = obj.images.count()
+        count = obj.images_total
         if count > 0:
             return format_html('<span style="color: green;">✓ {} imágenes</span>', count)
         return format_html('<span style="color: orange;">⚠ Sin imágenes</span>')
     image_count.short_description = "Galería"
+    image_count.admin_order_field = 'images_total'
+
+    def update_products(self, queryset, **fields):
+        # update() no cambia updated_at (ETag del catálogo) ni envía signals (caché de páginas)
+        queryset.update(updated_at=timezone.now(), **fields)
+        transaction.on_commit(invalidate_pages)
 
     def mark_as_featured(self, request, queryset):
-        queryset.update(featured=True)
+        self.update_products(queryset, featured=True)
     mark_as_featured.short_description = "Marcar como destacado"
 
     def mark_as_not_featured(self, request, queryset):
-        queryset.update(featured=False)
+        self.update_products(queryset, featured=False)
     mark_as_not_featured.short_description = "Quitar de destacados"
 
     def deactivate_products(self, request, queryset):
-        queryset.update(active=False)
+        self.update_products(queryset, active=False)
     deactivate_products.short_description = "Desactivar productos"
 
 
@@ -114,12 +136,37 @@ class CartItemInline(admin.TabularInline):
     extra = 0
     readonly_fields = ['product', 'quantity', 'price', 'subtotal']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
+
 @admin.register(Cart)
 class CartAdmin(admin.ModelAdmin):
     """Admin para carritos"""
-    list_display = ['session_key', 'item_count', 'formatted_total', 'created_at']
+    list_display = ['session_key', 'items_quantity', 'cart_total', 'created_at']
     readonly_fields = ['session_key', 'created_at', 'updated_at']
     inlines = [CartItemInline]
-    
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # Cantidad y total calculados en SQL en lugar de recorrer los items de cada carrito
+        return super().get_queryset(request).annotate(
+            quantity_total=Sum('items__quantity'),
+            amount_total=Sum(
+                F('items__quantity') * F('items__price'),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            ),
+        )
+
+    def items_quantity(self, obj):
+        return obj.quantity_total or 0
+    items_quantity.short_description = "Items"
+    items_quantity.admin_order_field = 'quantity_total'
+
+    def cart_total(self, obj):
+        return f"${obj.amount_total or 0:,.0f}"
+    cart_total.short_description = "Total"
+    cart_total.admin_order_field = 'amount_total'
+
     def has_add_permission(self, request):
         return False
\ No newline at end of file
@@ -0,0 +1,26 @@
+"""
+Exportación CSV de productos (ver apps/core/exports.py)
+"""
+from apps.core.exports import CSVExport, format_money
+
+
+class ProductExport(CSVExport):
+    filename_prefix = 'productos'
+    columns = [
+        ('SKU', 'sku'),
+        ('Nombre', 'name'),
+        ('Categoría', lambda product: product.category.name),
+        ('Precio', lambda product: format_money(product.price)),
+        ('Precio Oferta', lambda product: format_money(product.sale_price)),
+        ('Stock', 'stock'),
+        ('Activo', lambda product: 'Sí' if product.active else 'No'),
+        ('Destacado', lambda product: 'Sí' if product.featured else 'No'),
+    ]
+
+    def get_queryset(self, queryset):
+        return (
+            queryset
+            .select_related('category')
+            .only('sku', 'name', 'price', 'sale_price', 'stock', 'active', 'featured', 'category__name')
+            .order_by('name')
+        )
@@ -16,6 +16,7 @@ class ProductCategory(models.Model):
     description = models.TextField(blank=True)
     order = models.IntegerField(default=0)
     active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['order', 'name']
@@ -1,3 +1,125 @@
-from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from apps.core.testing import ViewBenchmarkTestCase
+
+
+class CatalogViewBenchmarks(ViewBenchmarkTestCase):
+    """Presupuesto de queries del catálogo"""
+
+    def test_product_list(self):
+        url = reverse('products:product_list')
+        self.benchmark('products:product_list', lambda: self.client.get(url), max_queries=28)
+
+    def test_product_list_last_page(self):
+        url = reverse('products:product_list') + '?page=last'
+        self.benchmark('products:product_list?page=last', lambda: self.client.get(url), max_queries=28)
+
+    def test_product_category(self):
+        url = reverse('products:product_category', args=[self.data.categories[0].slug])
+        self.benchmark('products:product_category', lambda: self.client.get(url), max_queries=41)
+
+    def test_product_detail(self):
+        url = reverse('products:product_detail', args=[self.data.products[0].slug])
+        self.benchmark('products:product_detail', lambda: self.client.get(url), max_queries=19)
+
+
+class CatalogConditionalCacheTests(ViewBenchmarkTestCase):
+    """ETag y 304 de las páginas del catálogo (apps/core/http_cache.py)"""
+
+    def test_product_detail_not_modified(self):
+        product = self.data.products[0]
+        url = reverse('products:product_detail', args=[product.slug])
+
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertIn('public', response['Cache-Control'])
+
+        # Solo el aggregate de frescura, sin renderizar
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        product.name = 'Producto renombrado'
+        product.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_category_change_invalidates_list(self):
+        url = reverse('products:product_category', args=[self.data.categories[0].slug])
+        etag = self.client.get(url)['ETag']
+
+        category = self.data.categories[1]
+        category.name = 'Categoría renombrada'
+        category.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_pages_do_not_depend_on_visitor(self):
+        url = reverse('products:product_list')
+        anonymous = self.client.get(url)
+        self.assertFalse(anonymous.cookies)
+
+        self.login_customer()
+        self.client.post(reverse('products:api_add_to_cart', args=[self.data.products[0].id]))
+        customer = self.client.get(url)
+        self.assertEqual(customer.content, anonymous.content)
+        self.assertEqual(customer['ETag'], anonymous['ETag'])
+
+
+class CartViewBenchmarks(ViewBenchmarkTestCase):
+    """Presupuesto de queries del carrito (HTML y API JSON de static/js/cart.js)"""
+
+    def setUp(self):
+        # Carrito con 5 productos en la sesión del cliente de pruebas
+        for product in self.data.products[:5]:
+            self.client.post(reverse('products:api_add_to_cart', args=[product.id]), {'quantity': 1})
+
+    def test_cart_detail(self):
+        self.benchmark('products:cart_view', lambda: self.client.get(reverse('products:cart_view')), max_queries=17)
+
+    def test_cart_detail_renders_visitor(self):
+        # Sin caché de página: usuario y mensajes se renderizan en el servidor
+        self.login_customer()
+        self.client.post(reverse('products:add_to_cart', args=[self.data.products[0].id]), {'quantity': 1})
+        response = self.client.get(reverse('products:cart_view'))
+        self.assertContains(response, 'cliente@example.com')
+        self.assertContains(response, 'GatewayUtils.showNotification')
+        self.assertNotContains(response, 'userLoginLink')
+
+    def test_api_get_cart(self):
+        self.benchmark('products:api_get_cart', lambda: self.client.get(reverse('products:api_get_cart')), max_queries=13)
+
+    def test_api_add_to_cart(self):
+        url = reverse('products:api_add_to_cart', args=[self.data.products[10].id])
+        self.benchmark('products:api_add_to_cart', lambda: self.client.post(url, {'quantity': 1}), max_queries=7)
+
+    def test_api_update_cart_item(self):
+        item = self.client.get(reverse('products:api_get_cart')).json()['cart']['items'][0]
+        url = reverse('products:api_update_cart_item', args=[item['id']])
+        self.benchmark('products:api_update_cart_item', lambda: self.client.post(url, {'quantity': 2}), max_queries=7)
+
+    def test_checkout(self):
+        # Redirige al checkout de pagos
+        self.benchmark(
+            'products:checkout',
+            lambda: self.client.get(reverse('products:checkout')),
+            max_queries=0,
+            expected_status=302,
+        )
+
+
+class ProductAdminBenchmarks(ViewBenchmarkTestCase):
+    """Presupuesto de queries de los changelists del catálogo"""
+
+    def setUp(self):
+        self.login_admin()
+
+    def test_product_changelist(self):
+        url = reverse('admin:products_product_changelist')
+        self.benchmark('admin:products_product_changelist', lambda: self.client.get(url), max_queries=8)
+
+    def test_cart_changelist(self):
+        for product in self.data.products[:3]:
+            self.client.post(reverse('products:api_add_to_cart', args=[product.id]), {'quantity': 1})
+        url = reverse('admin:products_cart_changelist')
+        self.benchmark('admin:products_cart_changelist', lambda: self.client.get(url), max_queries=7)
@@ -4,13 +4,46 @@
 
 from django.shortcuts import render, get_object_or_404, redirect
 from django.core.paginator import Paginator
-from django.db.models import Prefetch
+from django.db.models import Count, Max, Prefetch
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from django.contrib import messages
 from decimal import Decimal
+from apps.core.http_cache import conditional_page
+from apps.core.page_cache import full_page_cache
 from .models import Product, ProductCategory, Cart, CartItem
 
+
+def catalog_freshness(request, slug=None):
+    """
+    Frescura del listado (todas las categorías y productos) en 1 query,
+    para el ETag de product_list y product_category
+    """
+    return ProductCategory.objects.aggregate(
+        category_count=Count('id', distinct=True),
+        categories_updated=Max('updated_at'),
+        product_count=Count('products'),
+        products_updated=Max('products__updated_at'),
+    )
+
+
+def product_freshness(request, slug):
+    """
+    Frescura del detalle en 1 query: productos de la categoría del producto
+    (el producto y sus relacionados) y la categoría.
+
+    Las imágenes se editan como inline del producto: el admin guarda el
+    producto y cambia su updated_at.
+    """
+    return Product.objects.filter(category__products__slug=slug).aggregate(
+        product_count=Count('id'),
+        products_updated=Max('updated_at'),
+        category_updated=Max('category__updated_at'),
+    )
+
+
+@full_page_cache
+@conditional_page(catalog_freshness)
 def product_list(request):
     """
     Lista de productos optimizada con paginación.
@@ -48,6 +81,8 @@ def product_list(request):
     return render(request, 'products/product_list.html', context)
 
 
+@full_page_cache
+@conditional_page(product_freshness)
 def product_detail(request, slug):
     """
     Detalle de producto optimizado.
@@ -82,6 +117,8 @@ def product_detail(request, slug):
     return render(request, 'products/product_detail.html', context)
 
 
+@full_page_cache
+@conditional_page(catalog_freshness)
 def product_category(request, slug):
     """
     Filtrar productos por categoría - Optimizado.
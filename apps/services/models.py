@@ -10,6 +10,7 @@ class ServiceCategory(models.Model):
     description = models.TextField()
     order = models.IntegerField(default=0)
     active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['order']
@@ -1,3 +1,27 @@
-from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from apps.core.testing import ViewBenchmarkTestCase
+
+
+class ServiceViewBenchmarks(ViewBenchmarkTestCase):
+    """Presupuesto de queries de las páginas de servicios"""
+
+    def test_service_list(self):
+        self.benchmark('services:service_list', lambda: self.client.get(reverse('services:service_list')), max_queries=1)
+
+    def test_service_category(self):
+        url = reverse('services:service_category', args=[self.data.service_categories[0].slug])
+        self.benchmark('services:service_category', lambda: self.client.get(url), max_queries=2)
+
+    def test_service_detail(self):
+        url = reverse('services:service_detail', args=[self.data.services[0].slug])
+        self.benchmark('services:service_detail', lambda: self.client.get(url), max_queries=3)
+
+    def test_service_detail_not_modified(self):
+        url = reverse('services:service_detail', args=[self.data.services[0].slug])
+        response = self.client.get(url)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
@@ -4,8 +4,21 @@
 
 from django.shortcuts import render, get_object_or_404
 from django.core.paginator import Paginator
+from django.db.models import Count, Max
+from apps.core.http_cache import conditional_page
+from apps.core.page_cache import full_page_cache
 from .models import Service, ServiceCategory
 
+
+def service_freshness(request, slug):
+    """Frescura del detalle en 1 query: servicios de la categoría del servicio y la categoría"""
+    return Service.objects.filter(category__services__slug=slug).aggregate(
+        service_count=Count('id'),
+        services_updated=Max('updated_at'),
+        category_updated=Max('category__updated_at'),
+    )
+
+@full_page_cache
 def service_list(request):
     """
     Lista de servicios optimizada.
@@ -43,6 +56,8 @@ def service_list(request):
     return render(request, 'services/service_list.html', context)
 
 
+@full_page_cache
+@conditional_page(service_freshness)
 def service_detail(request, slug):
     """
     Detalle de servicio optimizado.
@@ -73,6 +88,7 @@ def service_detail(request, slug):
     return render(request, 'services/service_detail.html', context)
 
 
+@full_page_cache
 def service_category(request, slug):
     """
     Filtrar servicios por categoría - Optimizado.
@@ -43,10 +43,12 @@ AUTH_USER_MODEL = 'accounts.User'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'apps.core.db_router.ReplicaStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.core.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -64,8 +66,6 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
-                #? Context processor personalizado para el carrito
-                'apps.products.context_processors.cart_context',
             ],
         },
     },
@@ -85,6 +85,41 @@ DATABASES = {
     }
 }
 
+# Réplicas de lectura (apps/core/db_router.py): DB_REPLICA_HOSTS separados por coma.
+# Usuario y contraseña del primario salvo DB_REPLICA_USER / DB_REPLICA_PASSWORD.
+for _i, _host in enumerate([h.strip() for h in config('DB_REPLICA_HOSTS', default='').split(',') if h.strip()], 1):
+    DATABASES[f'replica{_i}'] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        'USER': config('DB_REPLICA_USER', default=DATABASES['default']['USER']),
+        'PASSWORD': config('DB_REPLICA_PASSWORD', default=DATABASES['default']['PASSWORD']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['apps.core.db_router.ReplicaRouter']
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+# Modelos ('app' o 'app.Modelo') cuyas lecturas van a las réplicas: catálogo y reportes
+DATABASE_REPLICA_MODELS = [
+    'products.ProductCategory',
+    'products.Product',
+    'products.ProductImage',
+    'services',
+    'core.CompanyInfo',
+    'core.ValueCard',
+    'core.Client',
+    'core.Brand',
+    'payments.DailySalesRollup',
+    'payments.DailyProductSales',
+    'payments.DailyPaymentMethodStats',
+]
+
+# Vistas ('namespace' o 'namespace:nombre') que siempre leen del primario: checkout, webhooks, pagos
+DATABASE_PRIMARY_VIEWS = ['payments', 'products:checkout']
+
+# Segundos que una sesión lee del primario después de escribir
+DATABASE_STICKY_SECONDS = config('DATABASE_STICKY_SECONDS', default=10, cast=int)
+
 #* Contraseñas de validación
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -108,6 +143,18 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Exportaciones en segundo plano: fuera de MEDIA_ROOT para que no sean públicas
+EXPORTS_ROOT = config('EXPORTS_ROOT', default=str(BASE_DIR / 'private' / 'exports'))
+# Exportaciones en RUNNING por más de EXPORT_JOB_TIMEOUT segundos (worker muerto) se reintentan
+EXPORT_JOB_TIMEOUT = config('EXPORT_JOB_TIMEOUT', default=3600, cast=int)
+EXPORT_JOB_MAX_ATTEMPTS = config('EXPORT_JOB_MAX_ATTEMPTS', default=3, cast=int)
+# Selecciones manuales de hasta EXPORT_JOB_MAX_IDS filas guardan sus pks; "seleccionar todo" guarda el filtro
+EXPORT_JOB_MAX_IDS = config('EXPORT_JOB_MAX_IDS', default=1000, cast=int)
+
+# Paginación del admin (apps/core/paginator.py)
+ADMIN_APPROXIMATE_COUNT_THRESHOLD = config('ADMIN_APPROXIMATE_COUNT_THRESHOLD', default=100000, cast=int)
+ADMIN_COUNT_CACHE_SECONDS = config('ADMIN_COUNT_CACHE_SECONDS', default=60, cast=int)
+
 #* Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -119,6 +166,13 @@ EMAIL_USE_TLS = config('EMAIL_USE_TLS', cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
+
+# Outbox de emails (python manage.py send_queued_emails)
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=50, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+# Segundos que un worker tiene para enviar el lote reclamado antes de que otro lo retome
+EMAIL_OUTBOX_LEASE_SECONDS = config('EMAIL_OUTBOX_LEASE_SECONDS', default=600, cast=int)
 
 # Email del admin para notificaciones de pedidos
 ADMIN_ORDER_EMAIL = config('ADMIN_ORDER_EMAIL', default='info@gatewayit.com.co')
@@ -168,5 +222,99 @@ WOMPI_PUBLIC_KEY = config('WOMPI_PUBLIC_KEY')
 WOMPI_PRIVATE_KEY = config('WOMPI_PRIVATE_KEY')
 WOMPI_INTEGRITY_KEY = config('WOMPI_INTEGRITY_KEY')
 WOMPI_ENVIRONMENT = config('WOMPI_ENVIRONMENT')  # sandbox or production
-WOMPI_API_BASE_URL = 'https://sandbox.wompi.co/v1' if WOMPI_ENVIRONMENT == 'sandbox' else 'https://production.wompi.co/v1'
-WOMPI_EVENTS_SECRET = config('WOMPI_EVENTS_SECRET')
\ No newline at end of file
+# Se puede apuntar a un servidor simulado (python manage.py run_fake_wompi)
+WOMPI_API_BASE_URL = config(
+    'WOMPI_API_BASE_URL',
+    default='https://sandbox.wompi.co/v1' if WOMPI_ENVIRONMENT == 'sandbox' else 'https://production.wompi.co/v1'
+)
+WOMPI_EVENTS_SECRET = config('WOMPI_EVENTS_SECRET')
+
+# Vistas asíncronas (AsyncWompiClient, requiere httpx); solo tiene sentido bajo ASGI
+WOMPI_ASYNC_VIEWS = config('WOMPI_ASYNC_VIEWS', default=False, cast=bool)
+
+# Worker de webhooks (python manage.py process_webhooks)
+WOMPI_WEBHOOK_BATCH_SIZE = config('WOMPI_WEBHOOK_BATCH_SIZE', default=50, cast=int)
+WOMPI_WEBHOOK_MAX_ATTEMPTS = config('WOMPI_WEBHOOK_MAX_ATTEMPTS', default=5, cast=int)
+# Ventana del contador de duplicados descartados (admin de webhooks y process_webhooks)
+WOMPI_DUPLICATES_WINDOW_HOURS = config('WOMPI_DUPLICATES_WINDOW_HOURS', default=24, cast=int)
+
+# Benchmark del webhook (python manage.py replay_webhooks): escribe eventos en la cola y el
+# worker los procesaría contra pagos reales. Solo activar en el .env de una base de datos
+# aparte (copia o staging) sin cron de process_webhooks; producción lo deja en False.
+WEBHOOK_REPLAY_ALLOWED = config('WEBHOOK_REPLAY_ALLOWED', default=False, cast=bool)
+
+# Archivo de webhooks procesados (python manage.py archive_webhook_events)
+WOMPI_WEBHOOK_RETENTION_DAYS = config('WOMPI_WEBHOOK_RETENTION_DAYS', default=90, cast=int)
+WOMPI_WEBHOOK_ARCHIVE_BATCH_SIZE = config('WOMPI_WEBHOOK_ARCHIVE_BATCH_SIZE', default=500, cast=int)
+
+# Conciliación de pagos PENDING (python manage.py reconcile_payments)
+WOMPI_RECONCILE_OLDER_THAN_MINUTES = config('WOMPI_RECONCILE_OLDER_THAN_MINUTES', default=15, cast=int)
+WOMPI_RECONCILE_LIMIT = config('WOMPI_RECONCILE_LIMIT', default=5000, cast=int)
+WOMPI_RECONCILE_WORKERS = config('WOMPI_RECONCILE_WORKERS', default=8, cast=int)
+WOMPI_RECONCILE_RATE = config('WOMPI_RECONCILE_RATE', default=10, cast=float)
+
+# Estado del pago en la página de pago pendiente (payments:payment_status).
+# Cada petición ocupa un worker de Passenger mientras espera: máximo 1-2 s. La página
+# espera entre consultas (backoff), así una pestaña abierta no retiene un worker.
+PAYMENT_STATUS_MAX_WAIT = config('PAYMENT_STATUS_MAX_WAIT', default=2, cast=int)
+PAYMENT_STATUS_POLL_INTERVAL = config('PAYMENT_STATUS_POLL_INTERVAL', default=1.0, cast=float)
+
+# Idempotencia del checkout (doble envío del formulario). El segundo envío espera
+# al primero como máximo CHECKOUT_IDEMPOTENCY_WAIT segundos (ocupa un worker, 1-2 s)
+# y si ya hay orden va a payment_pending, que consulta el estado con backoff
+CHECKOUT_IDEMPOTENCY_TTL_HOURS = config('CHECKOUT_IDEMPOTENCY_TTL_HOURS', default=24, cast=int)
+CHECKOUT_IDEMPOTENCY_WAIT = config('CHECKOUT_IDEMPOTENCY_WAIT', default=2, cast=float)
+
+# Pedidos por página en "Mis Compras"
+MY_ORDERS_PAGE_SIZE = config('MY_ORDERS_PAGE_SIZE', default=20, cast=int)
+
+# Perfilado de peticiones (apps/core/profiling.py): Server-Timing y reporte en core:profiling_report.
+# PROFILING_ENABLED perfila todo; con PROFILING_ALLOW_HEADER el staff puede enviar `X-Profile: 1`.
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_ALLOW_HEADER = config('PROFILING_ALLOW_HEADER', default=True, cast=bool)
+PROFILING_BUFFER_SIZE = config('PROFILING_BUFFER_SIZE', default=2000, cast=int)
+
+# Precarga de workers en passenger_wsgi.py (apps/core/warmup.py): URLconfs, vistas, templates,
+# backend de base de datos y traducciones antes de la primera petición.
+WARMUP_ENABLED = config('WARMUP_ENABLED', default=True, cast=bool)
+WARMUP_TEMPLATES = config('WARMUP_TEMPLATES', default=True, cast=bool)
+
+# Caché HTTP condicional del catálogo (apps/core/http_cache.py): ETag/Last-Modified y 304.
+# Segundos que navegadores y Apache reutilizan la página antes de revalidarla con el ETag.
+CATALOG_CACHE_MAX_AGE = config('CATALOG_CACHE_MAX_AGE', default=0, cast=int)
+
+# Caché de página completa (apps/core/page_cache.py): catálogo, servicios e inicio son iguales
+# para todos; lo del visitante llega por core:visitor_fragment. En archivos para compartirla
+# entre los workers de Passenger.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('PAGE_CACHE_LOCATION', default=str(BASE_DIR / 'cache' / 'pages')),
+        'OPTIONS': {'MAX_ENTRIES': config('PAGE_CACHE_MAX_ENTRIES', default=5000, cast=int)},
+    },
+}
+PAGE_CACHE_ENABLED = config('PAGE_CACHE_ENABLED', default=True, cast=bool)
+PAGE_CACHE_ALIAS = 'pages'
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=600, cast=int)
+
+# Modelos ('app.Modelo') que invalidan la caché de páginas al guardarse o borrarse
+PAGE_CACHE_MODELS = [
+    'products.ProductCategory',
+    'products.Product',
+    'products.ProductImage',
+    'services.ServiceCategory',
+    'services.Service',
+    'core.CompanyInfo',
+    'core.ValueCard',
+    'core.Client',
+    'core.Brand',
+]
+
+# Catálogo pre-renderizado (apps/core/prerender.py, manage.py prerender_catalog): HTML estático de
+# tienda y servicios que Apache sirve sin Django cuando existe <PRERENDER_ROOT>/.active.
+# En cPanel debe ser <public_html>/prerendered (el .htaccess lo busca en DOCUMENT_ROOT).
+PRERENDER_ROOT = config('PRERENDER_ROOT', default=str(BASE_DIR / 'prerendered'))
+PRERENDER_HOST = config('PRERENDER_HOST', default=ALLOWED_HOSTS[0].lstrip('.'))
@@ -0,0 +1,79 @@
+"""
+Settings para pruebas y benchmarks locales
+
+SQLite en memoria, email en memoria y llaves de Wompi de prueba: no necesita
+MySQL, SMTP ni red.
+
+    python manage.py test --settings=config.settings_test
+"""
+import os
+
+# Variables obligatorias de settings.py con valores de prueba (el entorno real tiene prioridad)
+_TEST_ENV = {
+    'SECRET_KEY': 'test-secret-key',
+    'DB_NAME': 'test',
+    'DB_USER': 'test',
+    'DB_PASSWORD': 'test',
+    'DB_HOST': 'localhost',
+    'DB_PORT': '3306',
+    'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+    'EMAIL_HOST': 'localhost',
+    'EMAIL_PORT': '25',
+    'EMAIL_USE_TLS': 'False',
+    'EMAIL_HOST_USER': '',
+    'EMAIL_HOST_PASSWORD': '',
+    'WOMPI_PUBLIC_KEY': 'pub_test_benchmark',
+    'WOMPI_PRIVATE_KEY': 'prv_test_benchmark',
+    'WOMPI_INTEGRITY_KEY': 'test_integrity_benchmark',
+    'WOMPI_ENVIRONMENT': 'sandbox',
+    'WOMPI_EVENTS_SECRET': 'test_events_benchmark',
+}
+for _key, _value in _TEST_ENV.items():
+    os.environ.setdefault(_key, _value)
+
+from .settings import *  # noqa: E402,F401,F403
+from .settings import BASE_DIR  # noqa: E402
+
+DEBUG = False
+ALLOWED_HOSTS = ['testserver', 'localhost', '127.0.0.1']
+
+# El cliente de pruebas usa http://testserver
+SECURE_SSL_REDIRECT = False
+SESSION_COOKIE_SECURE = False
+CSRF_COOKIE_SECURE = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+    # Réplica en una segunda base SQLite (sin replicación: las pruebas del router
+    # escriben en cada una por separado). Dentro de TestCase todo va al primario.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+DATABASE_REPLICAS = ['replica']
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pages',
+    },
+}
+
+# Los benchmarks miden el render; las pruebas de la caché de páginas la activan
+PAGE_CACHE_ENABLED = False
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Hash rápido: los benchmarks no deben medir PBKDF2
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Reporte JSON de los benchmarks de vistas (apps/core/testing.py)
+BENCHMARK_REPORT_PATH = os.environ.get('BENCHMARK_REPORT_PATH', str(BASE_DIR / 'benchmark-report.json'))
+BENCHMARK_ITERATIONS = int(os.environ.get('BENCHMARK_ITERATIONS', '10'))
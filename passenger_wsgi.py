@@ -16,3 +16,10 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 # Importar la aplicación WSGI de Django
 from config.wsgi import application
+
+# Precargar URLconfs, vistas y templates antes de la primera petición (ver apps/core/warmup.py)
+from django.conf import settings
+
+if settings.WARMUP_ENABLED:
+    from apps.core.warmup import warm_up
+    warm_up()
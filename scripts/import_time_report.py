@@ -0,0 +1,139 @@
+"""
+Reporte de tiempos de importación del arranque de un worker
+
+Arranca un proceso nuevo con `python -X importtime`, importa config.wsgi (lo
+mismo que passenger_wsgi.py: settings + django.setup()) y opcionalmente corre
+la precarga (apps/core/warmup.py). Lista los módulos que más tardan y el total
+por paquete.
+
+Uso:
+    python scripts/import_time_report.py
+    python scripts/import_time_report.py --warmup --top 40
+    python scripts/import_time_report.py --settings config.settings_test --json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+# Código del proceso medido: imprime los tiempos de la precarga como JSON
+CHILD_CODE = '''
+import json, sys, time
+started = time.perf_counter()
+import config.wsgi
+phases = {"django.setup": round((time.perf_counter() - started) * 1000, 1)}
+if "--warmup" in sys.argv:
+    from apps.core.warmup import warm_up
+    phases.update(warm_up())
+print(json.dumps(phases))
+'''
+
+
+def parse_importtime(stderr):
+    """Líneas de -X importtime -> lista de (módulo, self_ms, cumulative_ms, profundidad)"""
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us) / 1000, int(cumulative_us) / 1000, len(indent) // 2))
+    return modules
+
+
+def package_of(module):
+    """Paquete para agrupar: apps.payments, django.db, requests, ..."""
+    parts = module.split('.')
+    if parts[0] in ('apps', 'django') and len(parts) > 1:
+        if parts[1] == 'contrib' and len(parts) > 2:
+            return '.'.join(parts[:3])
+        return '.'.join(parts[:2])
+    return parts[0]
+
+
+def measure(settings_module, warmup):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    args = [sys.executable, '-X', 'importtime', '-c', CHILD_CODE]
+    if warmup:
+        args.append('--warmup')
+
+    started = time.perf_counter()
+    result = subprocess.run(args, cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr[-4000:])
+        raise SystemExit(f'El proceso medido terminó con código {result.returncode}')
+
+    phases = json.loads(result.stdout.strip().splitlines()[-1])
+    return wall_ms, phases, parse_importtime(result.stderr)
+
+
+def build_report(wall_ms, phases, modules, top):
+    packages = {}
+    for name, self_ms, _, _ in modules:
+        package = packages.setdefault(package_of(name), {'modules': 0, 'self_ms': 0.0})
+        package['modules'] += 1
+        package['self_ms'] += self_ms
+
+    return {
+        'wall_ms': round(wall_ms, 1),
+        'phases_ms': phases,
+        'modules': len(modules),
+        'import_ms': round(sum(self_ms for _, self_ms, _, _ in modules), 1),
+        'top_cumulative': [
+            {'module': name, 'cumulative_ms': round(cumulative, 1), 'self_ms': round(self_ms, 1)}
+            for name, self_ms, cumulative, _ in sorted(modules, key=lambda m: m[2], reverse=True)[:top]
+        ],
+        'top_self': [
+            {'module': name, 'self_ms': round(self_ms, 1)}
+            for name, self_ms, _, _ in sorted(modules, key=lambda m: m[1], reverse=True)[:top]
+        ],
+        'packages': [
+            {'package': name, 'modules': data['modules'], 'self_ms': round(data['self_ms'], 1)}
+            for name, data in sorted(packages.items(), key=lambda item: item[1]['self_ms'], reverse=True)[:top]
+        ],
+    }
+
+
+def print_report(report):
+    print(f"Proceso completo: {report['wall_ms']:.0f} ms | "
+          f"{report['modules']} módulos importados en {report['import_ms']:.0f} ms")
+    print('Fases: ' + ', '.join(f'{name} {ms:.0f} ms' for name, ms in report['phases_ms'].items()))
+
+    print('\nMódulos por tiempo acumulado (incluye lo que importan):')
+    for row in report['top_cumulative']:
+        print(f"  {row['cumulative_ms']:>8.1f} ms  {row['self_ms']:>7.1f} ms propio  {row['module']}")
+
+    print('\nMódulos por tiempo propio:')
+    for row in report['top_self']:
+        print(f"  {row['self_ms']:>8.1f} ms  {row['module']}")
+
+    print('\nTotal por paquete:')
+    for row in report['packages']:
+        print(f"  {row['self_ms']:>8.1f} ms  {row['modules']:>4} módulos  {row['package']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiempos de importación del arranque de un worker')
+    parser.add_argument('--settings', default=os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings'))
+    parser.add_argument('--warmup', action='store_true', help='Incluir la precarga de passenger_wsgi.py')
+    parser.add_argument('--top', type=int, default=25, help='Filas por tabla')
+    parser.add_argument('--json', action='store_true', help='Imprimir el reporte como JSON')
+    args = parser.parse_args()
+
+    report = build_report(*measure(args.settings, args.warmup), top=args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -22,7 +22,8 @@ const GatewayCart = (() => {
         return cookieValue;
     }
 
-    const csrftoken = getCookie('csrftoken');
+    // Se lee en cada petición: la cookie puede crearse después de cargar la página (core:visitor_fragment)
+    const csrftoken = () => getCookie('csrftoken');
 
     // ==========================================
     // ELEMENTOS DEL DOM
@@ -85,7 +86,7 @@ const GatewayCart = (() => {
             const response = await fetch(`/tienda/api/cart/add/${productId}/`, {
                 method: 'POST',
                 headers: {
-                    'X-CSRFToken': csrftoken,
+                    'X-CSRFToken': csrftoken(),
                     'Content-Type': 'application/json',
                 },
             });
@@ -130,7 +131,7 @@ const GatewayCart = (() => {
             const response = await fetch(`/tienda/api/cart/remove/${itemId}/`, {
                 method: 'POST',
                 headers: {
-                    'X-CSRFToken': csrftoken,
+                    'X-CSRFToken': csrftoken(),
                     'Content-Type': 'application/json',
                 },
             });
@@ -175,7 +176,7 @@ const GatewayCart = (() => {
             const response = await fetch(`/tienda/api/cart/update/${itemId}/`, {
                 method: 'POST',
                 headers: {
-                    'X-CSRFToken': csrftoken,
+                    'X-CSRFToken': csrftoken(),
                 },
                 body: formData,
             });
@@ -354,8 +355,18 @@ const GatewayCart = (() => {
             cartOverlay.addEventListener('click', closeCart);
         }
 
-        // Cargar contador inicial
-        loadCart();
+        // Contador inicial desde core:visitor_fragment (main.js) o desde la API del carrito
+        if (window.GatewayMain && GatewayMain.visitorReady) {
+            GatewayMain.visitorReady.then(visitor => {
+                if (visitor) {
+                    updateCartCount(visitor.cart.item_count);
+                } else {
+                    loadCart();
+                }
+            });
+        } else {
+            loadCart();
+        }
 
         // Delegación de eventos para botones "Agregar al carrito"
         document.addEventListener('click', (e) => {
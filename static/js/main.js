@@ -444,6 +444,64 @@ const GatewayMain = (() => {
         document.head.appendChild(style);
     };
 
+    // ==========================================
+    // VISITANTE (usuario, carrito, mensajes, CSRF)
+    // ==========================================
+
+    /**
+     * Pide el estado del visitante a core:visitor_fragment.
+     * Las páginas con caché de página completa son iguales para todos y se
+     * completan con esta respuesta; las demás ya traen usuario y mensajes
+     * del servidor (partials/visitor_menu.html solo está en las cacheadas).
+     */
+    const loadVisitor = () => {
+        const url = window.GATEWAY_VISITOR_URL;
+        if (!url || !window.fetch) return Promise.resolve(null);
+
+        return fetch(url, {
+            credentials: 'same-origin',
+            headers: { 'Accept': 'application/json' },
+        })
+            .then(response => (response.ok ? response.json() : null))
+            .catch(error => {
+                console.error('Error loading visitor:', error);
+                return null;
+            });
+    };
+
+    // Se pide apenas carga el script; cart.js usa la misma respuesta
+    const visitorReady = loadVisitor();
+
+    /**
+     * Completa la página con el estado del visitante
+     */
+    const applyVisitor = (visitor) => {
+        if (!visitor) return;
+
+        // Token CSRF de los formularios POST
+        document.querySelectorAll('input[name="csrfmiddlewaretoken"]').forEach(input => {
+            if (!input.value) input.value = visitor.csrf_token;
+        });
+
+        // Menú de usuario
+        if (visitor.user) {
+            const loginLink = document.getElementById('userLoginLink');
+            const menuToggle = document.getElementById('userMenuToggle');
+            const dropdown = document.getElementById('userDropdown');
+            const displayName = document.getElementById('userDisplayName');
+
+            if (loginLink) loginLink.hidden = true;
+            if (menuToggle) menuToggle.hidden = false;
+            if (dropdown) dropdown.hidden = false;
+            if (displayName) displayName.textContent = visitor.user.name;
+        }
+
+        // Mensajes de Django
+        visitor.messages.forEach(message => {
+            GatewayUtils.showNotification(message.message, message.tags);
+        });
+    };
+
     // ==========================================
     // PERFORMANCE MONITORING
     // ==========================================
@@ -492,6 +550,7 @@ const GatewayMain = (() => {
             initNavigation();
             initDarkMode();
             initFormValidation();
+            visitorReady.then(applyVisitor);
             monitorPerformance();
 
             // Log de inicialización
@@ -505,6 +564,7 @@ const GatewayMain = (() => {
     
     return {
         init,
+        visitorReady,
         initNavigation,
         initDarkMode,
         initFormValidation